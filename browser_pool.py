@@ -0,0 +1,206 @@
+from contextlib import contextmanager
+import atexit
+import queue
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:  # memory-growth recycling falls back to the JS heap size
+    psutil = None
+
+_chromedriver_path = None
+_chromedriver_lock = threading.Lock()
+
+
+def chromedriver_path():
+    """Resolve the chromedriver binary once per process instead of once per browser"""
+    global _chromedriver_path
+    with _chromedriver_lock:
+        if _chromedriver_path is None:
+            from webdriver_manager.chrome import ChromeDriverManager
+            _chromedriver_path = ChromeDriverManager().install()
+    return _chromedriver_path
+
+
+class PooledBrowser:
+    def __init__(self, driver, startup_ms, memory_mb):
+        self.driver = driver
+        self.startup_ms = startup_ms
+        self.baseline_mb = memory_mb
+        self.uses = 0
+
+
+class BrowserPool:
+    """Keeps up to `size` warm Chrome sessions and hands them out one lease at a time"""
+
+    def __init__(self, factory, size=1, max_uses=25, max_memory_growth_mb=300, lease_timeout=600):
+        self.factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self.max_memory_growth_mb = max_memory_growth_mb
+        self.lease_timeout = lease_timeout
+
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+        self._startup_ms = []
+        self._lease_ms = []
+        self._reused = 0
+        self._recycled = 0
+
+    def _start(self):
+        start = time.perf_counter()
+        driver = self.factory()
+        startup_ms = (time.perf_counter() - start) * 1000
+        self._startup_ms.append(startup_ms)
+        return PooledBrowser(driver, startup_ms, self._memory_mb(driver))
+
+    def _reserve(self):
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return True
+            return False
+
+    def _start_reserved(self):
+        try:
+            return self._start()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _retire(self, browser):
+        with self._lock:
+            self._created -= 1
+        try:
+            browser.driver.quit()
+        except Exception:
+            pass
+
+    def _memory_mb(self, driver):
+        """Resident memory of the Chrome process tree (or the page JS heap without psutil)"""
+        try:
+            if psutil:
+                root = psutil.Process(driver.service.process.pid)
+                procs = [root] + root.children(recursive=True)
+                return sum(p.memory_info().rss for p in procs) / 1_048_576
+            heap = driver.execute_script(
+                "return performance.memory ? performance.memory.usedJSHeapSize : 0"
+            )
+            return (heap or 0) / 1_048_576
+        except Exception:
+            return 0
+
+    def _healthy(self, browser):
+        try:
+            browser.driver.execute_script("return document.readyState")
+            return True
+        except Exception:
+            return False
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        if self._reserve():
+            return self._start_reserved()
+        return self._idle.get(timeout=self.lease_timeout)
+
+    def warm(self):
+        """Start browsers until the pool holds `size` sessions"""
+        while self._reserve():
+            self._idle.put(self._start_reserved())
+
+    @contextmanager
+    def lease(self):
+        """Yield a healthy driver; it goes back to the pool (or is recycled) afterwards"""
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+
+        start = time.perf_counter()
+        while True:
+            browser = self._acquire()
+            if not browser.uses or self._healthy(browser):
+                break
+            print("⚠️ Pooled browser failed health check, restarting it")
+            self._retire(browser)
+
+        if browser.uses:
+            self._reused += 1
+        browser.uses += 1
+        self._lease_ms.append((time.perf_counter() - start) * 1000)
+
+        try:
+            yield browser.driver
+        finally:
+            self._release(browser)
+
+    def _release(self, browser):
+        growth = self._memory_mb(browser.driver) - browser.baseline_mb
+        if (self._closed or browser.uses >= self.max_uses
+                or (self.max_memory_growth_mb and growth > self.max_memory_growth_mb)):
+            self._recycled += 1
+            self._retire(browser)
+        else:
+            self._idle.put(browser)
+
+    def stats(self):
+        """Startup versus reuse timings for this pool"""
+        def avg(values):
+            return round(sum(values) / len(values), 1) if values else 0
+
+        return {
+            "size": self.size,
+            "alive": self._created,
+            "idle": self._idle.qsize(),
+            "started": len(self._startup_ms),
+            "startup_ms_avg": avg(self._startup_ms),
+            "leases": len(self._lease_ms),
+            "reused": self._reused,
+            "lease_ms_avg": avg(self._lease_ms),
+            "recycled": self._recycled,
+        }
+
+    def close(self):
+        """Quit every idle browser; leased ones are quit when they are released"""
+        self._closed = True
+        while True:
+            try:
+                self._retire(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name, factory, **kwargs):
+    """Return the process-wide pool called `name`, creating it on first use"""
+    with _pools_lock:
+        if name not in _pools:
+            _pools[name] = BrowserPool(factory, **kwargs)
+        return _pools[name]
+
+
+def close_pool(name):
+    """Quit the browsers of pool `name` and forget it; the next get_pool starts a fresh one"""
+    with _pools_lock:
+        pool = _pools.pop(name, None)
+    if pool:
+        pool.close()
+
+
+def close_all_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+atexit.register(close_all_pools)
@@ -0,0 +1,215 @@
+"""Sidecar offset index for the append-only trend CSVs.
+
+`trends.csv.idx` holds the row count, the last timestamp and, for every
+snapshot (one scraper run), its byte offset, timestamp and first row number.
+The writer refreshes it right after each append by scanning only the new
+bytes. The index also stores the CSV's inode, the indexed size and a hash
+of the last indexed bytes; if the CSV was edited, truncated or replaced
+outside the writer these no longer match and the index is rebuilt.
+"""
+import csv
+import hashlib
+import io
+import json
+import mmap
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+INDEX_VERSION = 1
+SNAPSHOT_GAP_SEC = 60  # consecutive rows further apart than this belong to different runs
+FINGERPRINT_BYTES = 4096
+
+
+def _fingerprint(f, size):
+    """Hash of the last FINGERPRINT_BYTES before `size`"""
+    start = max(0, size - FINGERPRINT_BYTES)
+    f.seek(start)
+    return hashlib.sha1(f.read(size - start)).hexdigest()
+
+
+def _iter_rows(data):
+    """Yield (start, end, first field) of each complete CSV row in `data`; quoted newlines stay inside a row"""
+    start = pos = 0
+    in_quotes = False
+    while True:
+        newline = data.find(b"\n", pos)
+        if newline < 0:
+            return
+        if data.count(b'"', pos, newline) % 2:
+            in_quotes = not in_quotes
+        pos = newline + 1
+        if not in_quotes:
+            comma = data.find(b",", start, newline)
+            first = data[start:comma if comma >= 0 else newline]
+            yield start, pos, first.decode("utf-8", "replace").strip()
+            start = pos
+
+
+class CsvIndex:
+    def __init__(self, path):
+        self.path = path
+        self.index_path = f"{path}.idx"
+        self.data = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _empty(inode=None):
+        return {"version": INDEX_VERSION, "inode": inode, "size": 0, "fingerprint": None,
+                "header_end": None, "rows": 0, "last_timestamp": None, "snapshots": []}
+
+    def _load(self):
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                return data
+        except (OSError, ValueError):
+            pass
+        return self._empty()
+
+    def _save(self):
+        fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(self.index_path)}.", suffix=".tmp",
+                                   dir=os.path.dirname(os.path.abspath(self.index_path)))
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, separators=(",", ":"))
+            os.replace(tmp, self.index_path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+    def refresh(self):
+        """Bring the index up to date: nothing to do, scan the appended bytes, or rebuild"""
+        with self._lock:
+            if self.data is None:
+                self.data = self._load()
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                self.data = self._empty()
+                return self.data
+
+            with open(self.path, "rb") as f:
+                data = self.data
+                intact = (data["inode"] == st.st_ino and data["size"] <= st.st_size
+                          and data["fingerprint"] == _fingerprint(f, data["size"]))
+                if intact and data["size"] == st.st_size:
+                    return data
+                if not intact:
+                    data = self.data = self._empty(st.st_ino)
+                base = data["size"]
+                f.seek(base)
+                self._scan(f.read(st.st_size - base), base)
+                data["fingerprint"] = _fingerprint(f, data["size"])
+            self._save()
+            return data
+
+    def _scan(self, chunk, base):
+        data = self.data
+        last = datetime.fromisoformat(data["last_timestamp"]) if data["last_timestamp"] else None
+        for start, end, first in _iter_rows(chunk):
+            # A partial last row (writer still busy or crashed) is picked up on the next refresh
+            data["size"] = base + end
+            if data["header_end"] is None:
+                data["header_end"] = base + end
+                continue
+            try:
+                ts = datetime.fromisoformat(first)
+            except ValueError:
+                continue
+            if last is None or (ts - last).total_seconds() > SNAPSHOT_GAP_SEC:
+                data["snapshots"].append([base + start, first, data["rows"]])
+            data["rows"] += 1
+            data["last_timestamp"], last = first, ts
+
+    def _read_rows(self, start, end):
+        """Parse the rows in bytes [start, end) of the mmap'ed CSV"""
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            text = (m[:self.data["header_end"]] + m[start:end]).decode("utf-8")
+        return list(csv.DictReader(io.StringIO(text, newline="")))
+
+    def status(self):
+        data = self.refresh()
+        latest = data["snapshots"][-1] if data["snapshots"] else None
+        return {
+            "rows": data["rows"],
+            "snapshots": len(data["snapshots"]),
+            "last_timestamp": data["last_timestamp"],
+            "latest_snapshot": latest and {"timestamp": latest[1], "rows": data["rows"] - latest[2]},
+        }
+
+    def snapshot(self, i):
+        """Rows of snapshot `i` (negative counts from the end)"""
+        data = self.refresh()
+        snapshots = data["snapshots"]
+        i = range(len(snapshots))[i]
+        end = snapshots[i + 1][0] if i + 1 < len(snapshots) else data["size"]
+        return self._read_rows(snapshots[i][0], end)
+
+    def latest_snapshot(self):
+        return self.snapshot(-1) if self.refresh()["snapshots"] else []
+
+    def tail(self, n):
+        """The last `n` rows; only the snapshots that contain them are read"""
+        data = self.refresh()
+        if n <= 0 or not data["rows"]:
+            return []
+        first_row = max(0, data["rows"] - n)
+        start = next((offset for offset, _, row in reversed(data["snapshots"]) if row <= first_row),
+                     data["header_end"])
+        return self._read_rows(start, data["size"])[-n:]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def index_for(path):
+    """Shared CsvIndex per file, so the index is loaded from disk once"""
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = CsvIndex(path)
+        return _indexes[path]
+
+
+def refresh(path):
+    return index_for(path).refresh()
+
+
+def benchmark_index(path="trends.csv", repeat=20):
+    """Status and latest-snapshot lookups: full CSV scan versus the sidecar index"""
+    def full_scan():
+        with open(path, encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+        latest = [r for r in rows if r["timestamp"][:16] == rows[-1]["timestamp"][:16]]
+        return len(rows), rows[-1]["timestamp"], len(latest)
+
+    def indexed():
+        index = index_for(path)
+        status = index.status()
+        return status["rows"], status["last_timestamp"], len(index.latest_snapshot())
+
+    def timed(func):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return round(best * 1000, 3), result
+
+    start = time.perf_counter()
+    index_for(path).refresh()
+    print(f"Index for {path} ({os.path.getsize(path) / 1024:.0f} KB) ready in {(time.perf_counter() - start) * 1000:.1f} ms")
+    scan_ms, scan_result = timed(full_scan)
+    index_ms, index_result = timed(indexed)
+    print(f"   full scan {scan_ms} ms {scan_result} | index {index_ms} ms {index_result}")
+
+
+if __name__ == "__main__":
+    for csv_file in sys.argv[1:] or ["trends.csv", "twitter_trends.csv"]:
+        benchmark_index(csv_file)
@@ -0,0 +1,174 @@
+from contextlib import contextmanager
+import csv
+import io
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, in-process locking only
+    fcntl = None
+
+# When enabled (daemon mode) append descriptors stay open between runs;
+# one-shot scripts open and close them for every write.
+keep_open = False
+
+_fds = {}
+_last_used = {}
+_lock = threading.Lock()
+
+
+def _open(filename):
+    return os.open(filename, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+
+
+def _same_file(fd, filename):
+    try:
+        return os.fstat(fd).st_ino == os.stat(filename).st_ino
+    except FileNotFoundError:
+        return False
+
+
+@contextmanager
+def _append_fd(filename):
+    """Yield an O_APPEND descriptor for `filename`; callers hold _lock"""
+    if not keep_open:
+        fd = _open(filename)
+        try:
+            yield fd
+        finally:
+            os.close(fd)
+        return
+
+    fd = _fds.get(filename)
+    # Reopen if the file was moved, replaced or deleted behind our back
+    if fd is None or not _same_file(fd, filename):
+        if fd is not None:
+            os.close(fd)
+        fd = _fds[filename] = _open(filename)
+    _last_used[filename] = time.time()
+    yield fd
+
+
+def _flock(fd, operation):
+    """flock with an operation name ('LOCK_EX', 'LOCK_SH', 'LOCK_UN'); no-op without fcntl"""
+    if fcntl:
+        fcntl.flock(fd, getattr(fcntl, operation))
+
+
+@contextmanager
+def locked(filenames, shared=False):
+    """Hold advisory locks on `filenames` (e.g. while git stages them) so no writer appends meanwhile;
+    yields {filename: fd} of the files that exist"""
+    fds = {}
+    try:
+        for filename in sorted(set(filenames)):
+            if not os.path.exists(filename):
+                continue
+            fd = fds[filename] = os.open(filename, os.O_RDONLY)
+            _flock(fd, "LOCK_SH" if shared else "LOCK_EX")
+        yield fds
+    finally:
+        for fd in fds.values():
+            os.close(fd)  # closing releases the lock
+
+
+def _pending_path(filename):
+    return f"{filename}.pending"
+
+
+def _repair_tail(fd, filename):
+    """Undo our own interrupted append, or end a last line left open by someone else; returns the file size.
+
+    Only a write recorded in the `.pending` marker (same inode, file grown past
+    its start but short of its end) is truncated. Any other unterminated line,
+    e.g. from a hand edit, is kept and closed with a newline.
+    """
+    size = os.fstat(fd).st_size
+    try:
+        with open(_pending_path(filename)) as f:
+            inode, start, end = map(int, f.read().split())
+    except (OSError, ValueError):
+        inode = start = end = -1
+    if inode == os.fstat(fd).st_ino and start < size < end:
+        os.ftruncate(fd, start)
+        return start
+    if size and os.pread(fd, 1, size - 1) != b"\n":
+        _write_all(fd, b"\r\n")
+        size += 2
+    return size
+
+
+def _mark_pending(filename, fd, start, length, fsync):
+    """Record where this append starts and ends, so a crash mid-write can be undone exactly"""
+    with open(_pending_path(filename), "w") as f:
+        f.write(f"{os.fstat(fd).st_ino} {start} {start + length}")
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _write_all(fd, data):
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def format_rows(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def _refresh_index(filename):
+    """Update the csv_index sidecar; a stale index is rebuilt on the next read, so errors are only logged"""
+    try:
+        from csv_index import refresh
+        refresh(filename)
+    except Exception as e:
+        print(f"⚠️ Could not update the index for {filename}: {e}")
+
+
+def append_rows(filenames, header, rows, fsync=True, indexed=()):
+    """Append `rows` to every file in `filenames` with one locked write per file.
+
+    Rows are formatted once. Each file is flock'ed, a run torn by a crashed
+    writer is truncated (see _repair_tail), the header is added to empty
+    files, and the data is fsync'd before the lock is released, so concurrent
+    runs (daemon, bot fallback, cron) never interleave partial rows. Files
+    listed in `indexed` get their csv_index sidecar updated while still
+    locked; an index error is logged and never fails the write.
+    """
+    body = format_rows(rows)
+    header_bytes = format_rows([header])
+    with _lock:
+        for filename in filenames:
+            with _append_fd(filename) as fd:
+                _flock(fd, "LOCK_EX")
+                try:
+                    size = _repair_tail(fd, filename)
+                    data = body if size else header_bytes + body
+                    _mark_pending(filename, fd, size, len(data), fsync)
+                    _write_all(fd, data)
+                    if fsync:
+                        os.fsync(fd)
+                    os.remove(_pending_path(filename))
+                    if filename in indexed:
+                        _refresh_index(filename)
+                finally:
+                    _flock(fd, "LOCK_UN")
+
+
+def close_idle(max_idle_sec):
+    """Close cached descriptors not written for `max_idle_sec` (e.g. yesterday's daily file)"""
+    cutoff = time.time() - max_idle_sec
+    with _lock:
+        for filename in list(_fds):
+            if _last_used.get(filename, 0) < cutoff:
+                os.close(_fds.pop(filename))
+                _last_used.pop(filename, None)
+
+
+def close_all():
+    close_idle(-1)
@@ -0,0 +1,188 @@
+"""Trend history lookups: when a query first trended, for how long, and how big.
+
+Backed by the `trend_hours` table in the trend store: one row per normalised
+query, hour bucket and source, upserted in the same transaction as each
+snapshot. Every lookup is a primary-key range scan on (norm, bucket), so its
+cost depends on how long one query trended, not on the size of the archive.
+`python history.py rebuild` recomputes the table from the stored snapshots.
+"""
+from datetime import datetime, timedelta
+import sys
+import time
+
+from text_normalize import normalize
+from trend_store import HOURS_UPSERT, get_store, hour_rows
+
+# trend_hours.bucket: scraped_at truncated to the hour
+BUCKET_FORMAT = "%Y-%m-%dT%H"
+
+
+def rebuild_index(store=None):
+    """Recompute trend_hours from the snapshots and trends tables; returns the row count"""
+    store = store or get_store()
+    rows = store.conn.execute(
+        "SELECT s.id, s.source, s.scraped_at, t.rank, t.query, t.norm, t.volume "
+        "FROM snapshots s JOIN trends t ON t.snapshot_id = s.id ORDER BY s.id").fetchall()
+    params, snapshot, trends = [], None, []
+    for snapshot_id, source, scraped_at, rank, query, norm, volume in rows:
+        if snapshot and snapshot[0] != snapshot_id:
+            params.extend(hour_rows(snapshot[1], snapshot[2], trends))
+            trends = []
+        snapshot = (snapshot_id, source, scraped_at)
+        trends.append((rank, query, norm, volume))
+    if snapshot:
+        params.extend(hour_rows(snapshot[1], snapshot[2], trends))
+
+    with store._lock:
+        store.conn.execute("BEGIN IMMEDIATE")
+        try:
+            store.conn.execute("DELETE FROM trend_hours")
+            store.conn.executemany(HOURS_UPSERT, params)
+            store.conn.execute("COMMIT")
+        except BaseException:
+            store.conn.execute("ROLLBACK")
+            raise
+    return store.conn.execute("SELECT COUNT(*) FROM trend_hours").fetchone()[0]
+
+
+def _conn(store):
+    store = store or get_store()
+    if store is None:
+        raise RuntimeError("Trend history needs the SQLite store; TRENDS_DB is empty")
+    return store.conn
+
+
+def _filter(query, source):
+    sql, params = "norm = ?", [normalize(query)]
+    if source:
+        sql += " AND source = ?"
+        params.append(source)
+    return sql, params
+
+
+def first_seen(query, source=None, store=None):
+    """Timestamp of the first snapshot containing `query`, or None"""
+    where, params = _filter(query, source)
+    return _conn(store).execute(f"SELECT MIN(first_seen) FROM trend_hours WHERE {where}", params).fetchone()[0]
+
+
+def lifetime(query, source=None, store=None):
+    """First/last sighting, number of distinct hours and snapshots `query` trended in, or None"""
+    where, params = _filter(query, source)
+    first, last, hours, snapshots = _conn(store).execute(
+        f"SELECT MIN(first_seen), MAX(last_seen), COUNT(DISTINCT bucket), SUM(snapshots) FROM trend_hours WHERE {where}",
+        params).fetchone()
+    if first is None:
+        return None
+    return {"first_seen": first, "last_seen": last, "hours": hours, "snapshots": snapshots}
+
+
+def peak(query, source=None, store=None):
+    """Highest parsed volume (with when and where it was seen) and best rank, or None"""
+    where, params = _filter(query, source)
+    conn = _conn(store)
+    best_rank = conn.execute(f"SELECT MIN(best_rank) FROM trend_hours WHERE {where}", params).fetchone()[0]
+    row = conn.execute(
+        f"SELECT peak_volume, peak_at, source FROM trend_hours WHERE {where} AND peak_volume IS NOT NULL "
+        "ORDER BY peak_volume DESC LIMIT 1", params).fetchone()
+    if row is None and best_rank is None:
+        return None
+    volume, at, peak_source = row or (None, None, None)
+    return {"volume": volume, "at": at, "source": peak_source, "best_rank": best_rank}
+
+
+def series(query, start=None, end=None, source=None, store=None):
+    """Hourly rows for `query` between ISO timestamps `start` and `end` (exclusive), oldest first"""
+    where, params = _filter(query, source)
+    if start:
+        where += " AND bucket >= ?"
+        params.append(start[:13])
+    if end:
+        where += " AND bucket < ?"
+        params.append(end[:13])
+    keys = ("bucket", "source", "query", "snapshots", "best_rank", "peak_volume")
+    return [dict(zip(keys, row)) for row in _conn(store).execute(
+        f"SELECT {', '.join(keys)} FROM trend_hours WHERE {where} ORDER BY bucket, source", params)]
+
+
+def top_n(window=24, n=10, source=None, end=None, store=None):
+    """Queries that stayed longest in the `window` hours before `end` (an ISO
+    timestamp, default: after the newest indexed hour), ties broken by peak volume"""
+    conn = _conn(store)
+    source_sql = " AND source = ?" if source else ""
+    source_params = [source] if source else []
+    if end is None:
+        end = conn.execute(f"SELECT MAX(bucket) FROM trend_hours WHERE 1 = 1{source_sql}", source_params).fetchone()[0]
+        if end is None:
+            return []
+        end_hour = datetime.strptime(end, BUCKET_FORMAT) + timedelta(hours=1)
+    else:
+        end_hour = datetime.strptime(end[:13], BUCKET_FORMAT)
+    end_bucket = end_hour.strftime(BUCKET_FORMAT)
+    start_bucket = (end_hour - timedelta(hours=window)).strftime(BUCKET_FORMAT)
+
+    keys = ("norm", "query", "hours", "snapshots", "best_rank", "peak_volume")
+    rows = conn.execute(
+        "SELECT norm, MAX(query), COUNT(DISTINCT bucket) AS hours, SUM(snapshots), MIN(best_rank), MAX(peak_volume) AS peak "
+        f"FROM trend_hours WHERE bucket >= ? AND bucket < ?{source_sql} "
+        "GROUP BY norm ORDER BY hours DESC, peak DESC, norm LIMIT ?",
+        [start_bucket, end_bucket, *source_params, n])
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def benchmark_history(query="togg", directory=".", repeat=20):
+    """The same questions answered by scanning every export versus the trend_hours index"""
+    from trend_store import iter_export_snapshots, volume_locale
+    from volume_parse import parse_volume
+
+    target = normalize(query)
+
+    def scan():
+        seen, hours, best = [], set(), None
+        for snap in iter_export_snapshots(directory):
+            for row in snap["rows"]:
+                if normalize(row["query"]) != target:
+                    continue
+                seen.append(snap["scraped_at"])
+                hours.add(snap["scraped_at"][:13])
+                if row.get("volume_text"):
+                    volume = parse_volume(row["volume_text"], volume_locale(snap["source"], snap["geo"]))
+                    best = volume if best is None else max(best, volume)
+        return min(seen, default=None), len(hours), best
+
+    def indexed():
+        life = lifetime(query) or {}
+        top = peak(query) or {}
+        return life.get("first_seen"), life.get("hours", 0), top.get("volume")
+
+    def timed(func, times):
+        best = None
+        for _ in range(times):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return round(best * 1000, 3), result
+
+    _conn(None)
+    scan_ms, scan_result = timed(scan, 3)
+    index_ms, index_result = timed(indexed, repeat)
+    print(f"History of '{query}' (first seen, hours, peak volume):")
+    print(f"   export scan {scan_ms} ms {scan_result}")
+    print(f"   trend_hours {index_ms} ms {index_result}")
+    window_ms, top = timed(lambda: top_n(24, 5), repeat)
+    print(f"   top_n(24h) {window_ms} ms: {[t['query'] for t in top]}")
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "rebuild":
+        print(f"trend_hours rebuilt: {rebuild_index()} rows")
+    elif command == "bench":
+        benchmark_history(*sys.argv[2:3])
+    elif command:
+        print(f"{command}: {lifetime(command)}, peak {peak(command)}")
+        for row in series(command):
+            print(f"   {row['bucket']} {row['source']:8s} x{row['snapshots']} rank {row['best_rank']} volume {row['peak_volume']}")
+    else:
+        print("usage: python history.py rebuild | bench [query] | <query>")
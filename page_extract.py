@@ -0,0 +1,169 @@
+from datetime import datetime
+from typing import List, TypedDict
+import os
+import time
+
+from twitter_capture import make_trend
+
+
+class TrendCard(TypedDict):
+    query: str
+    volume: str
+
+
+# Collects every query/volume pair in a single execute_script call.
+# Volumes are looked up inside the same card as the query (the <tr> row, or
+# the nearest ancestor that holds only this one query) so a card without a
+# volume can never shift the volumes of the cards after it.
+GOOGLE_CARDS_JS = """
+const out = [];
+document.querySelectorAll('div.mZ3RIc').forEach(function (q) {
+    const query = (q.innerText || q.textContent || '').trim();
+    if (!query) return;
+    let card = q.closest('tr');
+    if (!card) {
+        card = q.parentElement;
+        while (card && card.parentElement &&
+               card.parentElement.querySelectorAll('div.mZ3RIc').length === 1) {
+            card = card.parentElement;
+        }
+    }
+    const vol = card ? card.querySelector('div.lqv0Cb') : null;
+    out.push([query, vol ? (vol.innerText || vol.textContent || '').trim() : '']);
+});
+return out;
+"""
+
+
+def extract_google_cards(driver) -> List[TrendCard]:
+    """Return every (query, volume) card currently in the DOM in one round trip"""
+    rows = driver.execute_script(GOOGLE_CARDS_JS) or []
+    return [TrendCard(query=query, volume=volume) for query, volume in rows]
+
+
+def extract_google_cards_legacy(driver) -> List[TrendCard]:
+    """Old per-element path: two find_elements calls plus one .text call per element"""
+    from selenium.webdriver.common.by import By
+
+    queries = [el.text.strip() for el in driver.find_elements(By.CSS_SELECTOR, "div.mZ3RIc") if el.text.strip()]
+    volumes = [el.text.strip() for el in driver.find_elements(By.CSS_SELECTOR, "div.lqv0Cb") if el.text.strip()]
+    return [
+        TrendCard(query=query, volume=volumes[idx] if idx < len(volumes) else "")
+        for idx, query in enumerate(queries)
+    ]
+
+
+# One call for every trend block: for each <span> its own text nodes (what the
+# legacy XPath contains(text(), ...) checks) and its rendered text (what .text returns).
+TWITTER_TRENDS_JS = """
+const out = [];
+document.querySelectorAll("div[data-testid='trend']").forEach(function (block) {
+    const spans = [];
+    block.querySelectorAll('span').forEach(function (s) {
+        let own = '';
+        s.childNodes.forEach(function (n) { if (n.nodeType === 3) own += n.textContent; });
+        spans.push([own, (s.innerText || s.textContent || '').trim()]);
+    });
+    out.push(spans);
+});
+return out.slice(0, arguments[0]);
+"""
+
+
+def parse_trend_payload(blocks):
+    """Turn the per-block span payload into trend dicts, same rules as parse_trend_block"""
+    trends = []
+    for rank, spans in enumerate(blocks, start=1):
+        label = next((text for own, text in spans if "Trending" in own), None)
+        posts = next((text for own, text in spans if "posts" in own), None)
+        name = next(
+            (text for _, text in spans
+             if text and text not in {label, posts} and not text.isdigit() and text != "·"),
+            None
+        )
+        if name:
+            trends.append(make_trend(rank, name, label, posts))
+    return trends
+
+
+def extract_twitter_trends(driver, limit=50):
+    """Rank, label, name, posts and URL for every trend block in one round trip"""
+    return parse_trend_payload(driver.execute_script(TWITTER_TRENDS_JS, limit) or [])
+
+
+def extract_twitter_trends_legacy(driver, limit=50):
+    """Old per-element path: parse_trend_block on every block"""
+    from selenium.webdriver.common.by import By
+    from twitter_trends_scraper import parse_trend_block
+
+    trends = []
+    for i, element in enumerate(driver.find_elements(By.CSS_SELECTOR, "div[data-testid='trend']")[:limit], start=1):
+        trend = parse_trend_block(element, i)
+        if trend["name"]:
+            trends.append(trend)
+    return trends
+
+
+def count_round_trips(driver):
+    """Wrap driver.execute so every WebDriver command increments driver.round_trips"""
+    if getattr(driver, "round_trips", None) is not None:
+        return driver
+    original_execute = driver.execute
+    driver.round_trips = 0
+
+    def counting_execute(driver_command, params=None):
+        driver.round_trips += 1
+        return original_execute(driver_command, params)
+
+    driver.execute = counting_execute
+    return driver
+
+
+def benchmark_extraction(fixture="fixtures/google_trends_daily.html", runs=10, extractors=None):
+    """Compare round trips and wall time per snapshot of the legacy and batched extractors"""
+    from selenium import webdriver
+
+    extractors = extractors or (("legacy", extract_google_cards_legacy), ("batched", extract_google_cards))
+
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+
+    driver = webdriver.Chrome(options=options)
+    try:
+        driver.get("file://" + os.path.abspath(fixture))
+        count_round_trips(driver)
+
+        results = {}
+        for name, extractor in extractors:
+            driver.round_trips = 0
+            start = time.perf_counter()
+            for _ in range(runs):
+                items = extractor(driver)
+            elapsed = time.perf_counter() - start
+            results[name] = {
+                "items": len(items),
+                "round_trips": driver.round_trips // runs,
+                "ms_per_snapshot": round(elapsed / runs * 1000, 2),
+            }
+
+        print(f"Extraction benchmark ({fixture}, {runs} runs) - {datetime.now().isoformat()}")
+        for name, r in results.items():
+            print(f"   {name:8s} items={r['items']:3d} round_trips={r['round_trips']:4d} ms/snapshot={r['ms_per_snapshot']}")
+        return results
+    finally:
+        driver.quit()
+
+
+def benchmark_twitter_extraction(fixture="fixtures/twitter_page_source.html", runs=5):
+    """Per-element parse_trend_block versus the single injected extractor on a saved page"""
+    return benchmark_extraction(fixture, runs, (
+        ("legacy", extract_twitter_trends_legacy),
+        ("batched", extract_twitter_trends),
+    ))
+
+
+if __name__ == "__main__":
+    benchmark_extraction()
+    benchmark_twitter_extraction()
@@ -0,0 +1,110 @@
+import os
+import re
+
+from text_normalize import normalize, trie_regex
+
+BLACKLIST_FILE = os.getenv("TRENDS_BLACKLIST") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "query_blacklist.txt")
+
+
+def load_terms(path=BLACKLIST_FILE):
+    """Normalised blacklist terms from a text file (one per line, # comments)"""
+    with open(path, encoding="utf-8") as f:
+        terms = (normalize(line.split("#", 1)[0]) for line in f)
+        return sorted({term for term in terms if term})
+
+
+def compile_terms(terms):
+    """One regex for all terms; word terms only match whole words, symbols match anywhere"""
+    words = [t for t in terms if re.match(r"\w", t) and re.search(r"\w$", t)]
+    others = [t for t in terms if t not in words]
+    parts = []
+    if words:
+        parts.append(rf"(?<!\w)(?:{trie_regex(words)})(?!\w)")
+    if others:
+        parts.append("|".join(re.escape(t) for t in sorted(others, key=len, reverse=True)))
+    return re.compile("|".join(parts) if parts else r"(?!)")
+
+
+class QueryBlacklist:
+    def __init__(self, terms=None, path=BLACKLIST_FILE):
+        self.terms = load_terms(path) if terms is None else sorted({normalize(t) for t in terms if t})
+        self.pattern = compile_terms(self.terms)
+
+    def match(self, norm):
+        """The blacklisted term found in a normalised query, or None"""
+        m = self.pattern.search(norm)
+        return m.group(0) if m else None
+
+    def filter(self, records):
+        """Generator stage: pass through records whose 'norm' has no blacklisted term"""
+        search = self.pattern.search
+        for record in records:
+            if not search(record["norm"]):
+                yield record
+
+
+_default = None
+
+
+def default_blacklist():
+    """Blacklist loaded from BLACKLIST_FILE, compiled once per process"""
+    global _default
+    if _default is None:
+        _default = QueryBlacklist()
+    return _default
+
+
+def benchmark_blacklist(corpus_path="fixtures/blacklist_corpus.json", repeat=5):
+    """Compare the old substring check with the compiled matcher on the test corpus"""
+    import json
+    import time
+
+    with open(corpus_path, encoding="utf-8") as f:
+        corpus = json.load(f)
+    samples = [(q, False) for q in corpus["keep"]] + [(q, True) for q in corpus["noise"]]
+    # Corpus repeated so timings are not dominated by timer noise
+    texts = [q for q, _ in samples] * 20
+
+    blacklist = QueryBlacklist()
+
+    def legacy(query):
+        # As clean_trends_data did it: list rebuilt and substring-matched per query
+        return any(word in query.lower() for word in [
+            'google', 'trends', 'keşfet', 'oturum', 'ara', 'search',
+            'maps', '●', 'saat önce', 'dakika önce'
+        ])
+
+    def compiled(query):
+        # Timed with normalize(): legacy works on the raw query as well
+        return blacklist.match(normalize(query)) is not None
+
+    results = {}
+    for name, check in (("legacy", legacy), ("compiled", compiled)):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for text in texts:
+                check(text)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        wrong_drops = [q for q, noise in samples if not noise and check(q)]
+        missed = [q for q, noise in samples if noise and not check(q)]
+        results[name] = {
+            "us_per_item": round(best / len(texts) * 1e6, 2),
+            "wrong_drops": wrong_drops,
+            "missed_noise": missed,
+        }
+
+    print(f"Blacklist benchmark: {len(corpus['keep'])} real queries, {len(corpus['noise'])} UI strings")
+    for name, r in results.items():
+        print(f"   {name:8s} {r['us_per_item']} µs/item, "
+              f"{len(r['wrong_drops'])} real queries dropped, {len(r['missed_noise'])} UI strings kept")
+        for q in r["wrong_drops"][:10]:
+            print(f"      dropped: {q}")
+        for q in r["missed_noise"]:
+            print(f"      kept: {q}")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_blacklist()
@@ -0,0 +1,165 @@
+"""Fetch real top/rising related queries from Google Trends over asyncio.
+
+All requests of a batch share one aiohttp session (keep-alive connections,
+cookies, redirects) and one token bucket; 429/5xx responses and dropped
+connections are retried with jittered exponential backoff (honouring
+Retry-After). Results have the same {'top': [...], 'rising': [...]} shape as
+related_queries.generate_related_queries. Needs aiohttp (`pip install aiohttp`).
+"""
+import asyncio
+import json
+import os
+import random
+import time
+from urllib.parse import urlencode
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from trends_fetch import HTTP_HEADERS
+
+RELATED_API_BASE = os.getenv("RELATED_API_BASE", "https://trends.google.com")
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+JSON_HEADERS = {"User-Agent": HTTP_HEADERS["User-Agent"], "Accept": "application/json, text/plain, */*"}
+
+
+def _require_aiohttp():
+    if aiohttp is None:
+        raise RuntimeError("RELATED_BACKEND=google needs aiohttp: pip install aiohttp")
+
+
+class TokenBucket:
+    """Allow `rate` requests per second on average, with bursts of up to `capacity`"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def parse_google_json(body):
+    """Google's API bodies start with an anti-XSSI prefix like )]}',"""
+    text = body.decode("utf-8")
+    return json.loads(text[text.index("{"):])
+
+
+def ranked_to_related(data, max_items=5):
+    """relatedsearches payload -> {'top': [{query, value}], 'rising': [...]}"""
+    ranked = data.get("default", {}).get("rankedList", [])
+    lists = [[{"query": k["query"], "value": int(k.get("value", 0))} for k in r.get("rankedKeyword", [])]
+             for r in ranked[:2]]
+    lists += [[]] * (2 - len(lists))
+    return {"top": lists[0][:max_items], "rising": lists[1][:max_items]}
+
+
+class RelatedQueriesFetcher:
+    def __init__(self, geo="TR", hl="tr", base_url=None, rate=2.0, burst=4, concurrency=4,
+                 retries=4, backoff=1.0, timeout=15, timeframe="now 1-d", tz=-180):
+        self.geo = geo
+        self.hl = hl
+        self.base_url = (base_url or RELATED_API_BASE).rstrip("/")
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.timeframe = timeframe
+        self.tz = tz
+        self.stats = {}
+
+    async def _get_json(self, session, bucket, path, params):
+        url = f"{self.base_url}{path}?{urlencode(params)}"
+        for attempt in range(self.retries + 1):
+            await bucket.acquire()
+            self.stats["requests"] += 1
+            headers = {}
+            try:
+                async with session.get(url) as response:
+                    status, headers, body = response.status, response.headers, await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+            else:
+                if status == 200:
+                    return parse_google_json(body)
+                if status not in RETRY_STATUSES:
+                    raise RuntimeError(f"HTTP {status} for {path}")
+                error = RuntimeError(f"HTTP {status} for {path}")
+                self.stats[f"http_{status}"] = self.stats.get(f"http_{status}", 0) + 1
+
+            if attempt == self.retries:
+                raise error
+            self.stats["retries"] += 1
+            delay = random.uniform(0, self.backoff * 2 ** attempt)
+            retry_after = headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                delay += int(retry_after)
+            await asyncio.sleep(delay)
+
+    async def fetch_one(self, session, bucket, query):
+        """Explore request for the widget token, then the related-searches widget"""
+        common = {"hl": self.hl, "tz": self.tz}
+        explore = await self._get_json(session, bucket, "/trends/api/explore", {
+            **common,
+            "req": json.dumps({
+                "comparisonItem": [{"keyword": query, "geo": self.geo, "time": self.timeframe}],
+                "category": 0, "property": "",
+            }, ensure_ascii=False),
+        })
+        widget = next((w for w in explore.get("widgets", []) if w.get("id") == "RELATED_QUERIES"), None)
+        if not widget:
+            raise RuntimeError(f"no related-queries widget for {query!r}")
+
+        data = await self._get_json(session, bucket, "/trends/api/widgetdata/relatedsearches", {
+            **common,
+            "req": json.dumps(widget["request"], ensure_ascii=False),
+            "token": widget["token"],
+        })
+        return ranked_to_related(data)
+
+    async def fetch_all(self, queries):
+        """Related queries per query, in order; failed queries yield the exception instead"""
+        _require_aiohttp()
+        self.stats = {"requests": 0, "retries": 0, "connections": 0}
+        bucket = TokenBucket(self.rate, self.burst)
+        limit = asyncio.Semaphore(self.concurrency)
+
+        async def connection_opened(session, context, params):
+            self.stats["connections"] += 1
+
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_end.append(connection_opened)
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit_per_host=self.concurrency),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers=JSON_HEADERS, trace_configs=[trace],
+        )
+
+        async def one(query):
+            async with limit:
+                return await self.fetch_one(session, bucket, query)
+
+        async with session:
+            return await asyncio.gather(*(one(q) for q in queries), return_exceptions=True)
+
+    def fetch_batch(self, trends):
+        """Blocking wrapper for a list of {'query', ...} records"""
+        start = time.perf_counter()
+        results = asyncio.run(self.fetch_all([t["query"] for t in trends]))
+        self.stats["ms"] = int((time.perf_counter() - start) * 1000)
+        return results
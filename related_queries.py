@@ -0,0 +1,97 @@
+import os
+import random
+
+from text_normalize import turkish_lower
+from volume_parse import parse_volume
+
+# Word -> expansions; the first three feed "top", the next three "rising"
+EXPANSIONS = {
+    'spor': ['maç', 'skor', 'sonuç', 'haber', 'lig', 'takım'],
+    'maç': ['özet', 'gol', 'iddaa', 'canlı', 'izle', 'sonuç'],
+    'basket': ['nba', 'basketbol', 'maç', 'skor', 'oyuncu'],
+    'futbol': ['transfer', 'süper lig', 'haber', 'analiz'],
+    'sonuç': ['açıklandı', 'sorgulama', 'öğrenme', 'e-devlet'],
+    'ne zaman': ['saat kaçta', 'tarih', 'yeri', 'bilet'],
+    'alım': ['iş', 'kariyer', 'başvuru', 'sınav', 'memur'],
+    'adliye': ['mahkeme', 'dava', 'avukat', 'hukuk'],
+    'cuma': ['mesaj', 'kutlama', 'resimli', 'dua', 'hutbe'],
+    'oyuncu': ['film', 'dizi', 'rol', 'set', 'fragman']
+}
+
+TIME_VARIATIONS = ['son dakika', 'güncel']
+
+
+def build_index(expansions=EXPANSIONS):
+    """Precompute (top, rising) expansion lists per word"""
+    return {turkish_lower(word): (values[:3], values[3:6]) for word, values in expansions.items()}
+
+
+def _copy(related):
+    return {kind: [dict(item) for item in items] for kind, items in related.items()}
+
+
+class RelatedQueryGenerator:
+    """Synthetic related queries, scaled by trend volume.
+
+    With a seed the output depends only on (seed, query, volume), so reruns
+    and batch order do not change it. Results are memoized per
+    (query, volume, locale); every call gets its own copy.
+    """
+
+    def __init__(self, seed=None, expansions=EXPANSIONS, max_items=5, max_memo=4096):
+        self.seed = seed
+        self.index = build_index(expansions)
+        self.max_items = max_items
+        self.max_memo = max_memo
+        self._memo = {}
+
+    def _rng(self, trend, volume_text):
+        if self.seed is None:
+            return random.Random()
+        return random.Random(f"{self.seed}\x00{trend}\x00{volume_text}")
+
+    def generate(self, trend, volume_text="", locale="tr"):
+        key = (trend, volume_text, locale)
+        cached = self._memo.get(key)
+        if cached is not None:
+            return _copy(cached)
+
+        base_volume = parse_volume(volume_text, locale) or 1000  # fallback
+        words = turkish_lower(trend).split()
+
+        # dicts keep insertion order, so the kept five are stable
+        top_queries, rising_queries = {}, {}
+        for word in words:
+            top, rising = self.index.get(word, ((), ()))
+            for expansion in top:
+                top_queries[f"{trend} {expansion}"] = None
+                top_queries[f"{expansion} {trend}"] = None
+            for expansion in rising:
+                rising_queries[f"{trend} {expansion} son dakika"] = None
+                rising_queries[f"{expansion} {trend} haberleri"] = None
+        for time_var in TIME_VARIATIONS:
+            top_queries[f"{trend} {time_var}"] = None
+
+        rng = self._rng(trend, volume_text)
+        related = {
+            'top': [{"query": q, "value": int(base_volume * rng.uniform(0.4, 0.8))}
+                    for q in list(top_queries)[:self.max_items]],
+            'rising': [{"query": q, "value": int(base_volume * rng.uniform(0.8, 1.2))}
+                       for q in list(rising_queries)[:self.max_items]],
+        }
+        if len(self._memo) >= self.max_memo:
+            self._memo.clear()
+        self._memo[key] = related
+        return _copy(related)
+
+    def generate_batch(self, trends, locale="tr"):
+        """Related queries for every {'query', 'volume'} record, in order"""
+        return [self.generate(t["query"], t.get("volume", ""), locale) for t in trends]
+
+
+default_generator = RelatedQueryGenerator(seed=os.getenv("RELATED_QUERIES_SEED"))
+
+
+def generate_related_queries(trend, volume_text="", locale="tr"):
+    """Generate related queries for a given trend, scaled by volume"""
+    return default_generator.generate(trend, volume_text, locale)
@@ -0,0 +1,151 @@
+from fnmatch import fnmatchcase
+import os
+
+# URL patterns (Network.setBlockedURLs wildcard syntax) grouped by category
+BLOCK_CATEGORIES = {
+    "images": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.ico", "*.svg"],
+    "fonts": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*fonts.googleapis.com*", "*fonts.gstatic.com*"],
+    "media": ["*.mp4", "*.webm", "*.m3u8", "*.mp3", "*video.twimg.com*"],
+    "analytics": [
+        "*google-analytics.com*", "*googletagmanager.com*", "*analytics.twitter.com*",
+        "*/log_event*", "*/gen_204*", "*/jserror*", "*api.x.com/1.1/jot/*", "*twitter.com/i/jot*",
+    ],
+    "ads": ["*doubleclick.net*", "*googlesyndication.com*", "*googleadservices.com*", "*ads-twitter.com*", "*ads-api.twitter.com*"],
+}
+
+# Per-site profiles: which categories to block, extra site-specific patterns,
+# and URLs the trend cards need. Any pattern that would match an allowlisted
+# URL is dropped, since setBlockedURLs has no exception syntax.
+SITE_PROFILES = {
+    "google": {
+        "block": ["images", "fonts", "media", "analytics", "ads"],
+        "extra": ["*encrypted-tbn*.gstatic.com*", "*lh3.googleusercontent.com*"],
+        "allow": [
+            "https://trends.google.com/trends/trendingsearches/daily?geo=TR&hl=tr",
+            "https://trends.google.com/_/TrendsUi/data/batchexecute?rpcids=i0OFE",
+            "https://www.gstatic.com/_/mss/boq-trends/_/js/k=boq-trends.TrendsUi.tr.js",
+            "https://www.gstatic.com/_/mss/boq-trends/_/ss/k=boq-trends.TrendsUi.css",
+        ],
+    },
+    "twitter": {
+        "block": ["images", "fonts", "media", "analytics", "ads"],
+        "extra": ["*pbs.twimg.com*", "*abs-0.twimg.com/emoji*"],
+        "allow": [
+            "https://twitter.com/explore/tabs/trending",
+            "https://abs.twimg.com/responsive-web/client-web/main.js",
+            "https://x.com/i/api/graphql/query/ExplorePage",
+            "https://x.com/i/api/graphql/query/GenericTimelineById",
+        ],
+    },
+}
+
+
+def blocked_urls(site):
+    """Blocked URL patterns for a site profile, minus anything that hits its allowlist"""
+    profile = SITE_PROFILES[site]
+    patterns = []
+    for category in profile["block"]:
+        patterns.extend(BLOCK_CATEGORIES[category])
+    patterns.extend(profile.get("extra", []))
+    allow = profile.get("allow", [])
+    return [
+        p for p in dict.fromkeys(patterns)
+        if not any(fnmatchcase(url, p) for url in allow)
+    ]
+
+
+def blocking_enabled():
+    return os.getenv("BLOCK_RESOURCES", "1") != "0"
+
+
+def enable_blocking(driver, site):
+    """Block heavy and tracking requests for this tab through the DevTools protocol"""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls(site)})
+
+
+def disable_blocking(driver):
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})
+
+
+PAGE_METRICS_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+let bytes = nav ? nav.transferSize : 0;
+resources.forEach(function (r) { bytes += r.transferSize || 0; });
+return {
+    bytes: bytes,
+    requests: resources.length + 1,
+    load_ms: nav ? Math.round((nav.loadEventEnd || performance.now()) - nav.startTime) : 0
+};
+"""
+
+
+def page_metrics(driver):
+    """Bytes transferred, request count and load time of the current page"""
+    return driver.execute_script(PAGE_METRICS_JS)
+
+
+def measure_savings(driver, url, site, wait=None):
+    """Load `url` without and then with blocking and report both measurements"""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+
+    results = {}
+    try:
+        for label, block in (("before", False), ("after", True)):
+            if block:
+                enable_blocking(driver, site)
+            else:
+                disable_blocking(driver)
+            driver.get(url)
+            if wait:
+                wait(driver)
+            results[label] = page_metrics(driver)
+    finally:
+        driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": False})
+        if blocking_enabled():
+            enable_blocking(driver, site)
+        else:
+            disable_blocking(driver)
+
+    before, after = results["before"], results["after"]
+    saved = before["bytes"] - after["bytes"]
+    print(f"Resource blocking ({site}): {before['bytes'] / 1024:.0f} KB -> {after['bytes'] / 1024:.0f} KB "
+          f"({saved / max(before['bytes'], 1) * 100:.0f}% less), "
+          f"{before['load_ms']} ms -> {after['load_ms']} ms, "
+          f"{before['requests']} -> {after['requests']} requests")
+    return results
+
+
+def measure_site(site):
+    """Run measure_savings on a pooled browser of the google or twitter scraper
+    (`python resource_blocking.py google twitter`)"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    if site == "google":
+        from scraped_and_saved import google_pool
+        from trends_fetch import GOOGLE_PAGE_URL
+        pool, url, selector = google_pool(), GOOGLE_PAGE_URL.format(geo="TR", hl="tr"), "div.mZ3RIc"
+    else:
+        from twitter_trends_scraper import TRENDING_URL, twitter_pool
+        pool, url, selector = twitter_pool(), TRENDING_URL, "[data-testid='trend']"
+
+    def wait(driver):
+        WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+
+    with pool.lease() as driver:
+        return measure_savings(driver, url, site, wait)
+
+
+if __name__ == "__main__":
+    import sys
+    from browser_pool import close_all_pools
+
+    try:
+        for name in sys.argv[1:] or ["google"]:
+            measure_site(name)
+    finally:
+        close_all_pools()
@@ -0,0 +1,282 @@
+"""Hourly and daily rollups per source, maintained as snapshots are written.
+
+`TrendStore.save_snapshot` merges each snapshot into two `rollups` rows
+(grain 'hour' and 'day') in the same transaction: snapshot and trend counts,
+count/sum/max of the parsed volume, sports-filter counts (NULL while no
+merged snapshot had them) and a HyperLogLog sketch of the normalised
+queries. Sketches merge by taking the maximum of each register, so distinct
+counts (and the Google/Twitter overlap) can be estimated over any range of
+buckets. `python rollups.py rebuild` recomputes the table from the stored
+snapshots, one day per worker process.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import math
+import os
+import sqlite3
+import sys
+import time
+
+GRAINS = {"hour": 13, "day": 10}  # bucket = scraped_at[:n]
+COUNTERS = ("snapshots", "trends", "volume_count", "volume_sum", "volume_max", "sports_checked", "sports_filtered")
+SPORTS_COUNTERS = ("sports_checked", "sports_filtered")
+
+
+class HyperLogLog:
+    """HyperLogLog sketch with 2**p one-byte registers (p=10: 1 KB, ~3% standard error)"""
+
+    def __init__(self, p=10, registers=None):
+        self.p = p
+        self.m = 1 << p
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.m)
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls(int(math.log2(len(data))), data)
+
+    def to_bytes(self):
+        return bytes(self.registers)
+
+    def add(self, text):
+        h = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+        index = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self):
+        m = self.m
+        estimate = (0.7213 / (1 + 1.079 / m)) * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # linear counting for small cardinalities
+        return round(estimate)
+
+
+def snapshot_rollup(trends, sports_stats=None):
+    """One snapshot's contribution; `trends` are (norm, volume) pairs.
+
+    `sports_stats` is SportsFilter.classify_batch()['stats'] from the scrape.
+    Without it (backfilled runs) the sports counts are unknown (None).
+    """
+    volumes = [volume for _, volume in trends if volume is not None]
+    hll = HyperLogLog()
+    for norm, _ in trends:
+        hll.add(norm)
+    if sports_stats:
+        checked, filtered = sports_stats.get("total", 0), sports_stats.get("sports_related", 0)
+    else:
+        checked = filtered = None
+    return {
+        "snapshots": 1, "trends": len(trends),
+        "volume_count": len(volumes), "volume_sum": sum(volumes), "volume_max": max(volumes, default=None),
+        "sports_checked": checked, "sports_filtered": filtered, "hll": hll,
+    }
+
+
+def merge(total, part):
+    if total is None:
+        return {**part, "hll": HyperLogLog(registers=part["hll"].registers)}
+    for key in COUNTERS:
+        if key == "volume_max":
+            total[key] = max((v for v in (total[key], part[key]) if v is not None), default=None)
+        elif key in SPORTS_COUNTERS:  # None (unknown) only while every merged snapshot lacks stats
+            total[key] = None if total[key] is None and part[key] is None else (total[key] or 0) + (part[key] or 0)
+        else:
+            total[key] += part[key]
+    total["hll"].merge(part["hll"])
+    return total
+
+
+def _row(source, geo, grain, bucket, rollup):
+    return (source, geo, grain, bucket, *(rollup[key] for key in COUNTERS), rollup["hll"].to_bytes())
+
+
+def _from_row(row):
+    rollup = dict(zip(COUNTERS, row[:-1]))
+    rollup["hll"] = HyperLogLog.from_bytes(row[-1])
+    return rollup
+
+
+INSERT = f"INSERT OR REPLACE INTO rollups VALUES ({', '.join('?' * (5 + len(COUNTERS)))})"
+
+
+def apply_snapshot(conn, source, geo, scraped_at, part):
+    """Merge one snapshot into its hour and day rows; the caller holds the write transaction"""
+    for grain, length in GRAINS.items():
+        bucket = scraped_at[:length]
+        row = conn.execute(
+            f"SELECT {', '.join(COUNTERS)}, hll FROM rollups WHERE source = ? AND geo = ? AND grain = ? AND bucket = ?",
+            (source, geo, grain, bucket)).fetchone()
+        conn.execute(INSERT, _row(source, geo, grain, bucket, merge(_from_row(row) if row else None, part)))
+
+
+# --- Rebuild from the stored snapshots ---
+
+def _rollup_days(conn, days):
+    """Rollup rows for every snapshot on the given days (days never span workers)"""
+    totals = {}
+    for day in days:
+        snapshots = conn.execute(
+            "SELECT s.id, s.source, s.geo, s.scraped_at, f.sports_checked, f.sports_filtered "
+            "FROM snapshots s LEFT JOIN snapshot_filter_stats f ON f.snapshot_id = s.id "
+            "WHERE s.scraped_at >= ? AND s.scraped_at < ? ORDER BY s.id", (day, day + "\x7f")).fetchall()
+        for snapshot_id, source, geo, scraped_at, checked, filtered in snapshots:
+            trends = conn.execute("SELECT norm, volume FROM trends WHERE snapshot_id = ? ORDER BY id",
+                                  (snapshot_id,)).fetchall()
+            stats = {"total": checked, "sports_related": filtered} if checked is not None else None
+            part = snapshot_rollup(trends, stats)
+            for grain, length in GRAINS.items():
+                key = (source, geo, grain, scraped_at[:length])
+                totals[key] = merge(totals.get(key), part)
+    return [_row(*key, rollup) for key, rollup in totals.items()]
+
+
+def _rollup_days_worker(db_path, days):
+    """Worker process: reads through its own read-only connection"""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        return _rollup_days(conn, days)
+    finally:
+        conn.close()
+
+
+def rebuild(store=None, workers=None):
+    """Recompute every rollup row from the snapshots and trends tables, one batch of days per process.
+
+    With one worker, or a store that cannot be reopened (':memory:'), the
+    store's own connection is used.
+    """
+    from trend_store import get_store
+    store = store or get_store()
+    days = [d for (d,) in store.conn.execute("SELECT DISTINCT substr(scraped_at, 1, 10) FROM snapshots ORDER BY 1")]
+    if store.path == ":memory:":
+        workers = 1
+    workers = max(1, min(workers or os.cpu_count() or 1, len(days) or 1))
+    batches = [days[i::workers] for i in range(workers)]
+
+    if workers == 1:
+        results = [_rollup_days(store.conn, days)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_rollup_days_worker, [store.path] * workers, batches))
+
+    with store._lock:
+        store.conn.execute("BEGIN IMMEDIATE")
+        try:
+            store.conn.execute("DELETE FROM rollups")
+            for rows in results:
+                store.conn.executemany(INSERT, rows)
+            store.conn.execute("COMMIT")
+        except BaseException:
+            store.conn.execute("ROLLBACK")
+            raise
+    return {"days": len(days), "rows": sum(len(rows) for rows in results), "workers": workers}
+
+
+# --- Reading ---
+
+def _range(source, grain, start, end, store):
+    from trend_store import get_store
+    sql, params = "grain = ?", [grain]
+    if source:
+        sql += " AND source = ?"
+        params.append(source)
+    if start:
+        sql += " AND bucket >= ?"
+        params.append(start[:GRAINS[grain]])
+    if end:
+        sql += " AND bucket < ?"
+        params.append(end[:GRAINS[grain]])
+    return store or get_store(), sql, params
+
+
+def rollup(source=None, grain="day", start=None, end=None, store=None):
+    """Rollup rows between ISO timestamps `start` and `end` (exclusive), with mean volume,
+    sports share and the distinct-query estimate filled in"""
+    store, sql, params = _range(source, grain, start, end, store)
+    rows = []
+    for source_, geo, bucket, *values in store.conn.execute(
+            f"SELECT source, geo, bucket, {', '.join(COUNTERS)}, hll FROM rollups WHERE {sql} ORDER BY bucket, source, geo",
+            params):
+        row = {"source": source_, "geo": geo, "bucket": bucket, **_from_row(values)}
+        row["distinct_queries"] = row.pop("hll").count()
+        row["mean_volume"] = row["volume_sum"] / row["volume_count"] if row["volume_count"] else None
+        # Snapshots without filter stats count in neither sum, so the share covers known runs only
+        row["sports_share"] = row["sports_filtered"] / row["sports_checked"] if row["sports_checked"] else None
+        rows.append(row)
+    return rows
+
+
+def distinct_queries(source=None, grain="day", start=None, end=None, store=None):
+    """Estimated number of distinct normalised queries over a range (sketches merged)"""
+    store, sql, params = _range(source, grain, start, end, store)
+    total = HyperLogLog()
+    for (data,) in store.conn.execute(f"SELECT hll FROM rollups WHERE {sql}", params):
+        total.merge(HyperLogLog.from_bytes(data))
+    return total.count()
+
+
+def overlap(grain="day", start=None, end=None, store=None):
+    """Estimated Google/Twitter query overlap by inclusion-exclusion over the merged sketches"""
+    google = distinct_queries("google", grain, start, end, store)
+    twitter = distinct_queries("twitter", grain, start, end, store)
+    both = distinct_queries(None, grain, start, end, store)
+    return {"google": google, "twitter": twitter, "union": both, "overlap": max(0, google + twitter - both)}
+
+
+def benchmark_rollups(store=None):
+    """Daily report from raw rows versus the rollup table, plus rebuild time and HLL accuracy"""
+    from trend_store import get_store
+    store = store or get_store()
+
+    def from_raw():
+        days = {}
+        for source, day, norm, volume in store.conn.execute(
+                "SELECT s.source, substr(s.scraped_at, 1, 10), t.norm, t.volume FROM trends t "
+                "JOIN snapshots s ON s.id = t.snapshot_id"):
+            d = days.setdefault((source, day), {"trends": 0, "volumes": [], "norms": set()})
+            d["trends"] += 1
+            if volume is not None:
+                d["volumes"].append(volume)
+            d["norms"].add(norm)
+        return {key: (d["trends"], max(d["volumes"], default=None), len(d["norms"])) for key, d in days.items()}
+
+    def from_rollups():
+        return {(r["source"], r["bucket"]): (r["trends"], r["volume_max"], r["distinct_queries"])
+                for r in rollup(grain="day", store=store)}
+
+    start = time.perf_counter()
+    stats = rebuild(store)
+    print(f"Rebuilt rollups in {(time.perf_counter() - start) * 1000:.0f} ms: {stats}")
+
+    start = time.perf_counter()
+    raw = from_raw()
+    raw_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    rolled = from_rollups()
+    rollup_ms = (time.perf_counter() - start) * 1000
+    print(f"   daily report: raw rows {raw_ms:.1f} ms | rollups {rollup_ms:.1f} ms")
+
+    errors = [abs(rolled[k][2] - raw[k][2]) / raw[k][2] for k in raw if k in rolled and raw[k][2]]
+    mismatched = sum(1 for k in raw if rolled.get(k, (None,))[:2] != raw[k][:2])
+    print(f"   {len(raw)} source-days, {mismatched} with different counts/max volume; "
+          f"distinct-query error mean {sum(errors) / len(errors) * 100:.1f}%, max {max(errors) * 100:.1f}%")
+    print(f"   Google/Twitter overlap: {overlap(store=store)}")
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "rebuild":
+        print(f"Rollups rebuilt: {rebuild(workers=int(sys.argv[2]) if len(sys.argv) > 2 else None)}")
+    elif command == "bench":
+        benchmark_rollups()
+    else:
+        for row in rollup(grain="day"):
+            print(f"   {row['bucket']} {row['source']:8s} {row['geo'] or '-':3s} snapshots {row['snapshots']:3d} "
+                  f"trends {row['trends']:4d} distinct ~{row['distinct_queries']:4d} max volume {row['volume_max']}")
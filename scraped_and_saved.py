@@ -3,7 +3,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import json
 import time
@@ -14,11 +14,20 @@ import os
 import sys
 import subprocess
 
-def scrape_trends_from_mz3ric():
-    """Scrape first 50 Google Trends daily searches (query + volume)"""
-
-    print("mZ3RIc classından trendler alınıyor...")
-
+from browser_pool import chromedriver_path, get_pool
+from file_handles import append_rows
+from page_extract import extract_google_cards
+from text_normalize import normalize, without_norm
+from query_blacklist import default_blacklist
+from related_fetch import RelatedQueriesFetcher
+from related_queries import default_generator as related_generator
+from trend_store import export_formats, get_store
+from trends_fetch import GOOGLE_PAGE_URL, fetch_trends, fetch_trends_http, host_limiter
+from resource_blocking import blocking_enabled, enable_blocking, page_metrics
+from scroll_loader import load_cards
+
+def setup_driver():
+    """Setup headless Chrome driver for Google Trends"""
     # User agents to avoid bot detection
     user_agents = [
         'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -36,45 +45,45 @@ def scrape_trends_from_mz3ric():
     options.add_argument(f'--user-agent={random.choice(user_agents)}')
     options.add_argument('--window-size=1920,1080')
 
-    driver = None
-    try:
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        driver.get("https://trends.google.com/trends/trendingsearches/daily?geo=TR&hl=tr")
+    driver = webdriver.Chrome(service=Service(chromedriver_path()), options=options)
+    if blocking_enabled():
+        enable_blocking(driver, "google")
+    return driver
 
-        # Wait until at least one trend loads
-        try:
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div.mZ3RIc"))
+def google_pool():
+    """Shared pool of warm headless browsers for Google Trends"""
+    return get_pool("google", setup_driver, size=int(os.getenv("GOOGLE_POOL_SIZE", "1")))
+
+def scrape_trends_selenium(url=None, geo="TR", hl="tr"):
+    """Scrape first 50 Google Trends daily searches (query + volume) with a browser"""
+
+    print("mZ3RIc classından trendler alınıyor...")
+    url = url or (os.getenv("TRENDS_PAGE_URL") or GOOGLE_PAGE_URL).format(geo=geo, hl=hl)
+
+    try:
+        with google_pool().lease() as driver, host_limiter.slot(url):
+            driver.get(url)
+
+            # Wait until at least one trend loads
+            try:
+                WebDriverWait(driver, 15).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "div.mZ3RIc"))
+                )
+            except:
+                print("⚠️ Trends page didn't load properly")
+                return []
+
+            # Scroll until 50 unique trends are loaded or the card count stops growing
+            trends, report = load_cards(
+                driver, "div.mZ3RIc",
+                extract=extract_google_cards, key=lambda card: card["query"],
+                target=50, max_scrolls=20
             )
-        except:
-            print("⚠️ Trends page didn't load properly")
-            return []
-
-        trends = []
-        seen = set()
-        scrolls = 0
-
-        while len(trends) < 50 and scrolls < 20:
-            # Scroll to load more
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
-
-            # Collect all queries + volumes separately
-            queries = [el.text.strip() for el in driver.find_elements(By.CSS_SELECTOR, "div.mZ3RIc") if el.text.strip()]
-            volumes = [el.text.strip() for el in driver.find_elements(By.CSS_SELECTOR, "div.lqv0Cb") if el.text.strip()]
-
-            # Pair queries and volumes by index
-            for idx, query in enumerate(queries):
-                if query not in seen:
-                    seen.add(query)
-                    volume = volumes[idx] if idx < len(volumes) else ""
-                    trends.append({"query": query, "volume": volume})
-                    if len(trends) >= 50:
-                        break
-
-            scrolls += 1
+            print(f"   Yükleme: {report['scrolls']} kaydırma, {report['ms']} ms ({report['stopped']})")
+            print(f"   Sayfa: {page_metrics(driver)}")
 
         print(f"Toplam {len(trends)} trend bulundu.")
+        print(f"   Tarayıcı havuzu: {google_pool().stats()}")
         # Debug preview
         for t in trends[:10]:
             print(f"{t['query']} | {t['volume']}")
@@ -84,16 +93,62 @@ def scrape_trends_from_mz3ric():
     except Exception as e:
         print(f"Error during scraping: {e}")
         return []
-    
-    finally:
-        if driver:
-            driver.quit()
 
-def clean_trends_data(trends_list):
-    """Clean and filter the scraped trends (keep query + volume)"""
-    cleaned = []
-    seen = set()
-    
+def scrape_trends_from_mz3ric(backend=None, geo="TR", hl="tr"):
+    """Fetch first 50 Google Trends daily searches, over HTTP with a Selenium fallback"""
+    backend = backend or os.getenv("TRENDS_BACKEND", "http")
+
+    backends = [
+        ("http", lambda: fetch_trends_http(geo=geo, hl=hl)),
+        ("selenium", lambda: scrape_trends_selenium(geo=geo, hl=hl)),
+    ]
+    if backend == "selenium":
+        backends = backends[1:]
+
+    trends, used, ms = fetch_trends(backends)
+    print(f"   Kaynak [{geo}]: {used or '-'} ({len(trends)} trend, {ms} ms)")
+    return trends
+
+def parse_geos(spec):
+    """Parse 'TR:tr,US:en,DE' into [('TR', 'tr'), ('US', 'en'), ('DE', 'de')]"""
+    geos = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        geo, _, hl = part.partition(":")
+        geos.append((geo.upper(), hl or geo.lower()))
+    return geos
+
+def scrape_multi_geo(geos, max_workers=4, backend=None):
+    """Scrape several geo/language pairs concurrently; returns {geo: {trends, hl, ms}}"""
+    # Enough warm browsers for every worker in case the Selenium fallback kicks in
+    pool = google_pool()
+    pool.size = max(pool.size, min(max_workers, len(geos)))
+
+    def scrape_one(geo, hl):
+        start = time.perf_counter()
+        trends = scrape_trends_from_mz3ric(backend=backend, geo=geo, hl=hl)
+        return {"trends": trends, "hl": hl, "ms": int((time.perf_counter() - start) * 1000)}
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(scrape_one, geo, hl): (geo, hl) for geo, hl in geos}
+        for future in as_completed(futures):
+            geo, hl = futures[future]
+            try:
+                results[geo] = future.result()
+            except Exception as e:
+                print(f"   ✗ {geo} hatası: {e}")
+                results[geo] = {"trends": [], "hl": hl, "ms": 0}
+
+    print("   Geo gecikmeleri:")
+    for geo, hl in geos:
+        print(f"      {geo}/{hl}: {results[geo]['ms']} ms, {len(results[geo]['trends'])} trend")
+    return results
+
+def iter_candidate_queries(trends_list):
+    """Strip, collapse and length-check scraped queries, attaching their normalised form"""
     for trend in trends_list:
         query = trend["query"]
         volume = trend.get("volume", "")
@@ -104,122 +159,46 @@ def clean_trends_data(trends_list):
         clean_query = re.sub(r'\s+', ' ', clean_query)
         clean_query = re.sub(r'^\d+\.\s*', '', clean_query)
 
-        if (len(clean_query) > 3 and 
-            len(clean_query) < 100 and
-            not any(word in clean_query.lower() for word in [
-                'google', 'trends', 'keşfet', 'oturum', 'ara', 'search', 
-                'maps', '●', 'saat önce', 'dakika önce'
-            ]) and
-            clean_query not in seen):
-
-            cleaned.append({"query": clean_query, "volume": volume})
-            seen.add(clean_query)
+        if 3 < len(clean_query) < 100:
+            # Normalised once here; the blacklist, dedup and sports filter reuse it
+            yield {"query": clean_query, "volume": volume, "norm": normalize(clean_query)}
 
-    return cleaned
-
-def parse_volume(volume_text: str) -> int:
-    """Convert Google Trends volume string into an integer"""
-    if not volume_text:
-        return 0
-
-    volume_text = volume_text.lower().replace("arama", "").replace("+", "").strip()
-
-    multipliers = {
-        "k": 1_000,
-        "m": 1_000_000,
-        "b": 1_000_000_000
-    }
-
-    try:
-        if volume_text[-1] in multipliers:
-            num = float(volume_text[:-1])
-            return int(num * multipliers[volume_text[-1]])
-        return int(volume_text)
-    except:
-        return 0
-
-def generate_related_queries(trend, volume_text=""):
-    """Generate related queries for a given trend, scaled by volume"""
-    expansions = {
-        'spor': ['maç', 'skor', 'sonuç', 'haber', 'lig', 'takım'],
-        'maç': ['özet', 'gol', 'iddaa', 'canlı', 'izle', 'sonuç'],
-        'basket': ['nba', 'basketbol', 'maç', 'skor', 'oyuncu'],
-        'futbol': ['transfer', 'süper lig', 'haber', 'analiz'],
-        'sonuç': ['açıklandı', 'sorgulama', 'öğrenme', 'e-devlet'],
-        'ne zaman': ['saat kaçta', 'tarih', 'yeri', 'bilet'],
-        'alım': ['iş', 'kariyer', 'başvuru', 'sınav', 'memur'],
-        'adliye': ['mahkeme', 'dava', 'avukat', 'hukuk'],
-        'cuma': ['mesaj', 'kutlama', 'resimli', 'dua', 'hutbe'],
-        'oyuncu': ['film', 'dizi', 'rol', 'set', 'fragman']
-    }
-
-    # Parse volume
-    base_volume = parse_volume(volume_text)
-    if base_volume == 0:
-        base_volume = 1000  # fallback
-
-    related_data = {'top': [], 'rising': []}
-    top_queries = set()
-    words = trend.lower().split()
-
-    # Generate top queries
-    for word in words:
-        if word in expansions:
-            for expansion in expansions[word][:3]:
-                top_queries.add(f"{trend} {expansion}")
-                top_queries.add(f"{expansion} {trend}")
-
-    # Add time-based variations
-    time_vars = ['son dakika', 'güncel', 'canlı', 'bugün', '2025']
-    for time_var in time_vars[:2]:
-        top_queries.add(f"{trend} {time_var}")
-
-    # Scale values based on base volume
-    related_data['top'] = [
-        {"query": q, "value": int(base_volume * random.uniform(0.4, 0.8))}
-        for q in list(top_queries)[:5]
-    ]
+def iter_unique(records):
+    seen = set()
+    for record in records:
+        if record["norm"] not in seen:
+            seen.add(record["norm"])
+            yield record
 
-    # Rising queries (more specific variations)
-    rising_queries = set()
-    for word in words:
-        if word in expansions:
-            for expansion in expansions[word][3:6]:
-                rising_queries.add(f"{trend} {expansion} son dakika")
-                rising_queries.add(f"{expansion} {trend} haberleri")
-
-    related_data['rising'] = [
-        {"query": q, "value": int(base_volume * random.uniform(0.8, 1.2))}
-        for q in list(rising_queries)[:5]
+def clean_trends_data(trends_list, blacklist=None):
+    """Clean and filter the scraped trends (keep query + volume)"""
+    blacklist = blacklist or default_blacklist()
+    records = iter_candidate_queries(trends_list)
+    records = blacklist.filter(records)
+    return list(iter_unique(records))
+
+def save_to_csv(all_trends_data, filenames, indexed=()):
+    """Append successful entries to every CSV in `filenames` (rows formatted once)"""
+    rows = [
+        [
+            entry["timestamp"],
+            entry["query"]["query"],
+            entry["query"].get("volume", ""),
+            ", ".join([q["query"] for q in entry["related_queries"]["top"]]),
+            ", ".join([q["query"] for q in entry["related_queries"]["rising"]])
+        ]
+        for entry in all_trends_data if entry.get("success")
     ]
+    append_rows(filenames, ["timestamp", "query", "volume", "related_top", "related_rising"], rows, indexed=indexed)
 
-    return related_data
-
-def save_to_csv(all_trends_data, filename):
-    """Save trends data to CSV file"""
-    file_exists = os.path.isfile(filename)
-    with open(filename, "a", newline="", encoding="utf-8") as csvfile:
-        writer = csv.writer(csvfile)
-        if not file_exists:
-            writer.writerow(["timestamp", "query", "volume", "related_top", "related_rising"])
-        for entry in all_trends_data:
-            if entry.get("success"):
-                writer.writerow([
-                    entry["timestamp"],
-                    entry["query"]["query"],
-                    entry["query"].get("volume", ""),
-                    ", ".join([q["query"] for q in entry["related_queries"]["top"]]),
-                    ", ".join([q["query"] for q in entry["related_queries"]["rising"]])
-                ])
-
-def push_to_github():
+def push_to_github(geos=("TR",)):
     """Push data to GitHub repository"""
     try:
-        subprocess.run(["git", "add", "trends.csv"], check=True)
-
-        today_file = f"trends_{datetime.now().strftime('%Y-%m-%d')}.csv"
-        if os.path.exists(today_file):
-            subprocess.run(["git", "add", today_file], check=True)
+        for geo in geos:
+            master_file, today_file, _ = output_files(geo)
+            subprocess.run(["git", "add", master_file], check=True)
+            if os.path.exists(today_file):
+                subprocess.run(["git", "add", today_file], check=True)
 
         subprocess.run(["git", "commit", "-m", f"Auto update {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"], check=False)
         subprocess.run(["git", "push", "origin", "main"], check=True)
@@ -231,100 +210,177 @@ def push_to_github():
 from sports_filter import SportsFilter  # adjust path if needed
 
 # Global filter instance
-sports_filter = SportsFilter()
-
-def main():
-    """Main execution function"""
-    print("=" * 60)
-    print("GOOGLE TRENDS mZ3RIc CLASS SCRAPER")
-    print("=" * 60)
-
-    # Scrape trends from mZ3RIc class
-    print("1. mZ3RIc classından trendler alınıyor...")
-    raw_trends = scrape_trends_from_mz3ric()
+sports_filter = SportsFilter(cache_path=os.getenv("SPORTS_FILTER_CACHE", "sports_filter_cache.json"))
 
+def process_trends(raw_trends, geo=None, hl="tr", sports_stats=None):
+    """Clean, sports-filter and expand raw trends into entries for the JSON/CSV outputs
+    (the filter counts are copied into `sports_stats` when a dict is given)"""
+    timings = {}
     print(f"2. Ham trend verisi ({len(raw_trends)}):")
     for i, trend in enumerate(raw_trends[:10], 1):
         print(f"   {i:2d}. {trend}")
 
     # Clean the trends
     print("\n3. Trendler temizleniyor...")
+    start = time.perf_counter()
     cleaned_trends = clean_trends_data(raw_trends)
+    timings["temizleme"] = time.perf_counter() - start
 
     # Apply sports filter
     print("\n4.1 Spor filtrelemesi uygulanıyor...")
-    filtered_trends = sports_filter.filter_sports_topics(cleaned_trends)
-
-    stats = sports_filter.get_filter_stats(cleaned_trends)
+    start = time.perf_counter()
+    classified = sports_filter.classify_batch(cleaned_trends)
+    filtered_trends = classified["kept"]
+    sports_filter.save_cache()
+    timings["spor filtresi"] = time.perf_counter() - start
+    print(f"Filtered out {len(classified['removed'])} sports-related trends")
+
+    stats = classified["stats"]
     print(f"   Filtre istatistikleri: {stats}")
+    if sports_stats is not None:
+        sports_stats.update(stats)
 
     print(f"4.2 Filtrelenmiş trendler ({len(filtered_trends)}):")
     for i, trend in enumerate(filtered_trends, 1):
         print(f"   {i:2d}. {trend}")
 
-    # Generate related queries on filtered trends
-    print("\n5. İlgili aramalar oluşturuluyor...")
-    all_trends_data = []
-    for i, trend in enumerate(filtered_trends[:15], 1):
-        print(f"4. Temizlenmiş trendler ({len(cleaned_trends)}):")
+    print(f"4. Temizlenmiş trendler ({len(cleaned_trends)}):")
     for i, trend in enumerate(cleaned_trends, 1):
         print(f"   {i:2d}. {trend}")
 
-    # Generate related queries
+    # Generate related queries for the first 15 trends in one batch
     print("\n5. İlgili aramalar oluşturuluyor...")
-    all_trends_data = []
+    selected = cleaned_trends[:15]
+    start = time.perf_counter()
+    try:
+        if os.getenv("RELATED_BACKEND", "synthetic") == "google":
+            fetcher = RelatedQueriesFetcher(geo=geo or "TR", hl=hl)
+            related = fetcher.fetch_batch(selected)
+            print(f"   Google ilgili aramalar: {fetcher.stats}")
+        else:
+            related = related_generator.generate_batch(selected, locale=hl)
+    except Exception as e:
+        print(f"   ✗ İlgili aramalar hatası: {e}")
+        related = [e] * len(selected)
+    timings["ilgili aramalar"] = time.perf_counter() - start
 
-    for i, trend in enumerate(cleaned_trends[:15], 1):  # Process first 15 trends
-        try:
-            print(f"   ({i:2d}/{min(15, len(cleaned_trends))}) '{trend['query']}' işleniyor...")
-            
-            related_queries = generate_related_queries(trend["query"], trend["volume"])
-    
+    all_trends_data = []
+    timestamp = datetime.now().isoformat()
+    for trend, related_queries in zip(selected, related):
+        if isinstance(related_queries, Exception):
             all_trends_data.append({
-                "query": trend,
-                "related_queries": related_queries,
-                "timestamp": datetime.now().isoformat(),
-                "success": True
+                "query": without_norm(trend),
+                "error": str(related_queries),
+                "timestamp": timestamp,
+                "success": False,
+                **({"geo": geo} if geo else {})
             })
-            
-            # Small delay
-            time.sleep(0.5)
-            
-        except Exception as e:
-            print(f"   ✗ '{trend['query']}' hatası: {e}")
+        else:
             all_trends_data.append({
-                "query": trend,
-                "error": str(e),
-                "timestamp": datetime.now().isoformat(),
-                "success": False
+                "query": without_norm(trend),
+                "related_queries": related_queries,
+                "timestamp": timestamp,
+                "success": True,
+                **({"geo": geo} if geo else {})
             })
 
-    # Save results to JSON
-    json_filename = f"trends_data_mZ3RIc_{datetime.now().strftime('%Y%m%d_%H%M')}.json"
+    print("   ⏱️ Aşama süreleri: " + ", ".join(f"{name} {sec * 1000:.1f} ms" for name, sec in timings.items()))
+    return all_trends_data
+
+def output_files(geo="TR"):
+    """Master CSV, daily CSV and JSON filenames for a geo (TR keeps the original names)"""
+    now = datetime.now()
+    suffix = "" if geo == "TR" else f"_{geo}"
+    return (
+        f"trends{suffix}.csv",
+        f"trends{suffix}_{now.strftime('%Y-%m-%d')}.csv",
+        f"trends_data_mZ3RIc{suffix}_{now.strftime('%Y%m%d_%H%M')}.json",
+    )
+
+def save_results(all_trends_data, geo="TR", sports_stats=None):
+    """Write processed entries to the SQLite store and the enabled JSON/CSV exports"""
+    master_file, today_file, json_filename = output_files(geo)
+    exports = export_formats()
+
+    print(f"\n6. SONUÇ:")
+    print(f"   ✓ Toplam {len(all_trends_data)} trend işlendi")
+    print(f"   ✓ Başarılı: {sum(1 for x in all_trends_data if x.get('success'))}")
+
+    # Save results to the trend store
     try:
-        with open(json_filename, 'w', encoding='utf-8') as f:
-            json.dump(all_trends_data, f, ensure_ascii=False, indent=2)
-        
-        print(f"\n6. SONUÇ:")
-        print(f"   ✓ Toplam {len(all_trends_data)} trend işlendi")
-        print(f"   ✓ Başarılı: {sum(1 for x in all_trends_data if x.get('success'))}")
-        print(f"   ✓ JSON veriler kaydedildi: {json_filename}")
-        
+        store = get_store()
+        if store:
+            snapshot_id = store.save_google_run(all_trends_data, geo=geo, origin=json_filename,
+                                                  sports_stats=sports_stats)
+            print(f"   ✓ Veritabanına kaydedildi: {store.path} (snapshot {snapshot_id})")
     except Exception as e:
-        print(f"   ✗ JSON dosya yazma hatası: {e}")
+        print(f"   ✗ Veritabanı yazma hatası: {e}")
+
+    # Save results to JSON
+    if "json" in exports:
+        try:
+            with open(json_filename, 'w', encoding='utf-8') as f:
+                json.dump(all_trends_data, f, ensure_ascii=False, indent=2)
+            print(f"   ✓ JSON veriler kaydedildi: {json_filename}")
+        except Exception as e:
+            print(f"   ✗ JSON dosya yazma hatası: {e}")
 
     # Save results to CSV
-    try:
-        today_file = f"trends_{datetime.now().strftime('%Y-%m-%d')}.csv"
-        save_to_csv(all_trends_data, "trends.csv")      # master log (all runs)
-        save_to_csv(all_trends_data, today_file)        # daily archive
-        print(f"   ✓ CSV veriler kaydedildi: trends.csv ve {today_file}")
-    except Exception as e:
-        print(f"   ✗ CSV dosya yazma hatası: {e}")
+    if "csv" in exports:
+        try:
+            save_to_csv(all_trends_data, [master_file, today_file], indexed=[master_file])  # master log + daily archive
+            print(f"   ✓ CSV veriler kaydedildi: {master_file} ve {today_file}")
+        except Exception as e:
+            print(f"   ✗ CSV dosya yazma hatası: {e}")
+
+    # Append to the Parquet archive (needs pyarrow)
+    if "parquet" in exports:
+        try:
+            from trend_archive import write_google_run
+            print(f"   ✓ Parquet arşivine eklendi: {write_google_run(all_trends_data, geo=geo)}")
+        except Exception as e:
+            print(f"   ✗ Parquet yazma hatası: {e}")
+
+    # Append to the delta-encoded snapshot log
+    if "delta" in exports:
+        try:
+            from snapshot_delta import append_google_run
+            print(f"   ✓ Delta kaydına eklendi: snapshot {append_google_run(all_trends_data, geo=geo)}")
+        except Exception as e:
+            print(f"   ✗ Delta kaydı hatası: {e}")
+
+def main():
+    """Main execution function"""
+    print("=" * 60)
+    print("GOOGLE TRENDS mZ3RIc CLASS SCRAPER")
+    print("=" * 60)
+
+    # Multi-geo mode: TRENDS_GEOS="TR:tr,US:en,DE:de"
+    geos = parse_geos(os.getenv("TRENDS_GEOS", ""))
+
+    if geos:
+        print(f"1. {len(geos)} bölge için trendler alınıyor...")
+        results = scrape_multi_geo(geos, max_workers=int(os.getenv("TRENDS_WORKERS", "4")))
+        all_trends_data = []
+        for geo, _ in geos:
+            print(f"\n--- {geo} ---")
+            sports_stats = {}
+            geo_data = process_trends(results[geo]["trends"], geo=geo, hl=results[geo]["hl"], sports_stats=sports_stats)
+            save_results(geo_data, geo=geo, sports_stats=sports_stats)
+            all_trends_data.extend(geo_data)
+    else:
+        # Scrape trends from mZ3RIc class
+        print("1. mZ3RIc classından trendler alınıyor...")
+        raw_trends = scrape_trends_from_mz3ric()
+
+        sports_stats = {}
+        all_trends_data = process_trends(raw_trends, sports_stats=sports_stats)
+
+        save_results(all_trends_data, sports_stats=sports_stats)
 
     # Push to GitHub
     try:
-        push_to_github()
+        push_to_github([geo for geo, _ in geos] or ["TR"])
     except Exception as e:
         print(f"   ✗ GitHub push hatası: {e}")
 
@@ -343,6 +399,8 @@ def main():
     print("mZ3RIc SCRAPING TAMAMLANDI")
     print("=" * 60)
 
+    return all_trends_data
+
 if __name__ == "__main__":
     try:
         main()
@@ -0,0 +1,197 @@
+"""Long-running scraper: runs the Google and Twitter scrapes on an interval.
+
+Heavy imports, the SportsFilter patterns, the browser pools and the CSV
+append handles are created once and reused for every run. A small
+line-based control socket on localhost accepts on-demand triggers:
+
+    echo "run google" | nc 127.0.0.1 8766
+    echo "status" | nc 127.0.0.1 8766
+"""
+from datetime import datetime
+import json
+import os
+import random
+import socket
+import socketserver
+import threading
+import time
+
+import file_handles
+from trend_store import export_formats
+
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = int(os.getenv("DAEMON_PORT", "8766"))
+
+
+def run_google():
+    import scraped_and_saved
+    data = scraped_and_saved.main() or []
+    return {"processed": len(data), "success": sum(1 for x in data if x.get("success"))}
+
+
+def run_twitter():
+    import twitter_trends_scraper
+    trends = twitter_trends_scraper.scrape_twitter_trends()
+    # The top ten go back to the bot's /xtrends
+    top = [{"rank": t.get("rank"), "name": t.get("name"), "tweetCount": t.get("tweetCount")} for t in trends[:10]]
+    return {"processed": len(trends), "success": len(trends), "top": top}
+
+
+def run_compact():
+    import trend_archive
+    return {"compacted": len(trend_archive.compact())}
+
+
+class Job:
+    def __init__(self, name, func, interval_min, jitter_sec):
+        self.name = name
+        self.func = func
+        self.interval = interval_min * 60
+        self.jitter = jitter_sec
+        self.lock = threading.Lock()
+        self.next_run = time.time()
+        self.runs = 0
+        self.last_started = None
+        self.last_duration = None
+        self.last_result = None
+        self.last_error = None
+
+    def schedule_next(self):
+        self.next_run = time.time() + self.interval + random.uniform(-self.jitter, self.jitter)
+
+    def run(self):
+        """Run once unless a previous run is still going; returns False when skipped"""
+        if not self.lock.acquire(blocking=False):
+            print(f"[{self.name}] previous run still in progress, skipping")
+            return False
+        try:
+            self.last_started = datetime.now().isoformat()
+            start = time.perf_counter()
+            try:
+                self.last_result = self.func()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"[{self.name}] run failed: {e}")
+            self.last_duration = round(time.perf_counter() - start, 1)
+            self.runs += 1
+            return True
+        finally:
+            self.lock.release()
+
+    def status(self):
+        return {
+            "running": self.lock.locked(),
+            "runs": self.runs,
+            "last_started": self.last_started,
+            "last_duration_s": self.last_duration,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+            "next_run": datetime.fromtimestamp(self.next_run).isoformat(timespec="seconds"),
+        }
+
+
+class ScraperDaemon:
+    def __init__(self, jobs):
+        self.jobs = {job.name: job for job in jobs}
+        self._stop = threading.Event()
+
+    def trigger(self, name, wait=False):
+        """Start a run now (in the background unless `wait`); returns False if one is running"""
+        job = self.jobs[name]
+        if job.lock.locked():
+            return False
+        if wait:
+            return job.run()
+        threading.Thread(target=job.run, name=f"{name}-manual", daemon=True).start()
+        return True
+
+    def status(self):
+        return {name: job.status() for name, job in self.jobs.items()}
+
+    def loop(self):
+        while not self._stop.is_set():
+            now = time.time()
+            for job in self.jobs.values():
+                if job.next_run <= now and not job.lock.locked():
+                    job.schedule_next()
+                    threading.Thread(target=job.run, name=job.name, daemon=True).start()
+            file_handles.close_idle(3 * 3600)
+            self._stop.wait(5)
+
+    def stop(self):
+        self._stop.set()
+
+
+class ControlHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline().decode("utf-8").strip().lower()
+        daemon = self.server.daemon_ref
+        parts = line.split()
+
+        if parts[:1] == ["status"]:
+            reply = {"ok": True, "jobs": daemon.status()}
+        elif parts[:1] == ["run"] and len(parts) >= 2 and parts[1] in daemon.jobs:
+            wait = "wait" in parts[2:]
+            started = daemon.trigger(parts[1], wait=wait)
+            reply = {"ok": started, "busy": not started, "job": daemon.jobs[parts[1]].status()}
+        else:
+            reply = {"ok": False, "error": f"unknown command: {line!r}", "commands": ["status", "run <job> [wait]"]}
+
+        self.wfile.write((json.dumps(reply, ensure_ascii=False) + "\n").encode("utf-8"))
+
+
+class ControlServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def send_command(command, host=DAEMON_HOST, port=DAEMON_PORT, timeout=900):
+    """Send one control command to a running daemon; raises OSError if none is listening"""
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall((command + "\n").encode("utf-8"))
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    return json.loads(data.decode("utf-8"))
+
+
+def main():
+    file_handles.keep_open = True
+
+    # Pay the Selenium / webdriver_manager imports and SportsFilter compilation once
+    import scraped_and_saved  # noqa: F401
+    import twitter_trends_scraper  # noqa: F401
+
+    jitter = int(os.getenv("SCRAPE_JITTER_SEC", "120"))
+    jobs = [
+        Job("google", run_google, float(os.getenv("GOOGLE_INTERVAL_MIN", "60")), jitter),
+        Job("twitter", run_twitter, float(os.getenv("TWITTER_INTERVAL_MIN", "60")), jitter),
+    ]
+    if "parquet" in export_formats():
+        jobs.append(Job("compact", run_compact, float(os.getenv("COMPACT_INTERVAL_MIN", "1440")), jitter))
+    daemon = ScraperDaemon(jobs)
+
+    server = ControlServer((DAEMON_HOST, DAEMON_PORT), ControlHandler)
+    server.daemon_ref = daemon
+    threading.Thread(target=server.serve_forever, name="control", daemon=True).start()
+
+    print(f"Scraper daemon running, control socket on {DAEMON_HOST}:{DAEMON_PORT}")
+    for job in jobs:
+        print(f"   {job.name}: every {job.interval / 60:g} min ± {job.jitter} s")
+
+    try:
+        daemon.loop()
+    except KeyboardInterrupt:
+        print("Stopping scraper daemon...")
+    finally:
+        daemon.stop()
+        server.shutdown()
+        file_handles.close_all()
+
+
+if __name__ == "__main__":
+    main()
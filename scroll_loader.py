@@ -0,0 +1,87 @@
+import time
+
+# Scrolls (optionally) and resolves as soon as the number of elements matching
+# the selector changes, or after `settle_ms` without any change.
+WAIT_FOR_GROWTH_JS = """
+const selector = arguments[0], settleMs = arguments[1], scroll = arguments[2];
+const done = arguments[arguments.length - 1];
+const count = function () { return document.querySelectorAll(selector).length; };
+const before = count();
+let timer = null;
+const observer = new MutationObserver(function () {
+    if (count() !== before) finish();
+});
+function finish() {
+    observer.disconnect();
+    clearTimeout(timer);
+    done(count());
+}
+observer.observe(document.body, {childList: true, subtree: true});
+timer = setTimeout(finish, settleMs);
+if (scroll) window.scrollTo(0, document.body.scrollHeight);
+"""
+
+
+def count_cards(driver, selector):
+    """Number of elements currently matching the selector, without waiting"""
+    return driver.execute_script("return document.querySelectorAll(arguments[0]).length;", selector)
+
+
+def wait_for_growth(driver, selector, settle_ms=2000, scroll=True):
+    """Scroll once and block until the card count changes or the page settles; returns the new count"""
+    driver.set_script_timeout(settle_ms / 1000 + 5)
+    return driver.execute_async_script(WAIT_FOR_GROWTH_JS, selector, settle_ms, scroll)
+
+
+def load_cards(driver, selector, extract=None, key=None, target=50,
+               max_scrolls=20, settle_ms=2000, patience=2, scroll=True):
+    """Load cards until `target` unique items exist or the count stops growing.
+
+    `extract(driver)` returns the items currently on the page and `key(item)`
+    picks the value used for de-duplication. Without `extract` only the card
+    count is tracked. What is already on the page is checked first, so the
+    settle wait only runs while the count is below `target`. Returns (items,
+    report) where report holds the number of scrolls, elapsed milliseconds,
+    the final count and why loading stopped.
+    """
+    start = time.perf_counter()
+    items, seen = [], set()
+
+    def collect(card_count):
+        if not extract:
+            return card_count
+        for item in extract(driver):
+            item_key = key(item) if key else item
+            if item_key not in seen:
+                seen.add(item_key)
+                items.append(item)
+        return len(items)
+
+    total = collect(None if extract else count_cards(driver, selector))
+    stalled = 0
+    scrolls = 0
+    stopped = "max_scrolls"
+
+    while total < target and scrolls < max_scrolls:
+        count = total
+        total = collect(wait_for_growth(driver, selector, settle_ms, scroll))
+        scrolls += 1
+
+        if total <= count:
+            stalled += 1
+            if stalled >= patience:
+                stopped = "stalled"
+                break
+        else:
+            stalled = 0
+
+    if total >= target:
+        stopped = "target"
+
+    report = {
+        "scrolls": scrolls,
+        "ms": int((time.perf_counter() - start) * 1000),
+        "count": total,
+        "stopped": stopped,
+    }
+    return items[:target] if extract else items, report
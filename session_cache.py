@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+import json
+import os
+import time
+
+SESSION_FILE = os.getenv("TWITTER_SESSION_FILE", "twitter_session.json")
+AUTH_COOKIES = ("auth_token", "ct0")
+
+
+def load_session(path=SESSION_FILE):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def session_known_good(path=SESSION_FILE, max_age_hours=72, margin_hours=1):
+    """True when the profile's auth cookie is still valid and a scrape succeeded recently"""
+    session = load_session(path)
+    if not session.get("last_success") or not session.get("auth_expires"):
+        return False
+    if session["auth_expires"] < time.time() + margin_hours * 3600:
+        return False
+    last_success = datetime.fromisoformat(session["last_success"])
+    return datetime.now() - last_success < timedelta(hours=max_age_hours)
+
+
+def auth_cookie_expiry(driver):
+    """Earliest expiry (epoch seconds) of the auth cookies in the browser, or None"""
+    expiries = [
+        cookie["expiry"] for cookie in driver.get_cookies()
+        if cookie.get("name") in AUTH_COOKIES and cookie.get("expiry")
+    ]
+    return min(expiries) if expiries else None
+
+
+def record_success(driver, path=SESSION_FILE):
+    """Remember that the session worked, along with when its auth cookie expires"""
+    expiry = auth_cookie_expiry(driver)
+    if not expiry:
+        return
+    session = {
+        "auth_expires": expiry,
+        "auth_expires_at": datetime.fromtimestamp(expiry).isoformat(),
+        "last_success": datetime.now().isoformat(),
+    }
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(session, f, indent=2)
+    os.replace(tmp, path)
+
+
+def invalidate_session(path=SESSION_FILE):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def redirected_to_login(driver):
+    """Also usable as a WebDriverWait condition"""
+    url = driver.current_url
+    return "/login" in url or "/i/flow/login" in url or "/logout" in url
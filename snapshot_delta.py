@@ -0,0 +1,402 @@
+"""Compact, deduplicated snapshot history: interned strings plus per-run deltas.
+
+Each (source, geo) stream is two append-only files under DELTA_DIR:
+
+    google_TR.strings   one JSON string per line; its line number is the string id
+    google_TR.jsonl     one line per snapshot
+
+A snapshot line is either a keyframe ({"t", "k": {key: state}}) or a delta
+against the previous snapshot ({"t", "a": added, "c": changed fields,
+"d": removed keys}). A trend's state is {"q": query id, "r": rank,
+"v": volume id, "l": label id, "u": url id, "top"/"rising": [[id, value]]}.
+A keyframe is written every `keyframe_every` snapshots, so rebuilding any
+snapshot reads at most that many lines.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+import bisect
+import glob
+import gzip
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from file_handles import locked
+
+DELTA_DIR = os.getenv("TRENDS_DELTA_DIR", "deltas")
+
+
+class DeltaLog:
+    def __init__(self, source, geo="", root=DELTA_DIR, keyframe_every=24):
+        self.source = source
+        self.geo = geo
+        self.keyframe_every = keyframe_every
+        name = f"{source}_{geo}" if geo else source
+        self.strings_path = os.path.join(root, f"{name}.strings")
+        self.log_path = os.path.join(root, f"{name}.jsonl")
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        self.strings, self.ids = [], {}
+        # Byte offset, timestamp and keyframe flag of every snapshot line
+        self.offsets, self.times, self.keyframes = [], [], []
+        self.last_state = None
+        self._strings_end = self._log_end = 0
+        self._inodes = self._file_ids()
+        self._refresh()
+
+    def _file_ids(self):
+        return tuple(os.stat(p).st_ino if os.path.exists(p) else None for p in (self.strings_path, self.log_path))
+
+    @contextmanager
+    def _locked(self, shared=False):
+        """flock both files, retrying if import_exports swapped them in while we waited"""
+        if not shared:
+            for path in (self.strings_path, self.log_path):
+                open(path, "ab").close()
+        while True:
+            with locked([self.strings_path, self.log_path], shared) as fds:
+                if all(os.fstat(fd).st_ino == os.stat(path).st_ino for path, fd in fds.items()):
+                    yield
+                    return
+
+    @staticmethod
+    def _read_lines(path, start, repair=False):
+        """Complete lines after byte `start` and the new end offset. A torn last
+        line (crashed writer) is skipped, or truncated away when `repair` is set."""
+        try:
+            with open(path, "rb") as f:
+                f.seek(start)
+                data = f.read()
+        except FileNotFoundError:
+            return [], start
+        end = data.rfind(b"\n") + 1
+        if repair and end < len(data):
+            os.truncate(path, start + end)
+        return data[:end].splitlines(keepends=True), start + end
+
+    def _refresh(self, repair=False):
+        """Pick up snapshots and strings other processes appended since the last read"""
+        sizes = [os.path.getsize(p) if os.path.exists(p) else 0 for p in (self.strings_path, self.log_path)]
+        if sizes[0] < self._strings_end or sizes[1] < self._log_end or self._file_ids() != self._inodes:
+            self._load()  # replaced (import_exports) behind our back
+
+        # Log before strings: every id in a complete log line was written to the strings file first
+        offset = self._log_end
+        lines, self._log_end = self._read_lines(self.log_path, offset, repair)
+        for line in lines:
+            head = json.loads(line)
+            self.offsets.append(offset)
+            self.times.append(head["t"])
+            if "k" in head:
+                self.keyframes.append(len(self.offsets) - 1)
+            offset += len(line)
+        if lines:
+            self.last_state = None  # another writer appended; rebuild before diffing
+
+        lines, self._strings_end = self._read_lines(self.strings_path, self._strings_end, repair)
+        for line in lines:
+            text = json.loads(line)
+            self.ids.setdefault(text, len(self.strings))
+            self.strings.append(text)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def _intern(self, text, new):
+        if text is None:
+            return None
+        sid = self.ids.get(text)
+        if sid is None:
+            sid = self.ids[text] = len(self.strings)
+            self.strings.append(text)
+            new.append(text)
+        return sid
+
+    def encode_rows(self, rows, new):
+        """Rows (trend_store format) -> {key: state} with every string interned"""
+        states = {}
+        for row in rows:
+            qid = self._intern(row["query"], new)
+            key, n = str(qid), 1
+            while key in states:  # same query twice in one snapshot
+                n += 1
+                key = f"{qid}.{n}"
+            state = {"q": qid, "r": row.get("rank")}
+            for field, name in (("v", "volume_text"), ("l", "label"), ("u", "url")):
+                sid = self._intern(row.get(name) or None, new)
+                if sid is not None:
+                    state[field] = sid
+            related = row.get("related") or {}
+            for kind in ("top", "rising"):
+                if related.get(kind):
+                    state[kind] = [[self._intern(r["query"], new), r.get("value")] for r in related[kind]]
+            states[key] = state
+        return states
+
+    def decode_states(self, states):
+        rows = []
+        for state in sorted(states.values(), key=lambda s: (s.get("r") is None, s.get("r") or 0)):
+            row = {"rank": state.get("r"), "query": self.strings[state["q"]],
+                   "volume_text": self.strings[state["v"]] if "v" in state else ""}
+            if "l" in state:
+                row["label"] = self.strings[state["l"]]
+            if "u" in state:
+                row["url"] = self.strings[state["u"]]
+            related = {kind: [{"query": self.strings[sid], "value": value} for sid, value in state[kind]]
+                       for kind in ("top", "rising") if kind in state}
+            if related:
+                row["related"] = related
+            rows.append(row)
+        return rows
+
+    @staticmethod
+    def diff(previous, current):
+        delta = {}
+        added = {k: v for k, v in current.items() if k not in previous}
+        removed = [k for k in previous if k not in current]
+        changed = {}
+        for key, state in current.items():
+            old = previous.get(key)
+            if old is None or old == state:
+                continue
+            fields = {f: v for f, v in state.items() if old.get(f) != v}
+            fields.update({f: None for f in old if f not in state})
+            changed[key] = fields
+        if added:
+            delta["a"] = added
+        if changed:
+            delta["c"] = changed
+        if removed:
+            delta["d"] = removed
+        return delta
+
+    @staticmethod
+    def apply(states, delta):
+        states = {k: dict(v) for k, v in states.items()}
+        for key in delta.get("d", []):
+            states.pop(key, None)
+        for key, fields in delta.get("c", {}).items():
+            state = states[key]
+            for field, value in fields.items():
+                if value is None:
+                    state.pop(field, None)
+                else:
+                    state[field] = value
+        states.update({k: dict(v) for k, v in delta.get("a", {}).items()})
+        return states
+
+    def append(self, scraped_at, rows):
+        """Store one snapshot (as a delta unless a keyframe is due); returns its index.
+
+        Runs under an exclusive flock on both files, after reading whatever
+        other processes (daemon, bot) appended, so string ids never collide
+        and deltas are taken against the real previous snapshot.
+        """
+        with self._lock, self._locked():
+            self._refresh(repair=True)
+            new = []
+            states = self.encode_rows(rows, new)
+            index = len(self.offsets)
+            if index and self.last_state is None:
+                self.last_state = self._states(index - 1)
+
+            keyframe = not index or index - self.keyframes[-1] >= self.keyframe_every
+            record = {"t": scraped_at}
+            if keyframe:
+                record["k"] = states
+            else:
+                record.update(self.diff(self.last_state, states))
+
+            # Strings first: a crash after this leaves unused strings, never dangling ids
+            if new:
+                with open(self.strings_path, "ab") as f:
+                    f.write("".join(json.dumps(s, ensure_ascii=False) + "\n" for s in new).encode("utf-8"))
+                    self._strings_end = f.tell()
+            line = (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+            with open(self.log_path, "ab") as f:
+                offset = f.tell()
+                f.write(line)
+                self._log_end = f.tell()
+
+            self.offsets.append(offset)
+            self.times.append(scraped_at)
+            if keyframe:
+                self.keyframes.append(index)
+            self.last_state = states
+            return index
+
+    def _read_line(self, f, index):
+        f.seek(self.offsets[index])
+        return json.loads(f.readline())
+
+    def _states(self, index):
+        keyframe = self.keyframes[bisect.bisect_right(self.keyframes, index) - 1]
+        with open(self.log_path, "rb") as f:
+            states = self._read_line(f, keyframe)["k"]
+            for i in range(keyframe + 1, index + 1):
+                states = self.apply(states, self._read_line(f, i))
+        return states
+
+    def snapshot(self, index):
+        """Rebuild snapshot `index` (negative counts from the end) as {'scraped_at', 'rows'}"""
+        with self._lock, self._locked(shared=True):
+            self._refresh()
+            if index < 0:
+                index += len(self.offsets)
+            return {"scraped_at": self.times[index], "rows": self.decode_states(self._states(index))}
+
+    def at(self, scraped_at):
+        """The newest snapshot taken at or before `scraped_at` (ISO string), or None"""
+        with self._lock, self._locked(shared=True):
+            self._refresh()
+            index = bisect.bisect_right(self.times, scraped_at) - 1
+        return self.snapshot(index) if index >= 0 else None
+
+    def _iter_snapshots(self):
+        """Every snapshot in order as (scraped_at, rows); the caller holds the file locks"""
+        states = None
+        with open(self.log_path, "rb") as f:
+            for index, scraped_at in enumerate(self.times):
+                record = self._read_line(f, index)
+                states = record["k"] if "k" in record else self.apply(states, record)
+                yield scraped_at, self.decode_states(states)
+
+    def size(self):
+        return sum(os.path.getsize(p) for p in (self.strings_path, self.log_path) if os.path.exists(p))
+
+
+_logs = {}
+_logs_lock = threading.Lock()
+
+
+def get_log(source, geo="", root=DELTA_DIR):
+    """Shared DeltaLog per stream, so the in-memory string table is loaded once"""
+    with _logs_lock:
+        key = (source, geo, root)
+        if key not in _logs:
+            _logs[key] = DeltaLog(source, geo, root)
+        return _logs[key]
+
+
+def append_google_run(all_trends_data, geo="TR", root=DELTA_DIR):
+    from trend_store import google_rows
+    entries = [e for e in all_trends_data if e.get("success")]
+    if entries:
+        return get_log("google", geo, root).append(min(e["timestamp"] for e in entries), google_rows(entries))
+
+
+def append_twitter_run(trends, scraped_at=None, root=DELTA_DIR):
+    from datetime import datetime
+    from trend_store import twitter_rows
+    return get_log("twitter", "", root).append(scraped_at or datetime.now().isoformat(), twitter_rows(trends))
+
+
+def import_exports(directory=".", root=DELTA_DIR):
+    """Merge every CSV/JSON export into the delta logs under `root`.
+
+    Runs already in a log (live appends, earlier imports) are kept; an exported
+    snapshot is only added when its stream has none within 90 s. A changed
+    stream is rewritten oldest first in a temp directory and swapped in while
+    its files stay flock'ed, so appends from the daemon wait for the swap.
+    Returns ({(source, geo): DeltaLog}, the exported snapshots added).
+    """
+    from trend_store import _near, iter_export_snapshots
+
+    exported = {}
+    for snap in iter_export_snapshots(directory):
+        exported.setdefault((snap["source"], snap["geo"]), []).append(snap)
+    os.makedirs(root, exist_ok=True)
+    for path in glob.glob(os.path.join(root, "*.jsonl")):
+        source, _, geo = os.path.basename(path)[:-len(".jsonl")].partition("_")
+        exported.setdefault((source, geo), [])
+
+    logs, added = {}, []
+    for (source, geo), snaps in sorted(exported.items()):
+        log = logs[(source, geo)] = DeltaLog(source, geo, root)
+        with log._lock, log._locked():
+            log._refresh(repair=True)
+            stored = list(log._iter_snapshots())
+            times = sorted(datetime.fromisoformat(t) for t, _ in stored)
+            new = [s for s in snaps if not _near(times, datetime.fromisoformat(s["scraped_at"]))]
+            if not new:
+                continue
+
+            merged = sorted(stored + [(s["scraped_at"], s["rows"]) for s in new], key=lambda s: s[0])
+            tmp = tempfile.mkdtemp(prefix=".import-", dir=root)
+            try:
+                fresh = DeltaLog(source, geo, tmp, log.keyframe_every)
+                for scraped_at, rows in merged:
+                    fresh.append(scraped_at, rows)
+                # Strings first: a reader that sees the new log always finds its string ids
+                os.replace(fresh.strings_path, log.strings_path)
+                os.replace(fresh.log_path, log.log_path)
+            finally:
+                shutil.rmtree(tmp, ignore_errors=True)
+            log._load()
+        added.extend(new)
+    return logs, sorted(added, key=lambda s: s["scraped_at"])
+
+
+def benchmark_deltas(directory="."):
+    """On-disk size of the exports versus delta logs built from them in a temp
+    directory (the live logs are not touched), and rebuild latency per snapshot"""
+    root = tempfile.mkdtemp(prefix="deltas-bench-")
+    try:
+        _benchmark_deltas(directory, root)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def _benchmark_deltas(directory, root):
+    logs, snapshots = import_exports(directory, root)
+
+    export_files = (glob.glob(os.path.join(directory, "trends*.csv"))
+                    + glob.glob(os.path.join(directory, "trends_data_mZ3RIc*.json"))
+                    + glob.glob(os.path.join(directory, "twitter_trends*.json"))
+                    + glob.glob(os.path.join(directory, "twitter_trends.csv")))
+    export_bytes = sum(os.path.getsize(p) for p in export_files)
+    delta_bytes = sum(log.size() for log in logs.values())
+
+    def gzipped(paths):
+        return sum(len(gzip.compress(open(p, "rb").read())) for p in paths)
+
+    delta_files = [p for log in logs.values() for p in (log.strings_path, log.log_path)]
+    print(f"Delta storage over {len(snapshots)} snapshots in {len(logs)} streams:")
+    print(f"   exports ({len(export_files)} files): {export_bytes / 1024:.0f} KB ({gzipped(export_files) / 1024:.0f} KB gzipped)")
+    print(f"   delta logs ({len(delta_files)} files): {delta_bytes / 1024:.0f} KB ({gzipped(delta_files) / 1024:.0f} KB gzipped), "
+          f"{export_bytes / delta_bytes:.1f}x smaller")
+
+    # Every snapshot must come back exactly as it went in
+    expected = {}
+    for snap in snapshots:
+        expected.setdefault((snap["source"], snap["geo"]), []).append(snap)
+    mismatches, timings = 0, []
+    for key, log in logs.items():
+        fresh = DeltaLog(log.source, log.geo, root)
+        for i, snap in enumerate(expected[key]):
+            start = time.perf_counter()
+            rebuilt = fresh.snapshot(i)
+            timings.append((time.perf_counter() - start) * 1000)
+            if rebuilt["rows"] != fresh.decode_states(fresh.encode_rows(snap["rows"], [])):
+                mismatches += 1
+    timings.sort()
+    print(f"   rebuild: median {timings[len(timings) // 2]:.2f} ms, max {timings[-1]:.2f} ms; "
+          f"{mismatches} mismatching snapshots")
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "rebuild":
+        logs, snapshots = import_exports()
+        print(f"Merged {len(snapshots)} exported snapshots into {len(logs)} delta logs under {DELTA_DIR}")
+    elif command == "bench":
+        benchmark_deltas(*sys.argv[2:3])
+    else:
+        print("usage: python snapshot_delta.py rebuild | bench [export dir]")
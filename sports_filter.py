@@ -1,7 +1,19 @@
+from collections import OrderedDict
+import hashlib
+import json
+import os
 import re
+import tempfile
+import threading
+import time
+
+from file_handles import locked
+from text_normalize import NORMALIZER_VERSION, fold_diacritics, normalize, trie_regex, turkish_lower
+
+_MISSING = object()
 
 class SportsFilter:
-    def __init__(self):
+    def __init__(self, cache_size=4096, cache_path=None):
         # English sports keywords
         self.english_sports_keywords = [
             # Sports categories
@@ -60,84 +72,212 @@ class SportsFilter:
         # Combined keywords for both languages
         self.all_keywords = self.english_sports_keywords + self.turkish_sports_keywords
         
-        # Create regex patterns for better matching
-        self.patterns = [re.compile(rf'\b{re.escape(keyword)}\b', re.IGNORECASE) 
-                        for keyword in self.all_keywords]
-    
-    def is_sports_related(self, text):
-        """Check if text contains sports-related keywords in any language"""
-        if not text or not isinstance(text, str):
-            return False
-            
-        text_lower = text.lower()
-        
-        # Check for exact word matches
-        for pattern in self.patterns:
-            if pattern.search(text_lower):
-                return True
-        
         # Additional checks for Turkish-specific patterns
-        turkish_checks = [
+        self.turkish_checks = [
             # Team patterns like "Fenerbahçe - Galatasaray"
-            r'\b(fb|gs|bjk|ts)\b',
-            r'\b(fenerbahçe|galatasaray|beşiktaş|trabzonspor)\s*[-vs]\s*\w+',
+            r'\b(?:fb|gs|bjk|ts)\b',
+            r'\b(?:fenerbahçe|galatasaray|beşiktaş|trabzonspor)\s*[-vs]\s*\w+',
             # League patterns
             r'süper\s+lig',
             r'super\s+lig',
             r'tff\s*\d\.\s*lig',
         ]
         
-        for pattern in turkish_checks:
-            if re.search(pattern, text_lower, re.IGNORECASE):
-                return True
+        # Folded, these spell other words ("Mac Miller", "Toyota Yaris"), so
+        # they only count when the original text has the diacritics
+        self.diacritic_only_keywords = ['maç', 'maçlar', 'yarış', 'yarışlar']
+        
+        # One matcher for everything: a trie-factored alternation of all
+        # keywords between word boundaries, plus the Turkish patterns. Keywords
+        # and texts both go through text_normalize.normalize (patterns get its
+        # diacritic folding), so no IGNORECASE.
+        folded_keywords = [k for k in self.all_keywords if k not in self.diacritic_only_keywords]
+        self.matcher = re.compile(
+            rf'\b(?P<keyword>{trie_regex(normalize(k) for k in folded_keywords)})\b|'
+            + '|'.join(fold_diacritics(p) for p in self.turkish_checks)
+        )
+        # Folded forms of the diacritic-only keywords, and the keywords as
+        # written for the Turkish-lowered (unfolded) text
+        self.folded_only = re.compile(rf'\b(?:{trie_regex(normalize(k) for k in self.diacritic_only_keywords)})\b')
+        self.diacritic_matcher = re.compile(rf'\b(?:{trie_regex(self.diacritic_only_keywords)})\b')
+        
+        # Bounded LRU of decisions, valid only for this exact keyword set
+        self.keyword_version = hashlib.sha1(
+            json.dumps([self.all_keywords, self.turkish_checks, self.diacritic_only_keywords, NORMALIZER_VERSION], ensure_ascii=False).encode('utf-8')
+        ).hexdigest()[:12]
+        self.cache_size = cache_size
+        self.cache_path = cache_path
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        if cache_path:
+            self.load_cache()
+    
+    def match_keyword(self, text):
+        """Return the keyword (or Turkish pattern match) that marks text as sports, else None"""
+        if not text or not isinstance(text, str):
+            return None
+        return self.match_normalized(normalize(text), text)
+    
+    def match_normalized(self, key, text=None):
+        """match_keyword for text already passed through text_normalize.normalize.
+        
+        `text` is the original spelling; without it the diacritic-only
+        keywords (maç, yarış) never match.
+        """
+        if not key:
+            return None
+            
+        with self._cache_lock:
+            keyword = self._cache.get(key, _MISSING)
+            if keyword is not _MISSING:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return keyword
+            self.cache_misses += 1
+        
+        match = self.matcher.search(key)
+        keyword = (match.group('keyword') or match.group(0)) if match else None
+        if keyword is None and self.folded_only.search(key):
+            # "mac" may be "maç" or "Mac": decided by the original text, so not cached
+            return self._match_diacritics(text)
+        
+        if self.cache_size:
+            with self._cache_lock:
+                self._cache[key] = keyword
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return keyword
+    
+    def _match_diacritics(self, text):
+        if not text or not isinstance(text, str):
+            return None
+        match = self.diacritic_matcher.search(' '.join(turkish_lower(text).split()))
+        return match.group(0) if match else None
+    
+    def _read_cache_file(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return []
+        if data.get('version') != self.keyword_version:
+            return []
+        return data.get('entries', [])
+    
+    def load_cache(self, path=None):
+        """Load persisted decisions; a cache written for other keyword lists is discarded"""
+        path = path or self.cache_path
+        if not self.cache_size:
+            return 0
+        entries = self._read_cache_file(path)
+        with self._cache_lock:
+            for text, keyword in entries[-self.cache_size:]:
+                self._cache[text] = keyword
+        return len(self._cache)
+    
+    def save_cache(self, path=None):
+        """Persist the cache (most recently used last) with the keyword-list version.
+        
+        The read-merge-replace runs under an flock on `<path>.lock`, so entries
+        another process (the Google or Twitter job) saved are kept, and the
+        file is swapped in through a unique temp file. Returns False (and
+        logs) instead of raising.
+        """
+        path = path or self.cache_path
+        if not path or not self.cache_size:
+            return False
+        tmp = None
+        try:
+            with self._cache_lock:
+                ours = list(self._cache.items())
+            keys = {text for text, _ in ours}
+            
+            # A separate lock file: the cache itself is replaced, so its inode changes
+            lock_path = f"{path}.lock"
+            open(lock_path, 'a').close()
+            with locked([lock_path]):
+                theirs = [(text, keyword) for text, keyword in self._read_cache_file(path) if text not in keys]
+                data = {'version': self.keyword_version, 'entries': (theirs + ours)[-self.cache_size:]}
+                
+                fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp",
+                                           dir=os.path.dirname(os.path.abspath(path)))
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp, path)
+            return True
+        except Exception as e:
+            print(f"Sports filter cache not saved: {e}")
+            if tmp and os.path.exists(tmp):
+                os.remove(tmp)
+            return False
+    
+    def is_sports_related(self, text):
+        """Check if text contains sports-related keywords in any language"""
+        return self.match_keyword(text) is not None
+    
+    @staticmethod
+    def trend_text(trend):
+        """Text to classify for a trend in any of the supported formats"""
+        if isinstance(trend, dict):
+            return trend.get('name') or trend.get('title') or trend.get('query', '') or trend.get('trend', '')
+        return str(trend)
+    
+    def trend_norm(self, trend):
+        """Stored normalised form of a trend, computed only if the record lacks one"""
+        if isinstance(trend, dict) and trend.get('norm') is not None:
+            return trend['norm']
+        return normalize(self.trend_text(trend))
+    
+    @staticmethod
+    def new_stats():
+        return {'total': 0, 'sports_related': 0, 'non_sports': 0, 'filtered_percentage': 0, 'matched_keywords': {}}
+    
+    def iter_classify(self, trends, stats=None):
+        """Lazily yield (trend, matched_keyword_or_None), updating `stats` as items stream by"""
+        for trend in trends:
+            keyword = self.match_normalized(self.trend_norm(trend), self.trend_text(trend))
+            if stats is not None:
+                stats['total'] += 1
+                if keyword is None:
+                    stats['non_sports'] += 1
+                else:
+                    stats['sports_related'] += 1
+                    stats['matched_keywords'][keyword] = stats['matched_keywords'].get(keyword, 0) + 1
+                stats['filtered_percentage'] = stats['sports_related'] / stats['total'] * 100
+            yield trend, keyword
+    
+    def classify_batch(self, trends):
+        """Classify every trend once: kept items, removed items, their keywords and stats"""
+        result = {'kept': [], 'removed': [], 'keywords': [], 'stats': self.new_stats()}
+        hits, misses = self.cache_hits, self.cache_misses
+        
+        for trend, keyword in self.iter_classify(trends or [], result['stats']):
+            if keyword is None:
+                result['kept'].append(trend)
+            else:
+                result['removed'].append(trend)
+                result['keywords'].append(keyword)
                 
-        return False
+        result['stats']['cache_hits'] = self.cache_hits - hits
+        result['stats']['cache_misses'] = self.cache_misses - misses
+        return result
     
     def filter_sports_topics(self, trends_list):
         """Filter out sports-related trends from a list (both English and Turkish)"""
         if not trends_list:
             return []
             
-        non_sports_trends = []
-        removed_count = 0
-        
-        for trend in trends_list:
-            # Handle different trend formats
-            if isinstance(trend, dict):
-                trend_text = trend.get('name') or trend.get('title') or trend.get('query', '') or trend.get('trend', '')
-            else:
-                trend_text = str(trend)
-                
-            if not self.is_sports_related(trend_text):
-                non_sports_trends.append(trend)
-            else:
-                removed_count += 1
-                
-        print(f"Filtered out {removed_count} sports-related trends")
-        return non_sports_trends
+        result = self.classify_batch(trends_list)
+        print(f"Filtered out {len(result['removed'])} sports-related trends")
+        return result['kept']
     
     def get_filter_stats(self, trends_list):
         """Get statistics about filtered content"""
-        sports_count = 0
-        non_sports_count = 0
-        
-        for trend in trends_list:
-            if isinstance(trend, dict):
-                trend_text = trend.get('name') or trend.get('title') or trend.get('query', '') or trend.get('trend', '')
-            else:
-                trend_text = str(trend)
-                
-            if self.is_sports_related(trend_text):
-                sports_count += 1
-            else:
-                non_sports_count += 1
-                
-        return {
-            'total': len(trends_list),
-            'sports_related': sports_count,
-            'non_sports': non_sports_count,
-            'filtered_percentage': (sports_count / len(trends_list) * 100) if trends_list else 0
-        }
+        stats = self.classify_batch(trends_list)['stats']
+        del stats['matched_keywords']
+        return stats
 
 # Global instance
 sports_filter = SportsFilter()
@@ -170,5 +310,47 @@ def test_sports_filter():
     stats = sports_filter.get_filter_stats(test_trends)
     print(f"\nFilter stats: {stats}")
 
+def benchmark_sports_filter(sources=(("trends.csv", "query"), ("twitter_trends.csv", "name")), repeat=3):
+    """Per-item latency of the old one-regex-per-keyword loop versus the single matcher"""
+    import csv
+
+    texts = []
+    for filename, column in sources:
+        with open(filename, encoding="utf-8") as f:
+            texts.extend(row[column] for row in csv.DictReader(f))
+
+    legacy_patterns = [re.compile(rf'\b{re.escape(keyword)}\b', re.IGNORECASE)
+                       for keyword in sports_filter.all_keywords]
+
+    def legacy_is_sports_related(text):
+        text_lower = text.lower()
+        if any(pattern.search(text_lower) for pattern in legacy_patterns):
+            return True
+        return any(re.search(pattern, text_lower, re.IGNORECASE) for pattern in sports_filter.turkish_checks)
+
+    uncached = SportsFilter(cache_size=0)
+    cached = SportsFilter()
+
+    results = {}
+    for name, check in (("legacy", legacy_is_sports_related),
+                        ("matcher", uncached.is_sports_related),
+                        ("cached", cached.is_sports_related)):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            decisions = [check(text) for text in texts]
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = {"us_per_item": round(best / len(texts) * 1e6, 2), "sports": sum(decisions)}
+
+    print(f"Sports filter benchmark over {len(texts)} items (cache hits {cached.cache_hits}, misses {cached.cache_misses}):")
+    for name, r in results.items():
+        print(f"   {name:8s} {r['us_per_item']} µs/item, {r['sports']} sports-related")
+    return results
+
 if __name__ == "__main__":
-    test_sports_filter()
+    import sys
+    if "--bench" in sys.argv:
+        benchmark_sports_filter()
+    else:
+        test_sports_filter()
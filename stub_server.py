@@ -0,0 +1,179 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import json
+import os
+import sys
+import threading
+import time
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Recorded responses served by path (query strings are ignored)
+ROUTES = {
+    "/trending/rss": ("application/rss+xml; charset=utf-8", "google_trends_rss.xml"),
+    "/trends/trendingsearches/daily": ("text/html; charset=utf-8", "google_trends_daily.html"),
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    routes = ROUTES
+    latency_ms = 0
+
+    def do_GET(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        route = self.routes.get(urlparse(self.path).path)
+        if not route:
+            self.send_error(404)
+            return
+
+        content_type, fixture = route
+        with open(os.path.join(FIXTURES_DIR, fixture), "rb") as f:
+            body = f.read()
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RelatedStubHandler(StubHandler):
+    """Keep-alive stand-in for the Trends explore / related-searches API.
+
+    Every `throttle_every`-th request is answered with 429 and Retry-After: 0.
+    """
+    protocol_version = "HTTP/1.1"
+    throttle_every = 0
+    counter = None
+
+    def send_json(self, status, payload):
+        body = (")]}',\n" + json.dumps(payload, ensure_ascii=False)).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        with self.counter["lock"]:
+            self.counter["n"] += 1
+            n = self.counter["n"]
+        if self.throttle_every and n % self.throttle_every == 0:
+            self.send_json(429, {"error": "rate limited"})
+            return
+
+        parsed = urlparse(self.path)
+        params = parse_qs(parsed.query)
+        req = json.loads(params.get("req", ["{}"])[0])
+        if parsed.path == "/trends/api/explore":
+            keyword = req["comparisonItem"][0]["keyword"]
+            self.send_json(200, {"widgets": [
+                {"id": "TIMESERIES", "token": "ts", "request": {}},
+                {"id": "RELATED_QUERIES", "token": f"rq-{len(keyword)}",
+                 "request": {"restriction": {"complexKeywordsRestriction": {"keyword": [{"value": keyword}]}}}},
+            ]})
+        elif parsed.path == "/trends/api/widgetdata/relatedsearches":
+            keyword = req["restriction"]["complexKeywordsRestriction"]["keyword"][0]["value"]
+            top = [{"query": f"{keyword} {w}", "value": 100 - 10 * i} for i, w in enumerate(["son dakika", "canlı", "maç", "özet", "gol", "kadro"])]
+            rising = [{"query": f"{keyword} {w}", "value": 5000 - 700 * i} for i, w in enumerate(["bilet", "saat kaçta", "hangi kanalda"])]
+            self.send_json(200, {"default": {"rankedList": [{"rankedKeyword": top}, {"rankedKeyword": rising}]}})
+        else:
+            self.send_json(404, {"error": "not found"})
+
+
+def start_stub_server(port=0, routes=None, latency_ms=0, handler=StubHandler, **attrs):
+    """Serve recorded responses on localhost in a background thread; returns (server, base_url)"""
+    handler_class = type("ConfiguredStubHandler", (handler,), {
+        "routes": routes or handler.routes,
+        "latency_ms": latency_ms,
+        "counter": {"n": 0, "lock": threading.Lock()},
+        **attrs,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler_class)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def benchmark_backends(runs=5):
+    """Time the HTTP and Selenium Google backends against the stub server"""
+    from trends_fetch import fetch_trends_http, validate_trends
+
+    server, base_url = start_stub_server()
+    results = {}
+    try:
+        backends = {"http": lambda: fetch_trends_http(url=f"{base_url}/trending/rss")}
+        try:
+            from scraped_and_saved import scrape_trends_selenium
+            backends["selenium"] = lambda: scrape_trends_selenium(
+                url=f"{base_url}/trends/trendingsearches/daily?geo=TR&hl=tr"
+            )
+        except ImportError as e:
+            print(f"Selenium backend skipped: {e}")
+
+        for name, fetch in backends.items():
+            timings, trends = [], []
+            for _ in range(runs):
+                start = time.perf_counter()
+                trends = fetch()
+                timings.append((time.perf_counter() - start) * 1000)
+            results[name] = {
+                "trends": len(trends),
+                "valid": validate_trends(trends),
+                "first_ms": round(timings[0], 1),
+                "avg_ms": round(sum(timings) / len(timings), 1),
+            }
+    finally:
+        server.shutdown()
+
+    print(f"Backend benchmark ({runs} runs against {base_url})")
+    for name, r in results.items():
+        print(f"   {name:8s} trends={r['trends']:3d} valid={r['valid']} first={r['first_ms']} ms avg={r['avg_ms']} ms")
+    return results
+
+
+def benchmark_related(queries=15, latency_ms=200, throttle_every=5):
+    """Fetch related queries for `queries` trends sequentially and concurrently from the stub API"""
+    from related_fetch import RelatedQueriesFetcher
+
+    server, base_url = start_stub_server(handler=RelatedStubHandler, latency_ms=latency_ms,
+                                         throttle_every=throttle_every)
+    trends = [{"query": f"trend {i}"} for i in range(queries)]
+    try:
+        print(f"Related-queries benchmark: {queries} trends, {latency_ms} ms latency, 429 every {throttle_every} requests")
+        for concurrency in (1, 4, 8):
+            fetcher = RelatedQueriesFetcher(base_url=base_url, rate=20, burst=8,
+                                            concurrency=concurrency, backoff=0.05)
+            results = fetcher.fetch_batch(trends)
+            ok = sum(1 for r in results if isinstance(r, dict) and len(r["top"]) == 5)
+            print(f"   concurrency {concurrency}: {fetcher.stats['ms']} ms, {ok}/{queries} ok, "
+                  f"{fetcher.stats['requests']} requests, {fetcher.stats['retries']} retries, "
+                  f"{fetcher.stats['connections']} connections")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        benchmark_backends()
+    elif "--related" in sys.argv:
+        benchmark_related()
+    else:
+        server, base_url = start_stub_server(port=int(os.getenv("STUB_PORT", "8765")))
+        print(f"Stub server running at {base_url} (Ctrl+C to stop)")
+        print(f"   TRENDS_RSS_URL={base_url}/trending/rss")
+        print(f"   TRENDS_PAGE_URL={base_url}/trends/trendingsearches/daily?geo=TR&hl=tr")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
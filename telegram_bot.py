@@ -8,6 +8,11 @@ import os
 
 # Import your Twitter/X scraper
 from twitter_trends_scraper import scrape_twitter_trends
+from scraper_daemon import send_command
+from browser_pool import close_pool
+from file_handles import locked
+from csv_index import index_for
+import history
 
 # Configure logging
 logging.basicConfig(
@@ -48,6 +53,7 @@ Available commands:
 • /scrape - Run the Google Trends scraper
 • /xtrends - Run the Twitter/X trends scraper
 • /status - Check scraper status
+• /history <query> - When a query trended and how big it got
 • /push - Push latest data to GitHub
 • /help - Show this help message
 
@@ -69,6 +75,7 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 • /scrape - Run the Google Trends scraper
 • /xtrends - Run the Twitter/X trends scraper
 • /status - Check the status of the last scrape
+• /history <query> - First/last seen, hours trending and peak volume
 • /push - Push latest data to GitHub
 • /help - Show this help message
 
@@ -88,6 +95,29 @@ async def scrape_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Send initial message
     message = await update.message.reply_text("🔄 Starting Google Trends scraper...")
     
+    # Prefer the resident scraper daemon (warm browser, no interpreter startup)
+    try:
+        reply = await asyncio.to_thread(send_command, "run google wait")
+        if reply.get("busy"):
+            await message.edit_text("⏳ A Google Trends run is already in progress.")
+            return
+        job = reply.get("job", {})
+        result = job.get("last_result") or {}
+        if job.get("last_error"):
+            await message.edit_text(f"❌ Google Trends Scraping Failed!\n\n{job['last_error']}")
+        else:
+            await message.edit_text(
+                f"✅ *Google Trends Scraping Completed!*\n\n"
+                f"• Total trends processed: {result.get('processed', 0)}\n"
+                f"• Successful: {result.get('success', 0)}\n"
+                f"• Duration: {job.get('last_duration_s')} s\n"
+                f"• Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                parse_mode='Markdown'
+            )
+        return
+    except OSError:
+        pass  # daemon not running, fall back to a one-shot process
+
     try:
         # Run the scraper script
         process = await asyncio.create_subprocess_exec(
@@ -204,10 +234,11 @@ def git_push(commit_message="Update trends data"):
         subprocess.run(["git", "config", "user.name", "GitHub Actions Bot"], check=True, capture_output=True)
         subprocess.run(["git", "config", "user.email", "actions@users.noreply.github.com"], check=True, capture_output=True)
         
-        # Add all relevant files
-        subprocess.run(["git", "add", "twitter_trends.csv"], check=True, capture_output=True)
-        subprocess.run(["git", "add", "trends.csv"], check=True, capture_output=True)
-        subprocess.run(["git", "add", "*.json"], check=True, capture_output=True)
+        # Add all relevant files (holding the writers' locks so no half-written run is staged)
+        with locked(["twitter_trends.csv", "trends.csv"], shared=True):
+            subprocess.run(["git", "add", "twitter_trends.csv"], check=True, capture_output=True)
+            subprocess.run(["git", "add", "trends.csv"], check=True, capture_output=True)
+            subprocess.run(["git", "add", "*.json"], check=True, capture_output=True)
         
         # Check for changes more reliably
         result = subprocess.run(["git", "status", "--porcelain"], capture_output=True, text=True, check=True)
@@ -282,7 +313,29 @@ async def xtrends_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     message = await update.message.reply_text("🔄 Scraping Twitter/X trends...")
     
     try:
-        trends = scrape_twitter_trends()
+        # The daemon owns the Chrome profile; a second Chrome on it would fail to start
+        try:
+            reply = await asyncio.to_thread(send_command, "run twitter wait")
+        except OSError:
+            reply = None  # daemon not running, scrape here
+        
+        if reply is not None:
+            if reply.get("busy"):
+                await message.edit_text("⏳ A Twitter/X run is already in progress.")
+                return
+            job = reply.get("job", {})
+            if job.get("last_error"):
+                await message.edit_text(f"❌ Error scraping Twitter trends:\n{job['last_error']}")
+                return
+            result = job.get("last_result") or {}
+            trends, total = result.get("top", []), result.get("processed", 0)
+        else:
+            try:
+                trends = await asyncio.to_thread(scrape_twitter_trends)
+            finally:
+                # Don't keep a pooled Chrome (and selenium_profile) open for the bot's lifetime
+                close_pool("twitter")
+            total = len(trends)
         
         if not trends:
             await message.edit_text("❌ Failed to scrape Twitter/X trends.")
@@ -294,7 +347,7 @@ async def xtrends_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             for t in trends[:10]
         ]
         result_text = "📊 *Top Twitter/X Trends:*\n\n" + "\n".join(result_lines)
-        result_text += f"\n\n✅ Saved {len(trends)} trends to local CSV file"
+        result_text += f"\n\n✅ Saved {total} trends to local CSV file"
 
         await message.edit_text(result_text, parse_mode="Markdown")
         
@@ -313,54 +366,24 @@ async def xtrends_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def status_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Check the status of the scraper."""
-    # Check if the CSV file exists and get its stats
-    csv_exists = os.path.exists("trends.csv")
-    twitter_csv_exists = os.path.exists("twitter_trends.csv")
     status_info = ""
-    
-    if csv_exists:
-        try:
-            # Get file modification time
-            mod_time = os.path.getmtime("trends.csv")
-            mod_date = datetime.fromtimestamp(mod_time).strftime('%Y-%m-%d %H:%M:%S')
-            status_info += f"• Google Trends - Last update: {mod_date}\n"
-            
-            # Count lines in the CSV file
-            with open("trends.csv", "r", encoding="utf-8") as f:
-                line_count = sum(1 for line in f) - 1  # Subtract header row
-            
-            status_info += f"• Google Trends - Total records: {line_count}\n"
-        except Exception as e:
-            status_info += f"• Google Trends - Error reading file: {str(e)}\n"
-    else:
-        status_info += "• Google Trends - No data found\n"
-    
-    if twitter_csv_exists:
+
+    # Row counts, last timestamps and the latest run come from the sidecar index (no full scans)
+    for name, csv_file in (("Google Trends", "trends.csv"), ("Twitter Trends", "twitter_trends.csv")):
+        if not os.path.exists(csv_file):
+            status_info += f"• {name} - No data found\n"
+            continue
         try:
-            # Get file modification time
-            mod_time = os.path.getmtime("twitter_trends.csv")
-            mod_date = datetime.fromtimestamp(mod_time).strftime('%Y-%m-%d %H:%M:%S')
-            status_info += f"• Twitter Trends - Last update: {mod_date}\n"
-            
-            # Count lines in the CSV file
-            with open("twitter_trends.csv", "r", encoding="utf-8") as f:
-                line_count = sum(1 for line in f) - 1  # Subtract header row
-            
-            status_info += f"• Twitter Trends - Total records: {line_count}\n"
+            status = index_for(csv_file).status()
+            last_update = (status["last_timestamp"] or "")[:19].replace("T", " ") or "-"
+            status_info += f"• {name} - Last update: {last_update}\n"
+            status_info += f"• {name} - Total records: {status['rows']} ({status['snapshots']} runs)\n"
+            latest = status["latest_snapshot"]
+            if latest:
+                status_info += f"• {name} - Latest run: {latest['timestamp'][:19].replace('T', ' ')} ({latest['rows']} trends)\n"
         except Exception as e:
-            status_info += f"• Twitter Trends - Error reading file: {str(e)}\n"
-    else:
-        status_info += "• Twitter Trends - No data found\n"
-    
-    # Check for JSON files
-    json_files = [f for f in os.listdir('.') if f.startswith('twitter_trends_') and f.endswith('.json')]
-    if json_files:
-        json_files.sort(reverse=True)
-        latest_json = json_files[0]
-        mod_time = os.path.getmtime(latest_json)
-        mod_date = datetime.fromtimestamp(mod_time).strftime('%Y-%m-%d %H:%M:%S')
-        status_info += f"• Latest JSON: {latest_json} ({mod_date})\n"
-    
+            status_info += f"• {name} - Error reading file: {str(e)}\n"
+
     status_text = f"""
 📊 *Scraper Status*
 
@@ -371,6 +394,35 @@ Use /scrape to run Google Trends scraper or /xtrends for Twitter/X trends.
     """
     await update.message.reply_text(status_text, parse_mode='Markdown')
 
+async def history_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show how long and how big a query trended, per source."""
+    query = " ".join(context.args).strip()
+    if not query:
+        await update.message.reply_text("Usage: /history <query>  (e.g. /history togg)")
+        return
+
+    try:
+        lines = [f"🔎 History: {query}"]
+        for source, name in (("google", "Google Trends"), ("twitter", "Twitter/X")):
+            life = history.lifetime(query, source)
+            if not life:
+                lines.append(f"\n• {name}: never trended")
+                continue
+            top = history.peak(query, source)
+            lines.append(f"\n• {name}")
+            lines.append(f"  First seen: {life['first_seen'][:16].replace('T', ' ')}")
+            lines.append(f"  Last seen: {life['last_seen'][:16].replace('T', ' ')}")
+            lines.append(f"  Trending for {life['hours']} hours ({life['snapshots']} snapshots)")
+            if top["best_rank"] is not None:
+                lines.append(f"  Best rank: #{top['best_rank']}")
+            if top["volume"] is not None:
+                lines.append(f"  Peak volume: {top['volume']:,} ({top['at'][:16].replace('T', ' ')})")
+        # Plain text: queries may contain Markdown control characters
+        await update.message.reply_text("\n".join(lines))
+    except Exception as e:
+        await update.message.reply_text(f"❌ Error reading trend history:\n{str(e)}")
+        logger.error(f"History error: {e}")
+
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle regular text messages."""
     text = update.message.text.lower()
@@ -401,6 +453,7 @@ def main():
     application.add_handler(CommandHandler("scrape", scrape_command))
     application.add_handler(CommandHandler("xtrends", xtrends_command))
     application.add_handler(CommandHandler("status", status_command))
+    application.add_handler(CommandHandler("history", history_command))
     application.add_handler(CommandHandler("push", push_command))
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
 
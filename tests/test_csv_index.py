@@ -0,0 +1,84 @@
+import csv
+import json
+import os
+import threading
+
+from csv_index import CsvIndex, index_for
+from file_handles import append_rows
+
+HEADER = ["timestamp", "query", "volume", "related_top", "related_rising"]
+
+
+def run(path, when, queries):
+    """Append one scraper run: every row carries the same-minute timestamp"""
+    append_rows([path], HEADER, [[f"{when}:{i:02d}", q, "20 B+", f"{q} canlı, {q}\nmaç", ""]
+                                 for i, q in enumerate(queries)], indexed=[path])
+
+
+def full_scan(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_incremental_index_matches_a_full_scan(tmp_path):
+    path = str(tmp_path / "trends.csv")
+    run(path, "2025-09-15T10:00", ["Togg", "Deprem", "Süper Lig"])
+    run(path, "2025-09-15T11:00", ["Galatasaray, maç", "Togg"])
+    status = index_for(path).status()
+    assert status == {"rows": 5, "snapshots": 2, "last_timestamp": "2025-09-15T11:00:01",
+                      "latest_snapshot": {"timestamp": "2025-09-15T11:00:00", "rows": 2}}
+
+    rows = full_scan(path)
+    fresh = CsvIndex(path)
+    assert fresh.snapshot(0) == rows[:3]
+    assert fresh.latest_snapshot() == rows[3:]
+    assert fresh.tail(4) == rows[-4:] and fresh.tail(10) == rows and fresh.tail(0) == []
+
+
+def test_partial_row_is_picked_up_later(tmp_path):
+    path = str(tmp_path / "trends.csv")
+    run(path, "2025-09-15T10:00", ["Togg"])
+    with open(path, "ab") as f:
+        f.write(b'2025-09-15T11:00:00,"yar')
+    index = CsvIndex(path)
+    assert index.status()["rows"] == 1
+    with open(path, "ab") as f:
+        f.write(b'\xc4\xb1m",1,,\r\n')
+    assert index.status()["rows"] == 2
+    assert index.latest_snapshot()[0]["query"] == "yarım"
+
+
+def test_external_edit_triggers_a_rebuild(tmp_path):
+    path = str(tmp_path / "trends.csv")
+    run(path, "2025-09-15T10:00", ["Togg", "Deprem"])
+    run(path, "2025-09-15T11:00", ["Togg"])
+    index = CsvIndex(path)
+    index.status()
+    rows = full_scan(path)
+    with open(path, "w", newline="", encoding="utf-8") as f:  # same size, different bytes
+        writer = csv.DictWriter(f, HEADER)
+        writer.writeheader()
+        writer.writerows([{**rows[0], "query": "Tugg"}, *rows[1:]])
+    assert index.snapshot(0)[0]["query"] == "Tugg"
+
+    os.replace(path, path + ".old")
+    run(path, "2025-09-16T09:00", ["Yeni"])
+    assert index.status()["rows"] == 1
+
+
+def test_index_file_is_written_atomically(tmp_path):
+    path = str(tmp_path / "trends.csv")
+    run(path, "2025-09-15T10:00", ["Togg"])
+    indexes = [CsvIndex(path) for _ in range(8)]
+    threads = [threading.Thread(target=i.refresh) for i in indexes]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(os.listdir(tmp_path)) == ["trends.csv", "trends.csv.idx"]
+    with open(path + ".idx", encoding="utf-8") as f:
+        assert json.load(f)["rows"] == 1
+
+
+def test_missing_file(tmp_path):
+    assert CsvIndex(str(tmp_path / "nope.csv")).status()["rows"] == 0
@@ -0,0 +1,121 @@
+import csv
+import os
+import subprocess
+import sys
+
+import pytest
+
+import file_handles
+from file_handles import _mark_pending, _pending_path, append_rows, format_rows
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEADER = ["timestamp", "query", "volume"]
+
+
+def read(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+
+@pytest.fixture(params=[False, True], ids=["one-shot", "keep-open"])
+def keep_open(request, monkeypatch):
+    monkeypatch.setattr(file_handles, "keep_open", request.param)
+    yield request.param
+    file_handles.close_all()
+
+
+def test_header_once_and_quoted_rows(tmp_path, keep_open):
+    path = str(tmp_path / "trends.csv")
+    append_rows([path], HEADER, [["t1", "Galatasaray, maç", "20 B+"]])
+    append_rows([path], HEADER, [["t2", 'çok\n"satırlı"', ""]])
+    assert read(path) == [HEADER, ["t1", "Galatasaray, maç", "20 B+"], ["t2", 'çok\n"satırlı"', ""]]
+    assert not os.path.exists(_pending_path(path))
+
+
+def test_fans_out_to_every_file(tmp_path, keep_open):
+    paths = [str(tmp_path / "trends.csv"), str(tmp_path / "trends_2025-09-15.csv")]
+    append_rows(paths, HEADER, [["t1", "Togg", ""]])
+    assert [read(p) for p in paths] == [[HEADER, ["t1", "Togg", ""]]] * 2
+
+
+def test_replaced_file_is_reopened(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_handles, "keep_open", True)
+    path = str(tmp_path / "trends.csv")
+    try:
+        append_rows([path], HEADER, [["t1", "a", ""]])
+        os.replace(path, path + ".old")
+        append_rows([path], HEADER, [["t2", "b", ""]])
+    finally:
+        file_handles.close_all()
+    assert read(path) == [HEADER, ["t2", "b", ""]]
+
+
+def test_interrupted_append_is_truncated(tmp_path):
+    path = str(tmp_path / "trends.csv")
+    append_rows([path], HEADER, [["t1", "a", ""]])
+    fd = os.open(path, os.O_RDWR | os.O_APPEND)
+    try:
+        data = format_rows([["t2", 'yarım "satır', ""]])
+        _mark_pending(path, fd, os.fstat(fd).st_size, len(data), False)
+        os.write(fd, data[:9])
+    finally:
+        os.close(fd)
+    append_rows([path], HEADER, [["t3", "c", ""]])
+    assert read(path) == [HEADER, ["t1", "a", ""], ["t3", "c", ""]]
+
+
+def test_completed_append_with_stale_marker_is_kept(tmp_path):
+    path = str(tmp_path / "trends.csv")
+    append_rows([path], HEADER, [["t1", "a", ""]])
+    fd = os.open(path, os.O_RDWR | os.O_APPEND)
+    try:
+        data = format_rows([["t2", "b", ""]])
+        _mark_pending(path, fd, os.fstat(fd).st_size, len(data), False)
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+    append_rows([path], HEADER, [["t3", "c", ""]])
+    assert [row[0] for row in read(path)] == ["timestamp", "t1", "t2", "t3"]
+
+
+def test_foreign_unterminated_line_is_kept(tmp_path):
+    path = str(tmp_path / "trends.csv")
+    append_rows([path], HEADER, [["t1", "a", ""]])
+    with open(path, "ab") as f:
+        f.write(b"t2,hand edit,")
+    append_rows([path], HEADER, [["t3", "c", ""]])
+    assert read(path) == [HEADER, ["t1", "a", ""], ["t2", "hand edit", ""], ["t3", "c", ""]]
+
+
+def test_index_failure_does_not_fail_the_write(tmp_path, monkeypatch, capsys):
+    import csv_index
+
+    def broken(path):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(csv_index, "refresh", broken)
+    path = str(tmp_path / "trends.csv")
+    append_rows([path], HEADER, [["t1", "a", ""]], indexed=[path])
+    assert read(path) == [HEADER, ["t1", "a", ""]]
+    assert "disk full" in capsys.readouterr().out
+
+
+WRITER = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from file_handles import append_rows
+for i in range(50):
+    append_rows(sys.argv[2:], ["timestamp", "query"],
+                [[f"{i}", f"satır {j}\\nikinci, \\"parça\\""] for j in range(10)], fsync=False)
+"""
+
+
+def test_concurrent_writers_never_interleave(tmp_path):
+    paths = [str(tmp_path / "a.csv"), str(tmp_path / "b.csv")]
+    writers = [subprocess.Popen([sys.executable, "-c", WRITER, REPO, *paths]) for _ in range(4)]
+    assert all(p.wait(timeout=60) == 0 for p in writers)
+    for path in paths:
+        rows = read(path)
+        assert rows[0] == ["timestamp", "query"]
+        assert len(rows) == 1 + 4 * 50 * 10
+        assert all(len(row) == 2 and row[1].endswith('\nikinci, "parça"') for row in rows[1:])
@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+import history
+from trend_store import TrendStore
+
+
+def rows(queries, volumes=None):
+    return [{"rank": rank, "query": q, "volume_text": (volumes or {}).get(q, "")} for rank, q in enumerate(queries, 1)]
+
+
+@pytest.fixture
+def store():
+    store = TrendStore(":memory:")
+    store.save_snapshot("google", "2025-09-15T10:05:00", rows(["Togg", "Deprem"], {"Togg": "20 B+"}), geo="TR")
+    store.save_snapshot("google", "2025-09-15T10:35:00", rows(["Deprem", "TOGG"], {"TOGG": "50 B+"}), geo="TR")
+    store.save_snapshot("google", "2025-09-15T12:00:00", rows(["Süper Lig", "togg"]), geo="TR")
+    store.save_snapshot("twitter", "2025-09-15T12:10:00", rows(["Togg", "Super Lig"], {"Togg": "2,313 posts"}))
+    yield store
+    store.close()
+
+
+def test_lifetime_and_first_seen(store):
+    assert history.first_seen("togg", store=store) == "2025-09-15T10:05:00"
+    assert history.lifetime("Togg", store=store) == {
+        "first_seen": "2025-09-15T10:05:00", "last_seen": "2025-09-15T12:10:00", "hours": 2, "snapshots": 4}
+    assert history.lifetime("Togg", source="twitter", store=store)["snapshots"] == 1
+    assert history.lifetime("nothing", store=store) is None
+
+
+def test_peak_parses_volume_per_source(store):
+    assert history.peak("togg", store=store) == {
+        "volume": 50_000, "at": "2025-09-15T10:35:00", "source": "google", "best_rank": 1}
+    assert history.peak("togg", source="twitter", store=store)["volume"] == 2_313
+    assert history.peak("deprem", store=store) == {"volume": None, "at": None, "source": None, "best_rank": 1}
+
+
+def test_series_and_top_n(store):
+    assert [(r["bucket"], r["source"], r["snapshots"]) for r in history.series("togg", store=store)] == [
+        ("2025-09-15T10", "google", 2), ("2025-09-15T12", "google", 1), ("2025-09-15T12", "twitter", 1)]
+    assert len(history.series("togg", start="2025-09-15T11:00", store=store)) == 2
+    top = history.top_n(window=24, n=2, store=store)
+    assert [(t["norm"], t["hours"]) for t in top] == [("togg", 2), ("deprem", 1)]
+    # Same hours in the window: the higher peak volume goes first
+    assert [t["norm"] for t in history.top_n(window=1, store=store)] == ["togg", "super lig"]
+    # An explicit end is truncated to its hour; the window may cross midnight
+    assert [t["norm"] for t in history.top_n(window=1, end="2025-09-15T11:59:59", store=store)] == ["togg", "deprem"]
+    assert history.top_n(window=2, end="2025-09-16T00:00:00", store=store) == []
+    assert len(history.top_n(window=14, end="2025-09-16T00:00:00", store=store)) == 3
+
+
+def test_write_time_upserts_equal_a_rebuild():
+    rng = random.Random(5)
+    pool = ["Togg", "togg", "Deprem", "Süper Lig", "super lig", "Galatasaray", "Fenerbahçe", "Dolar"]
+    store = TrendStore(":memory:")
+    for i in range(60):
+        queries = rng.sample(pool, 5) + [rng.choice(pool)]  # may repeat a query within a run
+        source = rng.choice(["google", "twitter"])
+        volumes = {q: rng.choice(["", "20 B+", "100 B+", "1 Mn+"]) for q in queries}
+        store.save_snapshot(source, f"2025-09-{15 + i // 24:02d}T{i % 24:02d}:{rng.randint(0, 59):02d}:00",
+                            rows(queries, volumes), geo="TR" if source == "google" else "")
+    written = sorted(store.conn.execute("SELECT * FROM trend_hours"))
+    assert history.rebuild_index(store) == len(written)
+    assert sorted(store.conn.execute("SELECT * FROM trend_hours")) == written
+    store.close()
+
+
+def test_duplicate_snapshot_is_not_counted_twice(store):
+    assert store.save_snapshot("google", "2025-09-15T12:00:00", rows(["togg"]), geo="TR") is None
+    assert history.lifetime("togg", store=store)["snapshots"] == 4
@@ -0,0 +1,48 @@
+import json
+import os
+
+from query_blacklist import BLACKLIST_FILE, QueryBlacklist, compile_terms, default_blacklist, load_terms
+from text_normalize import normalize
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+
+
+def test_blacklist_file_resolves_next_to_the_module():
+    assert os.path.isabs(BLACKLIST_FILE) and os.path.exists(BLACKLIST_FILE)
+    assert load_terms() == default_blacklist().terms
+
+
+def test_corpus_noise_is_dropped_and_real_queries_kept():
+    with open(os.path.join(FIXTURES, "blacklist_corpus.json"), encoding="utf-8") as f:
+        corpus = json.load(f)
+    blacklist = default_blacklist()
+    for query in corpus["noise"]:
+        assert blacklist.match(normalize(query)), query
+    for query in corpus["keep"]:
+        assert blacklist.match(normalize(query)) is None, query
+
+
+def test_word_terms_match_whole_words_only():
+    blacklist = QueryBlacklist(["Ara", "oturum aç"])
+    assert blacklist.match(normalize("Ara")) == "ara"
+    assert blacklist.match(normalize("Oturum açın")) is None
+    assert blacklist.match(normalize("Araba fiyatları")) is None
+    assert blacklist.match(normalize("hemen oturum aç")) == "oturum ac"
+
+
+def test_symbol_terms_match_anywhere():
+    pattern = compile_terms(["»", "ara"])
+    assert pattern.search("haberler»spor")
+    assert not pattern.search("kara")
+    assert not compile_terms([]).search("anything")
+
+
+def test_load_terms_skips_comments_and_blanks(tmp_path):
+    path = tmp_path / "terms.txt"
+    path.write_text("# comment\n\nKeşfet  # inline\nAra\nara\n", encoding="utf-8")
+    assert load_terms(str(path)) == ["ara", "kesfet"]
+
+
+def test_filter_stage():
+    records = [{"query": q, "norm": normalize(q)} for q in ("Keşfet", "Togg", "Ara")]
+    assert [r["query"] for r in QueryBlacklist(["keşfet", "ara"]).filter(records)] == ["Togg"]
@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+import pytest
+
+from related_fetch import RelatedQueriesFetcher, TokenBucket, parse_google_json, ranked_to_related
+
+
+def test_parse_google_json_strips_the_xssi_prefix():
+    assert parse_google_json(b")]}',\n{\"default\": {\"x\": \"\xc3\xa7\"}}") == {"default": {"x": "ç"}}
+
+
+def test_ranked_to_related():
+    data = {"default": {"rankedList": [
+        {"rankedKeyword": [{"query": f"top {i}", "value": 100 - i} for i in range(7)]},
+        {"rankedKeyword": [{"query": "rising", "value": "250"}]},
+    ]}}
+    related = ranked_to_related(data, max_items=5)
+    assert [r["query"] for r in related["top"]] == [f"top {i}" for i in range(5)]
+    assert related["rising"] == [{"query": "rising", "value": 250}]
+    assert ranked_to_related({}) == {"top": [], "rising": []}
+
+
+def test_token_bucket_limits_the_rate():
+    async def take(n):
+        bucket = TokenBucket(rate=50, capacity=5)
+        start = time.monotonic()
+        for _ in range(n):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(take(5)) < 0.1  # the burst is free
+    assert asyncio.run(take(15)) >= 0.18  # 10 more tokens at 50/s
+
+
+@pytest.fixture
+def stub():
+    pytest.importorskip("aiohttp")
+    from stub_server import RelatedStubHandler, start_stub_server
+    server, base_url = start_stub_server(handler=RelatedStubHandler, throttle_every=5)
+    yield base_url
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_batch_against_the_stub_server(stub):
+    fetcher = RelatedQueriesFetcher(base_url=stub, rate=200, burst=20, backoff=0.01)
+    results = fetcher.fetch_batch([{"query": q} for q in ("Togg", "Süper Lig", "Deprem")])
+    assert [r["top"][0]["query"] for r in results] == ["Togg son dakika", "Süper Lig son dakika", "Deprem son dakika"]
+    assert all(len(r["top"]) == 5 and len(r["rising"]) == 3 for r in results)
+    assert fetcher.stats["retries"] == fetcher.stats.get("http_429", 0) >= 1
+    assert fetcher.stats["connections"] <= fetcher.concurrency
+
+
+def test_errors_are_returned_per_query(stub):
+    fetcher = RelatedQueriesFetcher(base_url=stub + "/missing", rate=200, burst=20, retries=0)
+    results = fetcher.fetch_batch([{"query": "Togg"}])
+    assert isinstance(results[0], RuntimeError)
@@ -0,0 +1,27 @@
+from related_queries import RelatedQueryGenerator
+
+
+def test_memoized_results_are_copies():
+    generator = RelatedQueryGenerator(seed=1)
+    first = generator.generate("Süper Lig maç", "20 B+")
+    expected = {kind: [dict(item) for item in items] for kind, items in first.items()}
+
+    first["top"][0]["value"] = -1
+    first["rising"].clear()
+    second = generator.generate("Süper Lig maç", "20 B+")
+    assert second == expected
+    assert second is not generator.generate("Süper Lig maç", "20 B+")
+
+
+def test_expansions_use_turkish_lowercase():
+    generator = RelatedQueryGenerator(seed=1)
+    # str.lower() turns 'ALIM' into 'alim', which misses the 'alım' expansions
+    assert generator.generate("POLİS ALIM")["top"][0]["query"] == "POLİS ALIM iş"
+    assert generator.generate("KPSS SONUÇ")["top"][0]["query"] == "KPSS SONUÇ açıklandı"
+
+
+def test_seeded_output_is_stable():
+    a = RelatedQueryGenerator(seed=7).generate_batch([{"query": "Togg", "volume": "50 B+"}, {"query": "Spor"}])
+    b = RelatedQueryGenerator(seed=7).generate_batch([{"query": "Togg", "volume": "50 B+"}, {"query": "Spor"}])
+    assert a == b
+    assert all(20_000 <= item["value"] <= 40_000 for item in a[0]["top"])
@@ -0,0 +1,129 @@
+import random
+
+import pytest
+
+import rollups
+import trend_store
+from rollups import HyperLogLog, merge, snapshot_rollup
+from trend_store import TrendStore, migrate
+
+
+def rows(queries, volume="20 B+"):
+    return [{"rank": rank, "query": q, "volume_text": volume} for rank, q in enumerate(queries, 1)]
+
+
+def fill(store, runs=40, seed=11):
+    rng = random.Random(seed)
+    for i in range(runs):
+        source = rng.choice(["google", "twitter"])
+        stats = {"total": 20, "sports_related": rng.randint(0, 5)} if rng.random() < 0.7 else None
+        store.save_snapshot(source, f"2025-09-{15 + i // 12:02d}T{(i * 2) % 24:02d}:00:00",
+                            rows([f"query {rng.randint(0, 80)}" for _ in range(10)], rng.choice(["", "50 B+"])),
+                            geo="TR" if source == "google" else "", sports_stats=stats)
+
+
+@pytest.mark.parametrize("n", [0, 10, 500, 20_000])
+def test_hyperloglog_estimate(n):
+    hll = HyperLogLog()
+    for i in range(n):
+        hll.add(f"query {i}")
+    assert abs(hll.count() - n) <= max(2, 0.1 * n)
+
+
+def test_hyperloglog_merge_is_union_and_round_trips():
+    a, b = HyperLogLog(), HyperLogLog()
+    for i in range(3000):
+        a.add(f"q{i}")
+    for i in range(2000, 5000):
+        b.add(f"q{i}")
+    union = HyperLogLog.from_bytes(a.to_bytes()).merge(b)
+    assert abs(union.count() - 5000) <= 500
+    assert HyperLogLog.from_bytes(a.to_bytes()).registers == a.registers
+    assert len(a.to_bytes()) == 1024
+
+
+def test_sports_counts_unknown_without_stats():
+    known = snapshot_rollup([("togg", 100), ("super lig", None)], {"total": 2, "sports_related": 1})
+    unknown = snapshot_rollup([("togg", None)])
+    assert (unknown["sports_checked"], unknown["sports_filtered"]) == (None, None)
+
+    total = merge(None, unknown)
+    assert total["sports_checked"] is None
+    total = merge(total, known)
+    assert (total["sports_checked"], total["sports_filtered"]) == (2, 1)
+    assert (total["snapshots"], total["trends"], total["volume_count"], total["volume_max"]) == (2, 3, 1, 100)
+
+
+def test_sports_share_covers_known_snapshots_only():
+    store = TrendStore(":memory:")
+    store.save_snapshot("google", "2025-09-15T10:00:00", rows(["a", "b", "c", "d"]), geo="TR",
+                        sports_stats={"total": 4, "sports_related": 1})
+    store.save_snapshot("google", "2025-09-15T10:30:00", rows(["e", "f"]), geo="TR")
+    store.save_snapshot("google", "2025-09-16T10:00:00", rows(["g"]), geo="TR")
+    day1, day2 = rollups.rollup(store=store)
+    assert (day1["snapshots"], day1["trends"], day1["sports_checked"], day1["sports_share"]) == (2, 6, 4, 0.25)
+    assert (day2["sports_checked"], day2["sports_share"]) == (None, None)
+    assert day1["mean_volume"] == 20_000
+
+
+def test_write_time_rollups_equal_a_rebuild_in_memory():
+    store = TrendStore(":memory:")
+    fill(store)
+    written = sorted(store.conn.execute("SELECT * FROM rollups"))
+    assert rollups.rebuild(store, workers=4)["workers"] == 1  # ':memory:' cannot be reopened by workers
+    assert sorted(store.conn.execute("SELECT * FROM rollups")) == written
+
+
+def test_parallel_rebuild_equals_serial(tmp_path):
+    store = TrendStore(str(tmp_path / "trends.db"))
+    fill(store)
+    written = sorted(store.conn.execute("SELECT * FROM rollups"))
+    assert rollups.rebuild(store, workers=2)["workers"] == 2
+    assert sorted(store.conn.execute("SELECT * FROM rollups")) == written
+    store.close()
+
+
+def test_distinct_queries_and_overlap():
+    store = TrendStore(":memory:")
+    store.save_snapshot("google", "2025-09-15T10:00:00", rows(["Togg", "Deprem", "Dolar"]), geo="TR")
+    store.save_snapshot("twitter", "2025-09-15T11:00:00", rows(["TOGG", "Deprem", "#FBvTS", "Seçim"]))
+    assert rollups.distinct_queries("google", store=store) == 3
+    assert rollups.overlap(store=store) == {"google": 3, "twitter": 4, "union": 5, "overlap": 2}
+
+
+def test_new_database_is_current_and_opening_does_not_rebuild(tmp_path):
+    path = str(tmp_path / "trends.db")
+    store = TrendStore(path)
+    assert store.schema_version() == trend_store.SCHEMA_VERSION
+    store.save_snapshot("google", "2025-09-15T10:00:00", rows(["Togg"]), geo="TR")
+    store.conn.execute("DELETE FROM rollups")
+    store.close()
+    store = TrendStore(path)
+    assert store.conn.execute("SELECT COUNT(*) FROM rollups").fetchone()[0] == 0
+    store.close()
+
+
+def test_migrate_upgrades_an_old_database(tmp_path, capsys):
+    path = str(tmp_path / "trends.db")
+    store = TrendStore(path)
+    fill(store, runs=12)
+    written = sorted(store.conn.execute("SELECT * FROM rollups"))
+    hours = sorted(store.conn.execute("SELECT * FROM trend_hours"))
+    # What an older version left behind: NOT NULL sports columns, stale norms, no trend_hours
+    old_schema = store.conn.execute("SELECT sql FROM sqlite_master WHERE name = 'rollups'").fetchone()[0].replace(
+        "sports_checked INTEGER,", "sports_checked INTEGER NOT NULL,").replace(
+        "sports_filtered INTEGER,", "sports_filtered INTEGER NOT NULL,")
+    store.conn.executescript(f"DROP TABLE rollups; {old_schema}; DELETE FROM trend_hours; "
+                             "UPDATE trends SET norm = upper(norm); PRAGMA user_version = 0;")
+    store.close()
+
+    store = TrendStore(path)
+    assert "trend_store.py migrate" in capsys.readouterr().out
+    result = migrate(store)
+    assert result["renormalised"] == 12 * 10
+    assert store.schema_version() == trend_store.SCHEMA_VERSION
+    assert sorted(store.conn.execute("SELECT * FROM rollups")) == written
+    assert sorted(store.conn.execute("SELECT * FROM trend_hours")) == hours
+    assert migrate(store)["renormalised"] == 0
+    store.close()
+
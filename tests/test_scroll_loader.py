@@ -0,0 +1,64 @@
+import time
+
+from scroll_loader import load_cards
+
+
+class FakeDriver:
+    """Stands in for Selenium: each wait_for_growth call sleeps `settle_ms` and renders `step` more cards"""
+
+    def __init__(self, cards, step=0, limit=200):
+        self.cards = cards
+        self.step = step
+        self.limit = limit
+        self.waits = 0
+
+    def execute_script(self, script, selector):
+        return self.cards
+
+    def set_script_timeout(self, seconds):
+        pass
+
+    def execute_async_script(self, script, selector, settle_ms, scroll):
+        self.waits += 1
+        time.sleep(settle_ms / 1000)
+        self.cards = min(self.cards + self.step, self.limit)
+        return self.cards
+
+
+def extract_cards(driver):
+    return [{"query": f"trend {i % 30}"} for i in range(driver.cards)]
+
+
+def test_returns_without_waiting_when_the_target_is_already_rendered():
+    driver = FakeDriver(cards=60)
+    _, report = load_cards(driver, "div", target=50, settle_ms=1000, patience=1, scroll=False)
+    assert driver.waits == 0
+    assert (report["scrolls"], report["count"], report["stopped"]) == (0, 60, "target")
+    assert report["ms"] < 100
+
+
+def test_settles_only_while_below_the_target():
+    driver = FakeDriver(cards=10, step=20)
+    _, report = load_cards(driver, "div", target=50, settle_ms=10)
+    assert driver.waits == 2
+    assert (report["scrolls"], report["count"], report["stopped"]) == (2, 50, "target")
+
+
+def test_stops_when_the_count_stalls():
+    driver = FakeDriver(cards=10, step=20, limit=30)
+    _, report = load_cards(driver, "div", target=50, settle_ms=10, patience=2)
+    assert (report["scrolls"], report["count"], report["stopped"]) == (3, 30, "stalled")
+    _, report = load_cards(FakeDriver(cards=10, step=5), "div", target=50, settle_ms=1, max_scrolls=3)
+    assert (report["scrolls"], report["count"], report["stopped"]) == (3, 25, "max_scrolls")
+
+
+def test_extract_counts_unique_items():
+    driver = FakeDriver(cards=40, step=40)
+    items, report = load_cards(driver, "div", extract=extract_cards, key=lambda c: c["query"],
+                               target=25, settle_ms=1000)
+    assert driver.waits == 0 and len(items) == 25 and report["stopped"] == "target"
+
+    # Duplicates do not count towards the target
+    items, report = load_cards(FakeDriver(cards=40, step=40), "div", extract=extract_cards,
+                               key=lambda c: c["query"], target=50, settle_ms=1, patience=1)
+    assert (len(items), report["scrolls"], report["stopped"]) == (30, 1, "stalled")
@@ -0,0 +1,135 @@
+import os
+import random
+import subprocess
+import sys
+import time
+
+from snapshot_delta import DeltaLog
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_rows(rng, pool):
+    """A ranked snapshot drawn from a shared query pool, with the optional fields set at random"""
+    rows = []
+    for rank, query in enumerate(rng.sample(pool, rng.randint(3, 12)), 1):
+        row = {"rank": rank, "query": query, "volume_text": rng.choice(["", "20 B+", "50 B+", "1 Mn+"])}
+        if rng.random() < 0.3:
+            row["label"] = rng.choice(["Sports · Trending", "Trending in Turkey"])
+        if rng.random() < 0.3:
+            row["url"] = f"https://twitter.com/search?q={query}"
+        if rng.random() < 0.5:
+            row["related"] = {"top": [{"query": f"{query} {w}", "value": rng.randint(0, 100)} for w in ("canlı", "maç")]}
+        rows.append(row)
+    if rng.random() < 0.2:  # the same query twice in one run
+        rows.append({**rows[0], "rank": len(rows) + 1})
+    return rows
+
+
+def test_round_trip_across_keyframes_and_reopen(tmp_path):
+    rng = random.Random(3)
+    pool = [f"query {i}" for i in range(30)]
+    log = DeltaLog("google", "TR", root=str(tmp_path), keyframe_every=5)
+    written = []
+    for i in range(23):
+        rows = make_rows(rng, pool)
+        scraped_at = f"2025-09-15T{i:02d}:00:00"
+        assert log.append(scraped_at, rows) == i
+        written.append((scraped_at, rows))
+
+    for reopened in (log, DeltaLog("google", "TR", root=str(tmp_path), keyframe_every=5)):
+        assert len(reopened) == len(written)
+        for i, (scraped_at, rows) in enumerate(written):
+            assert reopened.snapshot(i) == {"scraped_at": scraped_at, "rows": rows}
+    assert len(log.strings) == len(set(log.strings))
+    assert log.at("2025-09-15T03:30:00")["scraped_at"] == "2025-09-15T03:00:00"
+    assert log.at("2025-09-14T00:00:00") is None
+
+
+def test_torn_last_line_is_skipped_then_truncated(tmp_path):
+    log = DeltaLog("twitter", root=str(tmp_path))
+    log.append("2025-09-15T10:00:00", [{"rank": 1, "query": "Togg", "volume_text": "2,313 posts"}])
+    size = os.path.getsize(log.log_path)
+    with open(log.log_path, "ab") as f:
+        f.write(b'{"t":"2025-09-15T10:05:00","a":{')
+
+    reopened = DeltaLog("twitter", root=str(tmp_path))
+    assert len(reopened) == 1
+    reopened.append("2025-09-15T10:10:00", [{"rank": 1, "query": "Deprem", "volume_text": ""}])
+    assert os.path.getsize(log.log_path) > size
+    assert [s["rows"][0]["query"] for s in map(DeltaLog("twitter", root=str(tmp_path)).snapshot, (0, 1))] == ["Togg", "Deprem"]
+
+
+WRITER = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from snapshot_delta import DeltaLog
+log = DeltaLog("twitter", root=sys.argv[2])
+who = sys.argv[3]
+for i in range(24):
+    log.append(f"2025-09-15T{i:02d}:{ord(who) % 60:02d}:00",
+               [{"rank": r, "query": f"{who} {(i + r) % 9}", "volume_text": f"{i}K posts"} for r in range(1, 5)])
+"""
+
+
+def test_concurrent_writers_never_share_string_ids(tmp_path):
+    writers = [subprocess.Popen([sys.executable, "-c", WRITER, REPO, str(tmp_path), who]) for who in "abc"]
+    assert all(p.wait(timeout=60) == 0 for p in writers)
+
+    log = DeltaLog("twitter", root=str(tmp_path))
+    assert len(log) == 72
+    assert len(log.strings) == len(set(log.strings)) == 3 * 9 + 24
+    for i in range(len(log)):
+        snap = log.snapshot(i)
+        who, hour = snap["rows"][0]["query"].split()[0], int(snap["scraped_at"][11:13])
+        assert snap["rows"] == [{"rank": r, "query": f"{who} {(hour + r) % 9}", "volume_text": f"{hour}K posts"}
+                                for r in range(1, 5)]
+
+
+def export_twitter(directory, scraped_at, names):
+    import json
+    stamp = scraped_at[:16].replace("-", "").replace("T", "_").replace(":", "")
+    with open(os.path.join(directory, f"twitter_trends_{stamp}.json"), "w", encoding="utf-8") as f:
+        json.dump({"scraped_at": scraped_at, "trends": [
+            {"rank": rank, "name": name} for rank, name in enumerate(names, 1)]}, f)
+
+
+def test_import_merges_exports_and_keeps_live_runs(tmp_path):
+    from snapshot_delta import import_exports
+    root = str(tmp_path / "deltas")
+    live = DeltaLog("twitter", root=root)
+    live.append("2025-09-15T08:00:00", [{"rank": 1, "query": "Canlı", "volume_text": ""}])
+    live.append("2025-09-15T14:00:00", [{"rank": 1, "query": "Sonra", "volume_text": ""}])
+    export_twitter(str(tmp_path), "2025-09-15T12:00:00", ["Togg", "Deprem"])
+    export_twitter(str(tmp_path), "2025-09-15T08:00:30", ["Canlı"])  # also in the log
+
+    logs, added = import_exports(str(tmp_path), root)
+    assert [s["scraped_at"] for s in added] == ["2025-09-15T12:00:00"]
+    expected = [("2025-09-15T08:00:00", ["Canlı"]), ("2025-09-15T12:00:00", ["Togg", "Deprem"]),
+                ("2025-09-15T14:00:00", ["Sonra"])]
+    assert live.snapshot(-1)["scraped_at"] == "2025-09-15T14:00:00"  # the open instance reloads after the swap
+    for log in (live, DeltaLog("twitter", root=root)):
+        assert [(s["scraped_at"], [r["query"] for r in s["rows"]]) for s in map(log.snapshot, range(len(log)))] == expected
+
+    live.append("2025-09-15T16:00:00", [{"rank": 1, "query": "Togg", "volume_text": ""}])
+    assert import_exports(str(tmp_path), root)[1] == []
+    reopened = DeltaLog("twitter", root=root)
+    assert len(reopened) == 4 and len(reopened.strings) == len(set(reopened.strings))
+    assert sorted(os.listdir(root)) == ["twitter.jsonl", "twitter.strings"]
+
+
+def test_appends_during_an_import_are_not_lost(tmp_path):
+    from snapshot_delta import import_exports
+    root = str(tmp_path / "deltas")
+    for i in range(20):
+        export_twitter(str(tmp_path), f"2025-09-14T{i:02d}:00:00", [f"export {i}"])
+    writer = subprocess.Popen([sys.executable, "-c", WRITER, REPO, root, "w"])
+    log_path = os.path.join(root, "twitter.jsonl")
+    while writer.poll() is None and not (os.path.exists(log_path) and os.path.getsize(log_path)):
+        time.sleep(0.001)
+    import_exports(str(tmp_path), root)  # swaps the files while the writer is appending
+    assert writer.wait(timeout=60) == 0
+
+    log = DeltaLog("twitter", root=root)
+    assert len(log) == 44
+    assert [log.snapshot(i)["rows"][0]["query"] for i in range(20)] == [f"export {i}" for i in range(20)]
@@ -0,0 +1,115 @@
+import json
+import os
+import re
+import threading
+
+import pytest
+
+from sports_filter import SportsFilter
+from text_normalize import fold_diacritics, normalize, trie_regex, turkish_lower
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+
+
+@pytest.fixture(scope="module")
+def sports():
+    return SportsFilter(cache_size=0)
+
+
+def test_matcher_agrees_with_one_regex_per_keyword(sports):
+    def alternation(words):
+        return re.compile(rf"\b(?:{'|'.join(re.escape(w) for w in sorted(words, key=len, reverse=True))})\b")
+
+    plain = alternation(normalize(k) for k in sports.all_keywords if k not in sports.diacritic_only_keywords)
+    diacritics = alternation(sports.diacritic_only_keywords)
+    turkish = [re.compile(fold_diacritics(p)) for p in sports.turkish_checks]
+    with open(os.path.join(FIXTURES, "blacklist_corpus.json"), encoding="utf-8") as f:
+        corpus = json.load(f)
+    texts = corpus["keep"] + corpus["noise"] + sports.all_keywords + [
+        "Fenerbahçe Galatasaray maçı", "NBA Finalleri", "Süper Lig puan durumu", "Ekonomi Haberleri",
+        "sportif direktör", "gameboy", "TFF 1. Lig", "basketbolcu", "Derbi maç", "Toyota Yaris",
+    ]
+    for text in texts:
+        norm = normalize(text)
+        expected = bool(plain.search(norm) or any(p.search(norm) for p in turkish)
+                        or diacritics.search(" ".join(turkish_lower(text).split())))
+        assert (sports.match_normalized(norm, text) is not None) == expected, text
+
+
+@pytest.mark.parametrize("text", ["Mac Miller", "Apple Mac", "mac fiyatları", "Toyota Yaris"])
+def test_folded_spellings_of_diacritic_keywords_are_not_sports(sports, text):
+    assert sports.match_keyword(text) is None
+    assert sports.classify_batch([{"name": text, "norm": normalize(text)}])["kept"]
+
+
+@pytest.mark.parametrize("text, keyword", [
+    ("Derbi maç sonucu", "maç"), ("MAÇ ÖZETİ", "maç"), ("F1 yarışlar başladı", "yarışlar"), ("Mac Galatasaray", "galatasaray"),
+])
+def test_diacritic_keywords_still_match_as_written(sports, text, keyword):
+    assert sports.match_keyword(text) == keyword
+    assert sports.classify_batch([{"name": text, "norm": normalize(text)}])["keywords"] == [keyword]
+
+
+def test_classify_batch(sports):
+    trends = [{"name": "Fenerbahçe Galatasaray maçı"}, {"name": "İklim Değişikliği Zirvesi"},
+              {"query": "NBA Finalleri"}, "Yapay Zeka Gelişmeleri", {"name": "Süper Lig puan durumu"}]
+    result = sports.classify_batch(trends)
+    assert result["kept"] == [trends[1], trends[3]]
+    assert result["removed"] == [trends[0], trends[2], trends[4]]
+    assert len(result["keywords"]) == 3
+    stats = result["stats"]
+    assert (stats["total"], stats["sports_related"], stats["non_sports"]) == (5, 3, 2)
+    assert stats["filtered_percentage"] == 60
+
+
+def test_precomputed_norm_is_used(sports):
+    assert sports.classify_batch([{"name": "Ekonomi", "norm": "super lig"}])["removed"]
+
+
+def test_cache_round_trip_and_version(tmp_path):
+    path = str(tmp_path / "cache.json")
+    first = SportsFilter(cache_path=path)
+    first.is_sports_related("Galatasaray maçı")
+    first.is_sports_related("Ekonomi")
+    assert first.save_cache()
+
+    second = SportsFilter(cache_path=path)
+    assert second.is_sports_related("Galatasaray maçı") and not second.is_sports_related("Ekonomi")
+    assert (second.cache_hits, second.cache_misses) == (2, 0)
+
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    data["version"] = "other"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    assert SportsFilter(cache_path=path).load_cache() == 0
+
+
+def test_cache_size_zero_neither_loads_nor_saves(tmp_path):
+    path = str(tmp_path / "cache.json")
+    full = SportsFilter(cache_path=path)
+    full.is_sports_related("Galatasaray maçı")
+    full.save_cache()
+    disabled = SportsFilter(cache_size=0, cache_path=path)
+    assert disabled.load_cache() == 0 and not disabled.save_cache()
+    assert len(disabled._cache) == 0
+
+
+def test_concurrent_saves_keep_every_entry(tmp_path):
+    path = str(tmp_path / "cache.json")
+    filters = [SportsFilter(cache_path=path) for _ in range(8)]
+    for i, f in enumerate(filters):
+        f.is_sports_related(f"query {i}")
+    threads = [threading.Thread(target=f.save_cache) for f in filters]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(os.listdir(tmp_path)) == ["cache.json", "cache.json.lock"]
+    assert SportsFilter(cache_path=path).load_cache() == 8
+
+
+def test_save_error_is_reported_not_raised(tmp_path):
+    f = SportsFilter(cache_path=str(tmp_path / "missing" / "cache.json"))
+    f.is_sports_related("Galatasaray")
+    assert f.save_cache() is False
@@ -0,0 +1,57 @@
+import random
+import re
+
+import pytest
+
+from text_normalize import fold_diacritics, normalize, trie_regex, turkish_lower, without_norm
+
+
+def test_turkish_lower():
+    assert turkish_lower("İSTANBUL") == "istanbul"
+    assert turkish_lower("IRMAK") == "ırmak"
+
+
+@pytest.mark.parametrize("turkish, ascii_", [
+    ("Beşiktaş", "besiktas"), ("Fenerbahçe", "fenerbahce"), ("Değişim", "degisim"),
+    ("Göztepe", "goztepe"), ("Süper Lig", "super lig"), ("BEŞİKTAŞ", "besiktas"),
+    ("ŞAMPİYONLAR LİGİ", "sampiyonlar ligi"), ("Kâğıt", "kagit"), ("FINAL", "final"),
+])
+def test_normalize_folds_turkish_spellings(turkish, ascii_):
+    assert normalize(turkish) == normalize(ascii_) == ascii_
+
+
+def test_normalize_whitespace_and_rank_prefix():
+    assert normalize("  3.   Galatasaray \t  maçı ") == "galatasaray maci"
+    assert normalize("") == "" and normalize(None) == ""
+
+
+def test_normalize_is_idempotent():
+    for text in ("Fenerbahçe - Galatasaray", "#FBvTS", "İklim Değişikliği Zirvesi"):
+        assert normalize(normalize(text)) == normalize(text)
+
+
+def test_fold_diacritics_keeps_ascii_and_decomposes_compatibility_forms():
+    assert fold_diacritics("plain text") == "plain text"
+    assert fold_diacritics("ﬁnal ½") == "final 1⁄2"
+
+
+def test_without_norm():
+    assert without_norm({"name": "x", "norm": "x"}) == {"name": "x"}
+
+
+def test_trie_regex_matches_exactly_the_words():
+    words = ["a", "ab", "abc", "abd", "b", "ba", "c++", "x.y", "world cup", "world"]
+    pattern = re.compile(trie_regex(words))
+    for word in words:
+        assert pattern.fullmatch(word)
+    for other in ["", "abcd", "ac", "bb", "c", "xzy", "world c", "cup"]:
+        assert not pattern.fullmatch(other)
+
+
+def test_trie_regex_equals_plain_alternation_on_random_words():
+    rng = random.Random(7)
+    words = {"".join(rng.choice("abc ") for _ in range(rng.randint(1, 6))).strip() or "a" for _ in range(300)}
+    trie = re.compile(trie_regex(words))
+    for _ in range(2000):
+        text = "".join(rng.choice("abcd ") for _ in range(rng.randint(1, 7)))
+        assert bool(trie.fullmatch(text)) == (text in words)
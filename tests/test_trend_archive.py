@@ -0,0 +1,36 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from trend_archive import compact, import_exports, read_trends, write_snapshot
+
+
+def export_twitter(directory, scraped_at, names):
+    stamp = scraped_at[:16].replace("-", "").replace("T", "_").replace(":", "")
+    with open(os.path.join(directory, f"twitter_trends_{stamp}.json"), "w", encoding="utf-8") as f:
+        json.dump({"scraped_at": scraped_at, "trends": [
+            {"rank": rank, "name": name, "posts": "2,313 posts"} for rank, name in enumerate(names, 1)]}, f)
+
+
+def snapshots(root):
+    table = read_trends(columns=["scraped_at", "query", "volume"], root=root)
+    return sorted((str(r["scraped_at"]), r["query"], r["volume"]) for r in table.to_pylist())
+
+
+def test_import_keeps_live_parts_and_is_idempotent(tmp_path):
+    root = str(tmp_path / "archive")
+    write_snapshot("twitter", "2025-09-15T08:00:00", [{"rank": 1, "query": "Canlı", "volume_text": "1K posts"}], root=root)
+    export_twitter(str(tmp_path), "2025-09-15T12:00:00", ["Togg", "Deprem"])
+    export_twitter(str(tmp_path), "2025-09-15T08:00:30", ["Canlı"])  # the live run, exported too
+
+    assert import_exports(str(tmp_path), root=root) == {"partitions": 1, "snapshots": 1, "skipped": 1}
+    expected = [("2025-09-15 08:00:00", "Canlı", 1000),
+                ("2025-09-15 12:00:00", "Deprem", 2313), ("2025-09-15 12:00:00", "Togg", 2313)]
+    assert snapshots(root) == expected
+
+    assert import_exports(str(tmp_path), root=root)["snapshots"] == 0
+    compact(root)
+    assert snapshots(root) == expected
@@ -0,0 +1,118 @@
+import csv
+import json
+
+import pytest
+
+import trend_store
+from trend_store import TrendStore, _csv_runs, import_archive, migrate
+
+
+def rows(queries, volume="20 B+"):
+    return [{"rank": rank, "query": q, "volume_text": volume} for rank, q in enumerate(queries, 1)]
+
+
+def table_counts(store):
+    return {table: store.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("snapshots", "trends", "related", "trend_hours", "snapshot_filter_stats", "rollups")}
+
+
+def write_csv(path, fields, records):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def test_save_snapshot_writes_every_table_in_one_transaction():
+    store = TrendStore(":memory:")
+    snapshot = rows(["Togg", "Deprem"])
+    snapshot[0]["related"] = {"top": [{"query": "togg fiyat", "value": 100}], "rising": [{"query": "togg t10f"}]}
+    assert store.save_snapshot("google", "2025-09-15T10:00:00", snapshot, geo="TR",
+                               sports_stats={"total": 2, "sports_related": 0}) == 1
+    assert table_counts(store) == {"snapshots": 1, "trends": 2, "related": 2, "trend_hours": 2,
+                                   "snapshot_filter_stats": 1, "rollups": 2}
+    assert store.save_snapshot("google", "2025-09-15T10:00:00", snapshot, geo="TR") is None
+
+
+def test_failed_save_snapshot_leaves_nothing_behind():
+    store = TrendStore(":memory:")
+    store.save_snapshot("google", "2025-09-15T10:00:00", rows(["Togg"]), geo="TR")
+    before = table_counts(store)
+
+    # The related item without a query fails after the snapshot row is already inserted
+    broken = rows(["Deprem", "Dolar"])
+    broken[1]["related"] = {"top": [{"value": 50}]}
+    with pytest.raises(KeyError):
+        store.save_snapshot("google", "2025-09-15T11:00:00", broken, geo="TR",
+                            sports_stats={"total": 2, "sports_related": 0})
+    assert table_counts(store) == before
+    assert not store.conn.in_transaction
+    assert store.save_snapshot("google", "2025-09-15T11:00:00", rows(["Deprem"]), geo="TR")
+
+
+def test_csv_runs_split_on_gaps():
+    stamps = ["2025-09-15T10:00:00", "2025-09-15T10:00:30", "2025-09-15T10:01:50",
+              "2025-09-15T10:04:00", "2025-09-15T11:00:00", "2025-09-15T11:00:05"]
+    runs = list(_csv_runs([{"timestamp": ts} for ts in stamps]))
+    assert [[r["timestamp"] for r in run] for run in runs] == [stamps[:3], stamps[3:4], stamps[4:]]
+    assert [len(run) for run in _csv_runs([{"timestamp": ts} for ts in stamps], gap_sec=3600)] == [6]
+    assert list(_csv_runs([])) == []
+
+
+@pytest.fixture
+def exports(tmp_path):
+    with open(tmp_path / "trends_data_mZ3RIc_TR_20250915_1000.json", "w", encoding="utf-8") as f:
+        json.dump([
+            {"success": True, "timestamp": "2025-09-15T10:00:05", "query": {"query": "Togg", "volume": "20 B+"},
+             "related_queries": {"top": [{"query": "togg fiyat", "value": 100}]}},
+            {"success": True, "timestamp": "2025-09-15T10:00:09", "query": "Deprem"},
+            {"success": False, "timestamp": "2025-09-15T10:00:12", "query": "Dolar"},
+        ], f)
+    with open(tmp_path / "twitter_trends_20250915_1000.json", "w", encoding="utf-8") as f:
+        json.dump({"scraped_at": "2025-09-15T10:00:00", "trends": [
+            {"rank": 1, "name": "#FBvTS", "posts": "12.5K posts"}, {"rank": 2, "name": "Seçim"}]}, f)
+    # The first run duplicates the JSON export above; the second is only in the CSV
+    write_csv(tmp_path / "trends_TR.csv", ["timestamp", "query", "volume", "related_top", "related_rising"], [
+        {"timestamp": "2025-09-15T10:00:05", "query": "Togg", "volume": "20 B+", "related_top": "togg fiyat"},
+        {"timestamp": "2025-09-15T10:00:09", "query": "Deprem"},
+        {"timestamp": "2025-09-15T12:00:00", "query": "Dolar", "volume": "10 B+",
+         "related_top": "dolar kuru, euro", "related_rising": "altın"},
+    ])
+    write_csv(tmp_path / "twitter_trends.csv", ["timestamp", "rank", "name", "label", "posts", "url"], [
+        {"timestamp": "2025-09-15T10:00:00", "rank": "1", "name": "#FBvTS"},
+        {"timestamp": "2025-09-15T14:00:00", "rank": "1", "name": "Togg", "posts": "3K posts"},
+    ])
+    return tmp_path
+
+
+def test_import_archive_is_idempotent(exports):
+    store = TrendStore(":memory:")
+    assert import_archive(store, str(exports)) == {"json": 2, "csv": 2, "skipped": 0}
+    written = table_counts(store)
+    assert written["snapshots"] == 4 and written["trends"] == 2 + 2 + 1 + 1
+    assert written["related"] == 1 + 3
+
+    assert import_archive(store, str(exports)) == {"json": 0, "csv": 0, "skipped": 4}
+    assert table_counts(store) == written
+
+
+def test_import_archive_skips_csv_runs_the_scraper_already_stored(exports):
+    store = TrendStore(":memory:")
+    store.save_snapshot("google", "2025-09-15T12:00:30", rows(["Dolar"]), geo="TR")
+    assert import_archive(store, str(exports)) == {"json": 2, "csv": 1, "skipped": 1}
+
+
+def test_migrate_sets_user_version(tmp_path):
+    path = str(tmp_path / "trends.db")
+    store = TrendStore(path)
+    store.save_snapshot("google", "2025-09-15T10:00:00", rows(["Togg"]), geo="TR")
+    store.conn.execute("PRAGMA user_version = 0")
+    store.close()
+
+    store = TrendStore(path)
+    assert store.schema_version() == 0
+    assert migrate(store) == {"renormalised": 0, "trend_hours": 1, "rollups": 2}
+    store.close()
+    store = TrendStore(path)
+    assert store.schema_version() == trend_store.SCHEMA_VERSION
+    store.close()
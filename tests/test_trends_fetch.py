@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+from stub_server import FIXTURES_DIR, start_stub_server
+from trends_fetch import fetch_trends, fetch_trends_http, format_traffic, parse_trends_rss, validate_trends
+
+
+@pytest.fixture
+def stub():
+    server, base_url = start_stub_server()
+    yield base_url
+    server.shutdown()
+    server.server_close()
+
+
+def fixture_bytes(name):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("traffic, hl, expected", [
+    ("200000+", "tr", "200 B+"),
+    ("200000+", "en", "200K+"),
+    ("2000000+", "tr", "2 Mn+"),
+    ("1,000+", "en", "1K+"),
+    ("2500+", "tr", "2500+"),  # not a whole thousand, so no suffix
+    ("2500+", "en", "2500+"),
+    ("200K+", "en", "200K+"),  # already compact: passed through
+    ("200 B+", "tr", "200 B+"),
+])
+def test_format_traffic(traffic, hl, expected):
+    assert format_traffic(traffic, hl) == expected
+
+
+def test_parse_trends_rss():
+    trends = parse_trends_rss(fixture_bytes("google_trends_rss.xml"))
+    assert len(trends) == 68
+    assert trends[:2] == [{"query": "2025 uefa şampiyonlar ligi", "volume": "1 B+"},
+                          {"query": "real madrid - marsilya", "volume": "200 B+"}]
+    assert parse_trends_rss(fixture_bytes("google_trends_rss.xml"), hl="en")[1]["volume"] == "200K+"
+
+
+def test_parse_trends_rss_skips_items_without_a_title():
+    xml = b"""<rss xmlns:ht="https://trends.google.com/trending/rss"><channel>
+        <item><title> </title><ht:approx_traffic>500+</ht:approx_traffic></item>
+        <item><title>Togg</title></item>
+    </channel></rss>"""
+    assert parse_trends_rss(xml) == [{"query": "Togg", "volume": ""}]
+
+
+def test_validate_trends():
+    good = [{"query": f"query {i}"} for i in range(10)]
+    assert validate_trends(good)
+    assert not validate_trends([])
+    assert not validate_trends(good[:9])
+    assert not validate_trends(good[:9] + [{"query": ""}])
+    assert not validate_trends(good[:9] + [{"query": "x" * 100}])  # an error page's text, not a query
+    assert not validate_trends(good[:9] + good[:1])  # fewer than 10 distinct queries
+
+
+def test_fetch_trends_http_against_the_stub(stub):
+    trends = fetch_trends_http(url=f"{stub}/trending/rss", limit=20)
+    assert len(trends) == 20
+    assert validate_trends(trends)
+    with pytest.raises(Exception):
+        fetch_trends_http(url=f"{stub}/missing")
+
+
+def test_fetch_trends_falls_back_to_the_next_backend(stub, capsys):
+    def fallback():
+        return [{"query": "fallback", "volume": ""}]
+
+    trends, name, ms = fetch_trends([
+        ("broken", lambda: fetch_trends_http(url=f"{stub}/missing")),
+        ("rss", lambda: fetch_trends_http(url=f"{stub}/trending/rss")),
+        ("fallback", fallback),
+    ])
+    assert name == "rss" and len(trends) == 50 and ms >= 0
+    assert "broken backend hatası" in capsys.readouterr().out
+
+    # Invalid results move on as well; the last backend is returned even when invalid
+    trends, name, _ = fetch_trends([("short", lambda: [{"query": "a"}]), ("fallback", fallback)])
+    assert (trends, name) == (fallback(), "fallback")
+    assert "short backend doğrulamadan geçemedi (1 trend)" in capsys.readouterr().out
+
+    def fail():
+        raise OSError("offline")
+
+    assert fetch_trends([("a", fail), ("b", fail)]) == ([], None, 0)
@@ -0,0 +1,47 @@
+import json
+import os
+
+from twitter_capture import decode_trending_payload, make_trend
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "fixtures", "twitter_trending_graphql.json")
+
+
+def load_fixture():
+    with open(FIXTURE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_decode_recorded_graphql_response():
+    trends = decode_trending_payload(load_fixture())
+    assert len(trends) == 31
+    assert [t["rank"] for t in trends] == list(range(1, 32))
+    assert trends[1] == {
+        "rank": 2, "label": "Trending in Turkey", "name": "#EmniyetinPromosyonu",
+        "posts": "11.7K posts", "tweetCount": 11700,
+        "url": "https://twitter.com/search?q=%23EmniyetinPromosyonu", "norm": "#emniyetinpromosyonu",
+    }
+
+
+def test_decode_accepts_raw_json_and_limit():
+    payload = load_fixture()
+    assert decode_trending_payload(json.dumps(payload)) == decode_trending_payload(payload)
+    assert [t["rank"] for t in decode_trending_payload(payload, limit=5)] == [1, 2, 3, 4, 5]
+
+
+def test_decode_legacy_guide_and_duplicates():
+    payload = {"timeline": {"instructions": [{"addEntries": {"entries": [
+        {"content": {"trend": {"name": "Togg", "trendMetadata": {
+            "domainContext": "Trending in Turkey", "metaDescription": "2,313 posts"}}}},
+        {"content": {"itemType": "TimelineTrend", "name": "Togg", "trend_metadata": {}}},
+        {"content": {"itemType": "TimelineTrend", "name": "Süper Lig",
+                     "trend_metadata": {"domain_context": "Sports · Trending"}}},
+    ]}}]}}
+    trends = decode_trending_payload(payload)
+    assert [(t["rank"], t["name"], t["tweetCount"]) for t in trends] == [(1, "Togg", 2313), (2, "Süper Lig", 0)]
+    assert trends[1]["norm"] == "super lig"
+
+
+def test_make_trend_ignores_non_post_counts():
+    trend = make_trend(1, "Deprem", posts="Trending")
+    assert trend["posts"] is None and trend["tweetCount"] == 0
@@ -0,0 +1,39 @@
+import pytest
+
+from volume_parse import parse_number, parse_volume, parse_volumes
+
+
+@pytest.mark.parametrize("digits, expected", [
+    ("23", 23), ("23.6", 23.6), ("1,5", 1.5), ("2,313", 2313), ("2.313", 2313),
+    ("1.234.567", 1234567), ("1,234.5", 1234.5), ("1.234,5", 1234.5),
+])
+def test_parse_number(digits, expected):
+    assert parse_number(digits) == expected
+
+
+@pytest.mark.parametrize("text, locale, expected", [
+    ("20 B+", "tr", 20_000),
+    ("200 B+ arama", "tr", 200_000),
+    ("1 Mn+", "tr", 1_000_000),
+    ("2 Mr+", "tr", 2_000_000_000),
+    ("23.6K posts", "en", 23_600),
+    ("1.2M posts", "en", 1_200_000),
+    ("2,313 posts", "en", 2_313),
+    ("5B", "en", 5_000_000_000),
+    ("", "tr", 0),
+    (None, "en", 0),
+    ("Trending", "en", 0),
+    ("12 xyz", "en", 0),
+])
+def test_parse_volume(text, locale, expected):
+    assert parse_volume(text, locale) == expected
+
+
+def test_b_suffix_depends_on_locale():
+    assert parse_volume("20 B+", "tr") == 20_000
+    assert parse_volume("20 B+", "en") == 20_000_000_000
+
+
+def test_parse_volumes_matches_parse_volume():
+    texts = ["20 B+", "", "50 B+", "20 B+", "1 Mn+"]
+    assert parse_volumes(texts, "tr") == [parse_volume(t, "tr") for t in texts]
@@ -0,0 +1,69 @@
+import re
+import unicodedata
+
+# Bump when normalize() changes so caches keyed on its output are invalidated
+NORMALIZER_VERSION = 2
+
+RANK_PREFIX = re.compile(r'^\d+\.\s*')
+
+# Turkish casing: dotted capital İ lowers to i, plain capital I to dotless ı.
+# str.lower() would turn İ into "i" + U+0307 and I into a dotted i.
+_TURKISH_UPPER = str.maketrans({'İ': 'i', 'I': 'ı'})
+
+
+def turkish_lower(text):
+    """Lowercase with Turkish rules for I/İ"""
+    return unicodedata.normalize('NFC', text).translate(_TURKISH_UPPER).lower()
+
+
+def fold_diacritics(text):
+    """Drop combining marks after compatibility decomposition (ş→s, ç→c, ğ→g, ö→o, ü→u, â→a)"""
+    if text.isascii():
+        return text
+    return ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+
+
+def normalize(text):
+    """Matching form of a trend: Turkish-lowered, diacritics and i/ı folded,
+    whitespace collapsed, no rank prefix.
+
+    Trends mix Turkish and ASCII spellings ("süper lig" / "super lig",
+    "BEŞİKTAŞ" / "besiktas"), so everything folds to plain letters. Casing
+    still goes through Turkish rules first, so "BEŞİKTAŞ" and "FINAL" lower
+    correctly before dotted and dotless i are merged.
+    """
+    if not text:
+        return ''
+    text = fold_diacritics(turkish_lower(text).replace('ı', 'i'))
+    text = ' '.join(text.split())
+    return RANK_PREFIX.sub('', text)
+
+
+def trie_regex(words):
+    """Build a prefix-factored alternation matching exactly the given words"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word.lower():
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if len(branches) == 1 and '' not in node:
+            return branches[0]
+        if len(branches) == 1 and len(branches[0]) == 1:
+            group = branches[0]
+        else:
+            group = '(?:' + '|'.join(branches) + ')'
+        # A shorter word ends here, so the longer continuations are optional
+        return group + '?' if '' in node else group
+
+    return build(trie)
+
+
+def without_norm(record):
+    """Copy of a record without the in-memory 'norm' field, for saving"""
+    return {k: v for k, v in record.items() if k != 'norm'}
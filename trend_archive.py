@@ -0,0 +1,269 @@
+"""Columnar Parquet archive of trend snapshots, partitioned by source and day.
+
+    archive/source=google/day=2025-09-15/part-174501123456.parquet   (one per run)
+    archive/source=google/day=2025-09-15/compacted-20250916T0300.parquet
+
+Each run appends a small part file; `compact` merges a day's parts into one
+sorted file. Text columns are dictionary-encoded, since the same queries
+repeat across hourly snapshots. Needs pyarrow (see requirements-optional.txt).
+"""
+from datetime import datetime
+import csv
+import glob
+import os
+import sys
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from text_normalize import normalize
+from trend_store import iter_export_snapshots, volume_locale
+from volume_parse import parse_volume, parse_volumes
+
+ARCHIVE_DIR = os.getenv("TRENDS_ARCHIVE", "archive")
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("The Parquet archive needs pyarrow: pip install pyarrow")
+
+
+def archive_schema():
+    _require_pyarrow()
+    text = pa.dictionary(pa.int32(), pa.string())
+    related = pa.list_(pa.struct([("query", pa.string()), ("value", pa.int64())]))
+    return pa.schema([
+        ("scraped_at", pa.timestamp("us")),
+        ("geo", text),
+        ("rank", pa.int16()),
+        ("query", text),
+        ("norm", text),
+        ("volume_text", text),
+        ("volume", pa.int64()),
+        ("label", text),
+        ("related_top", related),
+        ("related_rising", related),
+    ])
+
+
+def _partitioning():
+    return ds.partitioning(pa.schema([("source", pa.string()), ("day", pa.string())]), flavor="hive")
+
+
+def snapshot_table(source, scraped_at, rows, geo=""):
+    """Arrow table for one snapshot; rows use the trend_store row format"""
+    ts = datetime.fromisoformat(scraped_at)
+    locale = volume_locale(source, geo)
+
+    def related(row, kind):
+        return [{"query": r["query"], "value": r.get("value")} for r in row.get("related", {}).get(kind, [])]
+
+    columns = {
+        "scraped_at": [ts] * len(rows),
+        "geo": [geo] * len(rows),
+        "rank": [r.get("rank") for r in rows],
+        "query": [r["query"] for r in rows],
+        "norm": [normalize(r["query"]) for r in rows],
+        "volume_text": [r.get("volume_text") or None for r in rows],
+        "volume": [v if r.get("volume_text") else None
+                   for r, v in zip(rows, parse_volumes([r.get("volume_text") or "" for r in rows], locale))],
+        "label": [r.get("label") for r in rows],
+        "related_top": [related(r, "top") for r in rows],
+        "related_rising": [related(r, "rising") for r in rows],
+    }
+    return pa.Table.from_pydict(columns, schema=archive_schema())
+
+
+def partition_dir(source, day, root=ARCHIVE_DIR):
+    return os.path.join(root, f"source={source}", f"day={day}")
+
+
+def write_snapshot(source, scraped_at, rows, geo="", root=ARCHIVE_DIR):
+    """Append one snapshot to its day partition as a new part file"""
+    _require_pyarrow()
+    ts = datetime.fromisoformat(scraped_at)
+    directory = partition_dir(source, ts.strftime("%Y-%m-%d"), root)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"part-{ts.strftime('%H%M%S%f')}{geo and '-' + geo}.parquet")
+    tmp = os.path.join(directory, f"_{os.path.basename(path)}.tmp")
+    pq.write_table(snapshot_table(source, scraped_at, rows, geo), tmp)
+    os.replace(tmp, path)
+    return path
+
+
+def write_google_run(all_trends_data, geo="TR", root=ARCHIVE_DIR):
+    from trend_store import google_rows
+    entries = [e for e in all_trends_data if e.get("success")]
+    if entries:
+        return write_snapshot("google", min(e["timestamp"] for e in entries), google_rows(entries), geo, root)
+
+
+def write_twitter_run(trends, scraped_at=None, root=ARCHIVE_DIR):
+    from trend_store import twitter_rows
+    return write_snapshot("twitter", scraped_at or datetime.now().isoformat(), twitter_rows(trends), "", root)
+
+
+def compact_partition(directory):
+    """Merge all parquet files of one day partition into a single sorted file"""
+    files = sorted(glob.glob(os.path.join(directory, "*.parquet")))
+    if len(files) < 2:
+        return None
+    table = pa.concat_tables(pq.read_table(f, schema=archive_schema()) for f in files)
+    table = table.sort_by([("scraped_at", "ascending"), ("rank", "ascending")])
+    table = table.unify_dictionaries()
+
+    name = f"compacted-{datetime.now().strftime('%Y%m%dT%H%M%S')}.parquet"
+    tmp = os.path.join(directory, f"_{name}.tmp")
+    pq.write_table(table, tmp, row_group_size=64 * 1024)
+    os.replace(tmp, os.path.join(directory, name))
+    for f in files:
+        os.remove(f)
+    return name
+
+
+def compact(root=ARCHIVE_DIR, source=None):
+    """Compact every day partition that has more than one file"""
+    _require_pyarrow()
+    pattern = os.path.join(root, f"source={source or '*'}", "day=*")
+    return {directory: name for directory in sorted(glob.glob(pattern)) if (name := compact_partition(directory))}
+
+
+def import_exports(directory=".", root=ARCHIVE_DIR):
+    """Merge every CSV/JSON export into the day partitions.
+
+    Files already in a partition (live run parts, earlier imports,
+    compactions) are kept: an exported snapshot is only added when the
+    partition has no snapshot of the same geo within 90 s, and the merged
+    partition is written as one file before the old ones are removed.
+    """
+    _require_pyarrow()
+    from trend_store import _near
+
+    by_day = {}
+    for snap in iter_export_snapshots(directory):
+        by_day.setdefault((snap["source"], snap["scraped_at"][:10]), []).append(snap)
+
+    counts = {"partitions": 0, "snapshots": 0, "skipped": 0}
+    for (source, day), snaps in sorted(by_day.items()):
+        path = partition_dir(source, day, root)
+        os.makedirs(path, exist_ok=True)
+        old_files = sorted(glob.glob(os.path.join(path, "*.parquet")))
+        tables = [pq.read_table(f, schema=archive_schema()) for f in old_files]
+
+        stored = {}
+        for table in tables:
+            for geo, ts in set(zip(table.column("geo").to_pylist(), table.column("scraped_at").to_pylist())):
+                stored.setdefault(geo, []).append(ts)
+        for times in stored.values():
+            times.sort()
+
+        added = 0
+        for snap in snaps:
+            if _near(stored.get(snap["geo"], []), datetime.fromisoformat(snap["scraped_at"])):
+                counts["skipped"] += 1
+                continue
+            tables.append(snapshot_table(source, snap["scraped_at"], snap["rows"], snap["geo"]))
+            added += 1
+        if not added:
+            continue
+
+        table = pa.concat_tables(tables).sort_by([("scraped_at", "ascending"), ("rank", "ascending")])
+        name = f"compacted-import-{datetime.now().strftime('%Y%m%dT%H%M%S')}.parquet"
+        tmp = os.path.join(path, f"_{name}.tmp")
+        pq.write_table(table.unify_dictionaries(), tmp)
+        os.replace(tmp, os.path.join(path, name))
+        for f in old_files:
+            if os.path.basename(f) != name:
+                os.remove(f)
+        counts["partitions"] += 1
+        counts["snapshots"] += added
+    return counts
+
+
+def read_trends(columns=None, source=None, start=None, end=None, query=None, geo=None, root=ARCHIVE_DIR):
+    """Column-projected, predicate-filtered Arrow table from the archive.
+
+    start/end are ISO timestamps (end exclusive); query is matched on its
+    normalised form. Day partitions outside the range are never opened.
+    Use .to_pylist() for dicts or .to_pandas() when pandas is installed.
+    """
+    _require_pyarrow()
+    dataset = ds.dataset(root, format="parquet", partitioning=_partitioning())
+    conditions = []
+    if source:
+        conditions.append(ds.field("source") == source)
+    if start:
+        conditions.append(ds.field("day") >= start[:10])
+        conditions.append(ds.field("scraped_at") >= pa.scalar(datetime.fromisoformat(start), pa.timestamp("us")))
+    if end:
+        conditions.append(ds.field("day") <= end[:10])
+        conditions.append(ds.field("scraped_at") < pa.scalar(datetime.fromisoformat(end), pa.timestamp("us")))
+    if geo is not None:
+        conditions.append(ds.field("geo") == geo)
+    if query:
+        conditions.append(ds.field("norm") == normalize(query))
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return dataset.to_table(columns=columns, filter=expression)
+
+
+def benchmark_archive(query="togg", root=ARCHIVE_DIR, csv_file="trends.csv", repeat=5):
+    """Volume series of one query: scanning trends.csv row by row versus the Parquet reader"""
+    _require_pyarrow()
+
+    def csv_scan():
+        target = normalize(query)
+        with open(csv_file, encoding="utf-8") as f:
+            return [(row["timestamp"], parse_volume(row.get("volume", ""), "tr"))
+                    for row in csv.DictReader(f) if normalize(row["query"]) == target]
+
+    def archive_read():
+        table = read_trends(columns=["scraped_at", "volume"], source="google", query=query, root=root)
+        return list(zip(table.column("scraped_at").to_pylist(), table.column("volume").to_pylist()))
+
+    def full_csv():
+        with open(csv_file, encoding="utf-8") as f:
+            return sum(parse_volume(row.get("volume", ""), "tr") for row in csv.DictReader(f))
+
+    def full_archive():
+        table = read_trends(columns=["volume"], source="google", root=root)
+        return pc.sum(table.column("volume")).as_py()
+
+    def timed(func):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return round(best * 1000, 2), result
+
+    size = sum(os.path.getsize(f) for f in glob.glob(os.path.join(root, "**", "*.parquet"), recursive=True))
+    print(f"Archive benchmark ({root}: {size / 1024:.0f} KB parquet, {csv_file}: {os.path.getsize(csv_file) / 1024:.0f} KB)")
+    print("   (the archive also holds the runs that only exist as JSON files)")
+    for name, csv_func, archive_func in (("series", csv_scan, archive_read), ("total volume", full_csv, full_archive)):
+        csv_ms, csv_result = timed(csv_func)
+        archive_ms, archive_result = timed(archive_func)
+        count = len(csv_result) if isinstance(csv_result, list) else csv_result
+        archive_count = len(archive_result) if isinstance(archive_result, list) else archive_result
+        print(f"   {name:12s} csv {csv_ms} ms ({count}) | parquet {archive_ms} ms ({archive_count})")
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "import":
+        print(f"Archiving exports into {ARCHIVE_DIR}: {import_exports()}")
+    elif command == "compact":
+        print(f"Compacted: {compact()}")
+    elif command == "bench":
+        benchmark_archive(*sys.argv[2:3])
+    else:
+        print("usage: python trend_archive.py import | compact | bench [query]")
@@ -0,0 +1,436 @@
+"""SQLite (WAL) store for Google and Twitter trend snapshots.
+
+One row per scrape in `snapshots`, one per trend in `trends`, one per related
+query in `related`. Each run is written in a single transaction. The CSV and
+JSON files stay available as exports; `python trend_store.py import` backfills
+the store from every existing export in the directory, and
+`python trend_store.py migrate` brings a database written by an older
+version up to date.
+"""
+from datetime import datetime
+from itertools import count
+import bisect
+import csv
+import glob
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+
+from rollups import apply_snapshot, snapshot_rollup
+from text_normalize import normalize
+from volume_parse import parse_volumes
+
+DB_FILE = os.getenv("TRENDS_DB", "trends.db")
+# PRAGMA user_version of a current database; bump when migrate() has new work to do
+SCHEMA_VERSION = 1
+
+
+def export_formats():
+    """File exports still written next to the store (TRENDS_EXPORTS, default 'csv,json')"""
+    return {f.strip() for f in os.getenv("TRENDS_EXPORTS", "csv,json").lower().split(",") if f.strip()}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    geo TEXT NOT NULL DEFAULT '',
+    scraped_at TEXT NOT NULL,
+    origin TEXT,
+    trend_count INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (source, geo, scraped_at)
+);
+CREATE TABLE IF NOT EXISTS trends (
+    id INTEGER PRIMARY KEY,
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(id) ON DELETE CASCADE,
+    rank INTEGER,
+    query TEXT NOT NULL,
+    norm TEXT NOT NULL,
+    volume_text TEXT,
+    volume INTEGER,
+    label TEXT,
+    url TEXT
+);
+CREATE TABLE IF NOT EXISTS related (
+    trend_id INTEGER NOT NULL REFERENCES trends(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    query TEXT NOT NULL,
+    value INTEGER
+);
+-- Per query and hour: the index behind history.py, updated with every snapshot
+CREATE TABLE IF NOT EXISTS trend_hours (
+    norm TEXT NOT NULL,
+    bucket TEXT NOT NULL,  -- scraped_at truncated to the hour, 'YYYY-MM-DDTHH'
+    source TEXT NOT NULL,
+    query TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    snapshots INTEGER NOT NULL,
+    best_rank INTEGER,
+    peak_volume INTEGER,
+    peak_at TEXT,
+    PRIMARY KEY (norm, bucket, source)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_trend_hours_bucket ON trend_hours (bucket, source);
+-- SportsFilter counts of the scrape a snapshot came from (rollups.py)
+CREATE TABLE IF NOT EXISTS snapshot_filter_stats (
+    snapshot_id INTEGER PRIMARY KEY REFERENCES snapshots(id) ON DELETE CASCADE,
+    sports_checked INTEGER NOT NULL,
+    sports_filtered INTEGER NOT NULL
+);
+-- Per source, geo and hour/day bucket, merged with every snapshot (rollups.py)
+CREATE TABLE IF NOT EXISTS rollups (
+    source TEXT NOT NULL,
+    geo TEXT NOT NULL,
+    grain TEXT NOT NULL,  -- 'hour' ('YYYY-MM-DDTHH') or 'day' ('YYYY-MM-DD')
+    bucket TEXT NOT NULL,
+    snapshots INTEGER NOT NULL,
+    trends INTEGER NOT NULL,
+    volume_count INTEGER NOT NULL,
+    volume_sum INTEGER NOT NULL,
+    volume_max INTEGER,
+    sports_checked INTEGER,  -- NULL: no merged snapshot had filter stats
+    sports_filtered INTEGER,
+    hll BLOB NOT NULL,  -- HyperLogLog registers of the normalised queries
+    PRIMARY KEY (grain, bucket, source, geo)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_snapshots_source_time ON snapshots (source, scraped_at);
+CREATE INDEX IF NOT EXISTS idx_trends_norm ON trends (norm);
+CREATE INDEX IF NOT EXISTS idx_trends_snapshot ON trends (snapshot_id);
+CREATE INDEX IF NOT EXISTS idx_related_trend ON related (trend_id);
+"""
+
+
+def volume_locale(source, geo):
+    """Google TR volumes use Turkish suffixes ('20 B+'); everything else is English"""
+    return "tr" if source == "google" and geo in ("", "TR") else "en"
+
+
+HOURS_UPSERT = """
+INSERT INTO trend_hours VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?, ?)
+ON CONFLICT (norm, bucket, source) DO UPDATE SET
+    query = excluded.query,
+    first_seen = MIN(first_seen, excluded.first_seen),
+    last_seen = MAX(last_seen, excluded.last_seen),
+    snapshots = snapshots + 1,
+    best_rank = COALESCE(MIN(best_rank, excluded.best_rank), best_rank, excluded.best_rank),
+    peak_at = CASE WHEN COALESCE(excluded.peak_volume, -1) > COALESCE(peak_volume, -1) THEN excluded.peak_at ELSE peak_at END,
+    peak_volume = COALESCE(MAX(peak_volume, excluded.peak_volume), peak_volume, excluded.peak_volume)
+"""
+
+
+def hour_rows(source, scraped_at, trends):
+    """trend_hours upsert parameters for one snapshot; `trends` are (rank, query, norm, volume)"""
+    by_norm = {}
+    for rank, query, norm, volume in trends:
+        best = by_norm.get(norm)
+        if best is None:
+            by_norm[norm] = [rank, query, volume]
+        else:  # same query twice in one snapshot counts once
+            if rank is not None and (best[0] is None or rank < best[0]):
+                best[0] = rank
+            if volume is not None and (best[2] is None or volume > best[2]):
+                best[2] = volume
+    bucket = scraped_at[:13]
+    return [(norm, bucket, source, query, scraped_at, scraped_at, rank, volume, scraped_at if volume is not None else None)
+            for norm, (rank, query, volume) in by_norm.items()]
+
+
+def google_rows(all_trends_data):
+    """Rows for save_snapshot from process_trends entries (both archived JSON formats)"""
+    rows = []
+    for rank, entry in enumerate(all_trends_data, 1):
+        query = entry.get("query")
+        # Early archives stored the query string, later ones {"query", "volume"}
+        if isinstance(query, dict):
+            query, volume_text = query.get("query"), query.get("volume", "")
+        else:
+            volume_text = ""
+        if not query:
+            continue
+        rows.append({
+            "rank": rank, "query": query, "volume_text": volume_text,
+            "related": entry.get("related_queries") or {},
+        })
+    return rows
+
+
+def twitter_rows(trends):
+    return [{
+        "rank": t.get("rank"), "query": t["name"], "volume_text": t.get("posts") or "",
+        "label": t.get("label"), "url": t.get("url"),
+    } for t in trends if t.get("name")]
+
+
+class TrendStore:
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        is_new = not self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'snapshots'").fetchone()
+        self.conn.executescript(SCHEMA)
+        if is_new:
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        elif self.schema_version() < SCHEMA_VERSION:
+            print(f"⚠️ {path} was written by an older version; run 'python trend_store.py migrate'")
+        self._lock = threading.Lock()
+
+    def schema_version(self):
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def save_snapshot(self, source, scraped_at, rows, geo="", origin=None, sports_stats=None):
+        """Insert a snapshot and its trends/related rows in one transaction,
+        updating trend_hours and the rollups (`sports_stats` from SportsFilter.classify_batch).
+
+        Returns the snapshot id, or None if (source, geo, scraped_at) is already stored.
+        """
+        locale = volume_locale(source, geo)
+        volume_texts = [row.get("volume_text") or "" for row in rows]
+        volumes = parse_volumes(volume_texts, locale)
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                cur = self.conn.execute(
+                    "INSERT OR IGNORE INTO snapshots (source, geo, scraped_at, origin, trend_count) VALUES (?, ?, ?, ?, ?)",
+                    (source, geo, scraped_at, origin, len(rows)))
+                if not cur.rowcount:
+                    self.conn.execute("ROLLBACK")
+                    return None
+                snapshot_id = cur.lastrowid
+
+                # Ids are assigned here so trends and related rows can both go through executemany
+                next_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM trends").fetchone()[0]
+                trend_rows, related_rows = [], []
+                for trend_id, row, volume_text, volume in zip(count(next_id), rows, volume_texts, volumes):
+                    trend_rows.append((
+                        trend_id, snapshot_id, row.get("rank"), row["query"], normalize(row["query"]),
+                        volume_text, volume if volume_text else None,
+                        row.get("label"), row.get("url"),
+                    ))
+                    for kind in ("top", "rising"):
+                        for position, item in enumerate(row.get("related", {}).get(kind, []), 1):
+                            related_rows.append((trend_id, kind, position, item["query"], item.get("value")))
+
+                self.conn.executemany("INSERT INTO trends VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", trend_rows)
+                self.conn.executemany("INSERT INTO related VALUES (?, ?, ?, ?, ?)", related_rows)
+                self.conn.executemany(HOURS_UPSERT, hour_rows(
+                    source, scraped_at, [(t[2], t[3], t[4], t[6]) for t in trend_rows]))
+                if sports_stats:
+                    self.conn.execute("INSERT INTO snapshot_filter_stats VALUES (?, ?, ?)", (
+                        snapshot_id, sports_stats.get("total", 0), sports_stats.get("sports_related", 0)))
+                apply_snapshot(self.conn, source, geo, scraped_at,
+                               snapshot_rollup([(t[4], t[6]) for t in trend_rows], sports_stats))
+                self.conn.execute("COMMIT")
+                return snapshot_id
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def save_google_run(self, all_trends_data, geo="TR", origin=None, sports_stats=None):
+        entries = [e for e in all_trends_data if e.get("success")]
+        if not entries:
+            return None
+        scraped_at = min(e["timestamp"] for e in entries)
+        return self.save_snapshot("google", scraped_at, google_rows(entries), geo=geo, origin=origin,
+                                  sports_stats=sports_stats)
+
+    def save_twitter_run(self, trends, scraped_at=None, origin=None, sports_stats=None):
+        scraped_at = scraped_at or datetime.now().isoformat()
+        return self.save_snapshot("twitter", scraped_at, twitter_rows(trends), origin=origin, sports_stats=sports_stats)
+
+    def has_snapshot_near(self, source, geo, scraped_at, window_sec=90):
+        """True if a snapshot of the same source/geo exists within `window_sec` of `scraped_at`"""
+        row = self.conn.execute(
+            "SELECT 1 FROM snapshots WHERE source = ? AND geo = ? "
+            "AND ABS(julianday(scraped_at) - julianday(?)) * 86400 <= ? LIMIT 1",
+            (source, geo, scraped_at, window_sec)).fetchone()
+        return row is not None
+
+    def latest_snapshot(self, source, geo=""):
+        """The newest snapshot as {'scraped_at', 'trends': [...]}, or None"""
+        row = self.conn.execute(
+            "SELECT id, scraped_at FROM snapshots WHERE source = ? AND geo = ? ORDER BY scraped_at DESC LIMIT 1",
+            (source, geo)).fetchone()
+        if not row:
+            return None
+        trends = self.conn.execute(
+            "SELECT rank, query, volume_text, volume, label, url FROM trends WHERE snapshot_id = ? ORDER BY rank",
+            (row[0],)).fetchall()
+        keys = ("rank", "query", "volume_text", "volume", "label", "url")
+        return {"scraped_at": row[1], "trends": [dict(zip(keys, t)) for t in trends]}
+
+    def counts(self):
+        return {
+            source: {"snapshots": snapshots, "trends": trends, "last": last}
+            for source, snapshots, trends, last in self.conn.execute(
+                "SELECT source, COUNT(*), SUM(trend_count), MAX(scraped_at) FROM snapshots GROUP BY source")
+        }
+
+    def close(self):
+        self.conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Process-wide store on DB_FILE, or None when TRENDS_DB is set to an empty string"""
+    global _store
+    with _store_lock:
+        if _store is None and DB_FILE:
+            _store = TrendStore(DB_FILE)
+    return _store
+
+
+# --- Backfill from the CSV/JSON exports ---
+
+def _geo_from_name(filename, prefix):
+    m = re.match(rf"{prefix}_([A-Z]{{2}})[_.]", os.path.basename(filename))
+    return m.group(1) if m else "TR"
+
+
+def _csv_runs(rows, gap_sec=120):
+    """Group CSV rows into runs: consecutive rows less than `gap_sec` apart"""
+    run, last = [], None
+    for row in rows:
+        ts = datetime.fromisoformat(row["timestamp"])
+        if run and (ts - last).total_seconds() > gap_sec:
+            yield run
+            run = []
+        run.append(row)
+        last = ts
+    if run:
+        yield run
+
+
+def _split_related(text):
+    return [{"query": q.strip()} for q in (text or "").split(", ") if q.strip()]
+
+
+def _near(times, ts, window_sec=90):
+    i = bisect.bisect_left(times, ts)
+    return any(abs((times[j] - ts).total_seconds()) <= window_sec for j in (i - 1, i) if 0 <= j < len(times))
+
+
+def iter_export_snapshots(directory="."):
+    """Yield every snapshot found in the CSV/JSON exports as a dict with
+    source, geo, scraped_at, rows, origin and kind ('json' or 'csv').
+
+    JSON files come first because they carry related-query values; CSV runs
+    (master and daily files overlap) are only yielded when no JSON snapshot
+    or earlier CSV run of the same source/geo lies within 90 s.
+    """
+    seen = {}
+
+    def mark(source, geo, scraped_at):
+        bisect.insort(seen.setdefault((source, geo), []), datetime.fromisoformat(scraped_at))
+
+    def is_new(source, geo, scraped_at):
+        return not _near(seen.get((source, geo), []), datetime.fromisoformat(scraped_at))
+
+    for path in sorted(glob.glob(os.path.join(directory, "trends_data_mZ3RIc*.json"))):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        geo = _geo_from_name(path, "trends_data_mZ3RIc")
+        entries = [e for e in data if e.get("success")]
+        if not entries:
+            continue
+        scraped_at = min(e["timestamp"] for e in entries)
+        mark("google", geo, scraped_at)
+        yield {"source": "google", "geo": geo, "scraped_at": scraped_at, "rows": google_rows(entries),
+               "origin": os.path.basename(path), "kind": "json"}
+
+    for path in sorted(glob.glob(os.path.join(directory, "twitter_trends_*.json"))):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        mark("twitter", "", data["scraped_at"])
+        yield {"source": "twitter", "geo": "", "scraped_at": data["scraped_at"], "rows": twitter_rows(data["trends"]),
+               "origin": os.path.basename(path), "kind": "json"}
+
+    for path in sorted(glob.glob(os.path.join(directory, "trends*.csv"))):
+        geo = _geo_from_name(path, "trends")
+        with open(path, encoding="utf-8") as f:
+            rows = [r for r in csv.DictReader(f) if r.get("timestamp") and r.get("query")]
+        for run in _csv_runs(rows):
+            scraped_at = run[0]["timestamp"]
+            if not is_new("google", geo, scraped_at):
+                continue
+            mark("google", geo, scraped_at)
+            yield {"source": "google", "geo": geo, "scraped_at": scraped_at, "rows": [{
+                "rank": rank, "query": r["query"], "volume_text": r.get("volume") or "",
+                "related": {"top": _split_related(r.get("related_top")),
+                            "rising": _split_related(r.get("related_rising"))},
+            } for rank, r in enumerate(run, 1)], "origin": os.path.basename(path), "kind": "csv"}
+
+    twitter_csv = os.path.join(directory, "twitter_trends.csv")
+    if os.path.exists(twitter_csv):
+        with open(twitter_csv, encoding="utf-8") as f:
+            rows = [r for r in csv.DictReader(f) if r.get("timestamp") and r.get("name")]
+        for run in _csv_runs(rows):
+            scraped_at = run[0]["timestamp"]
+            if not is_new("twitter", "", scraped_at):
+                continue
+            mark("twitter", "", scraped_at)
+            yield {"source": "twitter", "geo": "", "scraped_at": scraped_at, "rows": twitter_rows([{
+                "rank": int(r["rank"]) if r.get("rank", "").isdigit() else None,
+                "name": r["name"], "label": r.get("label") or None,
+                "posts": r.get("posts") or None, "url": r.get("url") or None,
+            } for r in run]), "origin": "twitter_trends.csv", "kind": "csv"}
+
+
+def migrate(store):
+    """Bring an older database up to date: re-normalise stored queries, recreate
+    the rollups table and rebuild trend_hours and the rollups; safe to re-run"""
+    from history import rebuild_index
+    from rollups import rebuild
+
+    changed = [(norm, trend_id) for trend_id, query, old in store.conn.execute("SELECT id, query, norm FROM trends")
+               for norm in [normalize(query)] if norm != old]
+    with store._lock:
+        store.conn.execute("BEGIN IMMEDIATE")
+        try:
+            store.conn.executemany("UPDATE trends SET norm = ? WHERE id = ?", changed)
+            store.conn.execute("DROP TABLE IF EXISTS rollups")  # older files declared the sports counts NOT NULL
+            for statement in SCHEMA.split(";"):
+                store.conn.execute(statement)
+            store.conn.execute("COMMIT")
+        except BaseException:
+            store.conn.execute("ROLLBACK")
+            raise
+    result = {"renormalised": len(changed), "trend_hours": rebuild_index(store), "rollups": rebuild(store)["rows"]}
+    store.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return result
+
+
+def import_archive(store, directory="."):
+    """Backfill the store from every trends/twitter CSV and JSON export; safe to re-run"""
+    counts = {"json": 0, "csv": 0, "skipped": 0}
+    for snap in iter_export_snapshots(directory):
+        # CSV runs may duplicate a run the scraper already wrote to the store
+        if snap["kind"] == "csv" and store.has_snapshot_near(snap["source"], snap["geo"], snap["scraped_at"]):
+            counts["skipped"] += 1
+            continue
+        if store.save_snapshot(snap["source"], snap["scraped_at"], snap["rows"], geo=snap["geo"], origin=snap["origin"]):
+            counts[snap["kind"]] += 1
+        else:
+            counts["skipped"] += 1
+    return counts
+
+
+if __name__ == "__main__":
+    store = TrendStore(DB_FILE)
+    if sys.argv[1:2] == ["import"]:
+        print(f"Importing exports into {DB_FILE}...")
+        print(f"   {import_archive(store)}")
+    elif sys.argv[1:2] == ["migrate"]:
+        print(f"Migrating {DB_FILE} (schema version {store.schema_version()} -> {SCHEMA_VERSION})...")
+        print(f"   {migrate(store)}")
+    for source, c in store.counts().items():
+        print(f"   {source}: {c['snapshots']} snapshots, {c['trends']} trends, last {c['last']}")
+    store.close()
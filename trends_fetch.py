@@ -0,0 +1,124 @@
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from urllib.request import Request, urlopen
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+
+GOOGLE_RSS_URL = "https://trends.google.com/trending/rss?geo={geo}&hl={hl}"
+GOOGLE_PAGE_URL = "https://trends.google.com/trends/trendingsearches/daily?geo={geo}&hl={hl}"
+
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "application/rss+xml, application/xml;q=0.9, */*;q=0.8",
+}
+
+# Compact-number suffixes used by the trends page for each display language
+TRAFFIC_SUFFIXES = {
+    "tr": [(1_000_000_000, "Mr"), (1_000_000, "Mn"), (1_000, "B")],
+    "en": [(1_000_000_000, "B"), (1_000_000, "M"), (1_000, "K")],
+}
+
+
+class HostLimiter:
+    """Caps the number of concurrent requests per host across worker threads"""
+
+    def __init__(self, default_limit=2):
+        self.default_limit = default_limit
+        self.limits = {}
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def set_limit(self, host, limit):
+        with self._lock:
+            self.limits[host] = limit
+            self._semaphores.pop(host, None)
+
+    @contextmanager
+    def slot(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.limits.get(host, self.default_limit))
+            semaphore = self._semaphores[host]
+        with semaphore:
+            yield
+
+
+host_limiter = HostLimiter(int(os.getenv("TRENDS_HOST_CONCURRENCY", "2")))
+
+
+def format_traffic(approx_traffic, hl="tr"):
+    """Turn RSS traffic like '50000+' into the page's display form ('50 B+' for tr)"""
+    digits = approx_traffic.replace(",", "").replace(".", "").rstrip("+").strip()
+    if not digits.isdigit():
+        return approx_traffic
+    value = int(digits)
+    separator = " " if hl == "tr" else ""
+    for size, suffix in TRAFFIC_SUFFIXES.get(hl, TRAFFIC_SUFFIXES["en"]):
+        if value >= size and value % size == 0:
+            return f"{value // size}{separator}{suffix}+"
+    return f"{value}+"
+
+
+def parse_trends_rss(xml_bytes, hl="tr"):
+    """Parse the daily-trends RSS feed into [{'query', 'volume'}] dicts"""
+    trends = []
+    root = ET.fromstring(xml_bytes)
+    for item in root.iter("item"):
+        query, traffic = "", ""
+        for child in item:
+            tag = child.tag.rsplit("}", 1)[-1]
+            if tag == "title":
+                query = (child.text or "").strip()
+            elif tag == "approx_traffic":
+                traffic = (child.text or "").strip()
+        if query:
+            trends.append({"query": query, "volume": format_traffic(traffic, hl) if traffic else ""})
+    return trends
+
+
+def validate_trends(trends, min_items=10):
+    """Reject feeds that are empty, too short or look like an error/consent page"""
+    if len(trends) < min_items:
+        return False
+    queries = [t["query"] for t in trends]
+    if any(not q or len(q) >= 100 for q in queries):
+        return False
+    return len(set(queries)) >= min_items
+
+
+def fetch_trends_http(geo="TR", hl="tr", url=None, timeout=10, limit=50):
+    """Fetch daily trends over plain HTTP (no browser); raises on HTTP/parse errors"""
+    url = url or (os.getenv("TRENDS_RSS_URL") or GOOGLE_RSS_URL).format(geo=geo, hl=hl)
+    with host_limiter.slot(url):
+        with urlopen(Request(url, headers=HTTP_HEADERS), timeout=timeout) as response:
+            body = response.read()
+
+    seen, trends = set(), []
+    for trend in parse_trends_rss(body, hl):
+        if trend["query"] not in seen:
+            seen.add(trend["query"])
+            trends.append(trend)
+    return trends[:limit]
+
+
+def fetch_trends(backends, validate=validate_trends):
+    """Try (name, fetch) backends in order and return (trends, backend_name, ms) of the first valid one.
+
+    The last backend is the fallback of last resort, so its result is returned
+    even when it does not pass validation.
+    """
+    for i, (name, fetch) in enumerate(backends):
+        start = time.perf_counter()
+        try:
+            trends = fetch()
+        except Exception as e:
+            print(f"   ⚠️ {name} backend hatası: {e}")
+            continue
+        ms = int((time.perf_counter() - start) * 1000)
+        if validate(trends) or i == len(backends) - 1:
+            return trends, name, ms
+        print(f"   ⚠️ {name} backend doğrulamadan geçemedi ({len(trends)} trend)")
+    return [], None, 0
@@ -0,0 +1,125 @@
+import json
+import os
+
+from text_normalize import normalize
+from volume_parse import parse_volume
+
+# Responses that carry the explore/trending timeline
+TREND_RESPONSE_MARKERS = ("/GenericTimelineById", "/ExplorePage", "/ExploreSidebar", "/2/guide.json")
+
+
+def trend_search_url(name):
+    q = name.replace("#", "%23").replace(" ", "%20")
+    return f"https://twitter.com/search?q={q}"
+
+
+def make_trend(rank, name, label=None, posts=None):
+    """Build a trend dict in the shape save_twitter_trends / save_to_csv expect"""
+    trend = {
+        "rank": rank, "label": label or None, "name": name,
+        "posts": None, "tweetCount": 0, "url": None
+    }
+    if posts and "posts" in posts:
+        trend["posts"] = posts
+        trend["tweetCount"] = parse_volume(posts, "en")
+    if name:
+        trend["url"] = trend_search_url(name)
+        trend["norm"] = normalize(name)
+    return trend
+
+
+def _iter_trend_items(node):
+    """Yield (name, label, posts) for every trend object anywhere in a timeline payload"""
+    if isinstance(node, dict):
+        # GraphQL: {"itemType": "TimelineTrend", "name", "trend_metadata": {...}}
+        if node.get("itemType") == "TimelineTrend" or node.get("__typename") == "TimelineTrend":
+            meta = node.get("trend_metadata") or {}
+            yield node.get("name"), meta.get("domain_context"), meta.get("meta_description")
+            return
+        # Legacy guide.json: {"trend": {"name", "trendMetadata": {...}}}
+        trend = node.get("trend")
+        if isinstance(trend, dict) and "name" in trend:
+            meta = trend.get("trendMetadata") or {}
+            yield trend.get("name"), meta.get("domainContext"), meta.get("metaDescription")
+            return
+        for value in node.values():
+            yield from _iter_trend_items(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _iter_trend_items(value)
+
+
+def decode_trending_payload(payload, limit=50):
+    """Decode an explore/trending JSON response into trend dicts (ranked in order)"""
+    if isinstance(payload, (str, bytes)):
+        payload = json.loads(payload)
+
+    trends, seen = [], set()
+    for name, label, posts in _iter_trend_items(payload):
+        if not name or name in seen:
+            continue
+        seen.add(name)
+        trends.append(make_trend(len(trends) + 1, name, label, posts))
+        if len(trends) >= limit:
+            break
+    return trends
+
+
+def trending_request_ids(log_entries):
+    """Request ids of trending-timeline JSON responses found in Chrome performance logs"""
+    request_ids = []
+    for entry in log_entries:
+        message = entry.get("message", "")
+        if "Network.responseReceived" not in message:
+            continue
+        event = json.loads(message).get("message", {})
+        if event.get("method") != "Network.responseReceived":
+            continue
+        params = event.get("params", {})
+        response = params.get("response", {})
+        url = response.get("url", "")
+        if response.get("status") == 200 and any(marker in url for marker in TREND_RESPONSE_MARKERS):
+            request_ids.append(params["requestId"])
+    return request_ids
+
+
+def capture_trends_from_logs(log_entries, get_body, limit=50):
+    """Decode trends from the newest trending response; get_body(request_id) returns its body"""
+    for request_id in reversed(trending_request_ids(log_entries)):
+        try:
+            trends = decode_trending_payload(get_body(request_id), limit)
+        except Exception as e:
+            print(f"Could not decode response {request_id}: {e}")
+            continue
+        if trends:
+            return trends
+    return []
+
+
+def capture_trends(driver, limit=50):
+    """Read trends from the trending GraphQL response captured by the browser"""
+    def get_body(request_id):
+        result = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        return result["body"]
+
+    return capture_trends_from_logs(driver.get_log("performance"), get_body, limit)
+
+
+def replay_fixture(path="fixtures/twitter_performance_log.json"):
+    """Run the capture path offline against a recorded performance log and response body"""
+    with open(path, encoding="utf-8") as f:
+        recorded = json.load(f)
+
+    def get_body(request_id):
+        body_file = os.path.join(os.path.dirname(path), recorded["bodies"][request_id])
+        with open(body_file, encoding="utf-8") as f:
+            return f.read()
+
+    return capture_trends_from_logs(recorded["log"], get_body)
+
+
+if __name__ == "__main__":
+    trends = replay_fixture()
+    print(f"Decoded {len(trends)} trends from the recorded response")
+    for t in trends[:10]:
+        print(f"{t['rank']}. {t['name']} | {t['label']} | {t['posts']} ({t['tweetCount']})")
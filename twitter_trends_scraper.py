@@ -4,7 +4,6 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from datetime import datetime
 import json
 import time
@@ -15,12 +14,22 @@ import re
 from dotenv import load_dotenv
 import subprocess
 from sports_filter import SportsFilter  # adjust path if needed
+from scroll_loader import load_cards
+from browser_pool import chromedriver_path, get_pool
+from file_handles import append_rows
+from resource_blocking import blocking_enabled, enable_blocking, page_metrics
+from twitter_capture import capture_trends, trend_search_url
+from page_extract import extract_twitter_trends
+from session_cache import invalidate_session, record_success, redirected_to_login, session_known_good
+from text_normalize import without_norm
+from trend_store import export_formats, get_store
+from volume_parse import parse_volume
 
 # Load environment variables from .env file
 load_dotenv()
 
 # Global filter instance
-sports_filter = SportsFilter()
+sports_filter = SportsFilter(cache_path=os.getenv("SPORTS_FILTER_CACHE", "sports_filter_cache.json"))
 
 def setup_driver():
     """Setup Chrome driver with options"""
@@ -42,13 +51,20 @@ def setup_driver():
     chrome_options.add_argument('--disable-gpu')
     chrome_options.add_argument('--disable-extensions')
     chrome_options.add_argument("--user-data-dir=selenium_profile")  # persistent session
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})  # network capture
 
     driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
+        service=Service(chromedriver_path()),
         options=chrome_options
     )
+    if blocking_enabled():
+        enable_blocking(driver, "twitter")
     return driver
 
+def twitter_pool():
+    """Shared warm browser for Twitter (one session, since it owns selenium_profile)"""
+    return get_pool("twitter", setup_driver, size=1)
+
 def automated_login(driver):
     """Automated login to Twitter using credentials from .env"""
     try:
@@ -109,6 +125,42 @@ def check_logged_in(driver):
     except:
         return False
 
+TRENDING_URL = "https://twitter.com/explore/tabs/trending"
+
+def open_trending_page(driver):
+    """Open the trending tab, skipping the /home login probe when the session is known good"""
+    trends_loaded = EC.presence_of_element_located((By.CSS_SELECTOR, "[data-testid='trend']"))
+    if session_known_good():
+        print("Session cached as valid, going straight to trends page...")
+        driver.get(TRENDING_URL)
+        # X redirects a stale session to /i/flow/login client-side, after get() returns
+        try:
+            WebDriverWait(driver, 15).until(EC.any_of(trends_loaded, redirected_to_login))
+        except Exception:
+            pass
+        if redirected_to_login(driver):
+            print("Redirected to login. Attempting login...")
+            invalidate_session()
+            if not automated_login(driver):
+                return False
+            driver.get(TRENDING_URL)
+    else:
+        if not check_logged_in(driver):
+            print("Not logged in. Attempting login...")
+            if not automated_login(driver):
+                return False
+
+        print("Navigating to trends page...")
+        driver.get(TRENDING_URL)
+
+    try:
+        WebDriverWait(driver, 15).until(trends_loaded)
+    except Exception:
+        # Don't trust the cache next time if the trends never showed up
+        invalidate_session()
+        raise
+    return True
+
 def parse_trend_block(block, rank):
     """Extract label, name, posts, count, url from a trend block"""
     trend = {
@@ -130,9 +182,7 @@ def parse_trend_block(block, rank):
             By.XPATH, ".//span[contains(text(),'posts')]"
         ).text
         trend["posts"] = posts_text
-        numbers = re.sub(r"[^\d]", "", posts_text)
-        if numbers.isdigit():
-            trend["tweetCount"] = int(numbers)
+        trend["tweetCount"] = parse_volume(posts_text, "en")
     except:
         pass
 
@@ -156,8 +206,7 @@ def parse_trend_block(block, rank):
 
     # Build search URL
     if trend["name"]:
-        q = trend["name"].replace("#", "%23").replace(" ", "%20")
-        trend["url"] = f"https://twitter.com/search?q={q}"
+        trend["url"] = trend_search_url(trend["name"])
 
     return trend
         
@@ -165,7 +214,7 @@ def save_twitter_trends(trends, filename=None):
     """Save Twitter trends to JSON file"""
     if not filename:
         filename = f"twitter_trends_{datetime.now().strftime('%Y%m%d_%H%M')}.json"
-    data = {"scraped_at": datetime.now().isoformat(), "source": "Twitter Web", "trends": trends}
+    data = {"scraped_at": datetime.now().isoformat(), "source": "Twitter Web", "trends": [without_norm(t) for t in trends]}
     with open(filename, 'w', encoding='utf-8') as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
     return filename
@@ -173,86 +222,117 @@ def save_twitter_trends(trends, filename=None):
 
 def save_to_csv(trends, filename="twitter_trends.csv"):
     """Save Twitter trends to CSV file (local only)"""
-    file_exists = os.path.isfile(filename)
     print(f"➡️ Saving {len(trends)} trends to {os.path.abspath(filename)}")
 
-    with open(filename, "a", newline="", encoding="utf-8") as csvfile:
-        writer = csv.writer(csvfile)
-        if not file_exists:
-            writer.writerow(["timestamp", "rank", "label", "name", "posts", "tweet_count", "url"])
-        for trend in trends:
-            writer.writerow([
-                datetime.now().isoformat(),
-                trend.get("rank", 0),
-                trend.get("label", ""),
-                trend.get("name", ""),
-                trend.get("posts", ""),
-                trend.get("tweetCount", 0),
-                trend.get("url", "")
-            ])
+    timestamp = datetime.now().isoformat()
+    append_rows([filename], ["timestamp", "rank", "label", "name", "posts", "tweet_count", "url"], [
+        [
+            timestamp,
+            trend.get("rank", 0),
+            trend.get("label", ""),
+            trend.get("name", ""),
+            trend.get("posts", ""),
+            trend.get("tweetCount", 0),
+            trend.get("url", "")
+        ]
+        for trend in trends
+    ], indexed=[filename])
     return filename
 
+def scrape_trends_from_dom(driver):
+    """Parse trend blocks from the rendered page; returns None when no blocks exist"""
+    if not driver.find_elements(By.CSS_SELECTOR, "div[data-testid='trend']"):
+        print("No trends found. Saving page source for debugging...")
+        with open("page_source.html", "w", encoding="utf-8") as f:
+            f.write(driver.page_source)
+        driver.save_screenshot("trends_page.png")
+        return None
+
+    return extract_twitter_trends(driver, limit=50)
+
 def scrape_twitter_trends():
     """Scrape Twitter trending topics using Selenium and return filtered trends"""
     print("Scraping Twitter trends using Selenium...")
-    driver, trends = None, []
+    trends = []
 
     try:
-        driver = setup_driver()
-
-        if not check_logged_in(driver):
-            print("Not logged in. Attempting login...")
-            if not automated_login(driver):
+        with twitter_pool().lease() as driver:
+            if not open_trending_page(driver):
                 return []
 
-        print("Navigating to trends page...")
-        driver.get("https://twitter.com/explore/tabs/trending")
-
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "[data-testid='trend']"))
-        )
-
-        trend_elements = driver.find_elements(By.CSS_SELECTOR, "div[data-testid='trend']")
-        if not trend_elements:
-            print("No trends found. Saving page source for debugging...")
-            with open("page_source.html", "w", encoding="utf-8") as f:
-                f.write(driver.page_source)
-            driver.save_screenshot("trends_page.png")
-            return []
-
-        for i, element in enumerate(trend_elements[:50], start=1):
-            try:
-                trend = parse_trend_block(element, i)
-                if trend["name"]:
-                    trends.append(trend)
-            except Exception as e:
-                print(f"Error parsing trend {i}: {e}")
-                continue
+            # Wait until the trend list stops growing instead of reading a half-rendered page
+            _, report = load_cards(
+                driver, "div[data-testid='trend']",
+                target=50, max_scrolls=5, settle_ms=1000, patience=1, scroll=False
+            )
+            print(f"Trends page loaded: {report['count']} blocks in {report['ms']} ms")
+            print(f"Page metrics: {page_metrics(driver)}")
+
+            # Prefer the trending JSON the page itself fetched; DOM parsing is the fallback
+            if os.getenv("TWITTER_CAPTURE", "1") != "0":
+                try:
+                    trends = capture_trends(driver)
+                    print(f"Captured {len(trends)} trends from the network response")
+                except Exception as e:
+                    print(f"Network capture failed, falling back to DOM: {e}")
+                    trends = []
+
+            if not trends:
+                trends = scrape_trends_from_dom(driver)
+                if trends is None:
+                    return []
+
+            if trends:
+                record_success(driver)
 
         print(f"Successfully extracted {len(trends)} trends")
+        print(f"   Browser pool: {twitter_pool().stats()}")
         
         # Apply sports filter
         print("\nFiltering sports-related Twitter trends...")
-        filtered_trends = sports_filter.filter_sports_topics(trends)
+        classified = sports_filter.classify_batch(trends)
+        filtered_trends = classified["kept"]
+        print(f"Filtered out {len(classified['removed'])} sports-related trends")
 
-        stats = sports_filter.get_filter_stats(trends)
+        stats = classified["stats"]
         print(f"   Filter stats: {stats}")
+        sports_filter.save_cache()
         print(f"   {len(filtered_trends)} trends remain after filtering")
 
         # Save only non-sports trends
-        json_file = save_twitter_trends(filtered_trends)
-        print(f"✓ Filtered trends saved to {json_file}")
-        csv_file = save_to_csv(filtered_trends)
-        print(f"✓ Filtered trends appended to {csv_file}")
+        try:
+            store = get_store()
+            if store:
+                snapshot_id = store.save_twitter_run(filtered_trends, sports_stats=stats)
+                print(f"✓ Filtered trends stored in {store.path} (snapshot {snapshot_id})")
+        except Exception as e:
+            print(f"Trend store write failed: {e}")
+
+        exports = export_formats()
+        if "json" in exports:
+            json_file = save_twitter_trends(filtered_trends)
+            print(f"✓ Filtered trends saved to {json_file}")
+        if "csv" in exports:
+            csv_file = save_to_csv(filtered_trends)
+            print(f"✓ Filtered trends appended to {csv_file}")
+        if "parquet" in exports:
+            try:
+                from trend_archive import write_twitter_run
+                print(f"✓ Filtered trends archived to {write_twitter_run(filtered_trends)}")
+            except Exception as e:
+                print(f"Parquet archive write failed: {e}")
+        if "delta" in exports:
+            try:
+                from snapshot_delta import append_twitter_run
+                print(f"✓ Filtered trends added to the delta log (snapshot {append_twitter_run(filtered_trends)})")
+            except Exception as e:
+                print(f"Delta log write failed: {e}")
 
         return filtered_trends
         
     except Exception as e:
         print(f"Error in scrape_twitter_trends: {e}")
         return []
-    finally:
-        if driver:
-            driver.quit()
 
 if __name__ == "__main__":
     print("=" * 60)
@@ -0,0 +1,106 @@
+from functools import lru_cache
+import re
+
+# Compact-number suffixes per display language. Google's Turkish page writes
+# "20 B+" for 20 bin (thousand), so "b" means 1e3 in tr but 1e9 in en.
+SUFFIXES = {
+    "tr": {"b": 1_000, "bin": 1_000, "mn": 1_000_000, "milyon": 1_000_000,
+           "mr": 1_000_000_000, "milyar": 1_000_000_000},
+    "en": {"k": 1_000, "m": 1_000_000, "mn": 1_000_000, "b": 1_000_000_000, "bn": 1_000_000_000},
+}
+
+# Unit words that follow the number ("20 B+ arama", "23.6K posts")
+UNIT_WORDS = {"arama", "aramalar", "gönderi", "gönderiler", "tweet", "tweets",
+              "post", "posts", "search", "searches"}
+
+VOLUME_RE = re.compile(r"(\d+(?:[.,]\d+)*)\s*([^\W\d_]*)")
+
+
+def parse_number(digits):
+    """Read '23.6', '2,313', '1.234.567' or '1,5' without knowing the locale.
+
+    A lone separator followed by exactly three digits groups thousands;
+    otherwise the last separator is the decimal point.
+    """
+    separators = [c for c in digits if c in ".,"]
+    if not separators:
+        return float(digits)
+    last = max(digits.rfind("."), digits.rfind(","))
+    if len(set(separators)) == 1 and len(digits) - last - 1 == 3:
+        return float(digits.replace(separators[0], ""))
+    whole = digits[:last].replace(".", "").replace(",", "")
+    return float(f"{whole}.{digits[last + 1:]}")
+
+
+@lru_cache(maxsize=4096)
+def parse_volume(volume_text, locale="tr"):
+    """'20 B+' (tr) -> 20000, '23.6K posts' (en) -> 23600, '1 Mn+' -> 1000000; 0 if unreadable"""
+    if not volume_text:
+        return 0
+    m = VOLUME_RE.search(volume_text.lower())
+    if not m:
+        return 0
+    suffix = m.group(2)
+    if suffix in UNIT_WORDS:
+        suffix = ""
+    multipliers = SUFFIXES.get(locale, SUFFIXES["en"])
+    if suffix and suffix not in multipliers:
+        return 0
+    return int(round(parse_number(m.group(1)) * multipliers.get(suffix, 1)))
+
+
+def parse_volumes(volume_texts, locale="tr"):
+    """Parse a whole column; each distinct string is parsed once"""
+    table = {text: parse_volume(text, locale) for text in set(volume_texts)}
+    return [table[text] for text in volume_texts]
+
+
+def benchmark_volume_parse(sources=(("trends.csv", "volume", "tr"), ("twitter_trends.csv", "posts", "en")), repeat=5):
+    """Column parse time of the old per-row parsers versus parse_volumes"""
+    import csv
+    import time
+
+    def legacy_google(volume_text):
+        if not volume_text:
+            return 0
+        volume_text = volume_text.lower().replace("arama", "").replace("+", "").strip()
+        multipliers = {"k": 1_000, "m": 1_000_000, "b": 1_000_000_000}
+        try:
+            if volume_text[-1] in multipliers:
+                return int(float(volume_text[:-1]) * multipliers[volume_text[-1]])
+            return int(volume_text)
+        except:
+            return 0
+
+    def legacy_twitter(posts_text):
+        numbers = re.sub(r"[^\d]", "", posts_text or "")
+        return int(numbers) if numbers.isdigit() else 0
+
+    legacy = {"tr": legacy_google, "en": legacy_twitter}
+
+    for filename, column, locale in sources:
+        with open(filename, encoding="utf-8") as f:
+            texts = [row[column] for row in csv.DictReader(f)]
+
+        timings = {}
+        for name, run in (("legacy", lambda: [legacy[locale](t) for t in texts]),
+                          ("batch", lambda: (parse_volume.cache_clear(), parse_volumes(texts, locale))[1])):
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                values = run()
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = (round(best / len(texts) * 1e6, 2), values)
+
+        print(f"{filename}:{column} ({len(texts)} rows, {len(set(texts))} distinct, locale {locale})")
+        for name, (us, values) in timings.items():
+            print(f"   {name:7s} {us} µs/row")
+        changed = sorted({t for t in texts if legacy[locale](t) != parse_volume(t, locale)})
+        print(f"      {len(changed)} distinct strings now read differently, e.g.")
+        for t in changed[:4]:
+            print(f"      {t!r}: {legacy[locale](t)} -> {parse_volume(t, locale)}")
+
+
+if __name__ == "__main__":
+    benchmark_volume_parse()